@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs process-parallel content-stream filtering in FileCleaner.
+
+Uses synthetic page content streams (text objects positioned with Tm, with a
+page number and footer line per page) and times the filtering step alone,
+i.e. the part FileCleaner moves into worker processes. Run from the
+repository root:
+
+    python benchmarks/bench_clean_parallel.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.file_cleaner import FileCleaner, _filter_pages, _get_clean_executor, shutdown_clean_pool
+from src.utils.worker_pool import available_cpus
+
+
+def page_stream(page_num: int, lines: int = 1500) -> bytes:
+    """One page of text drawing operators, plus header and footer."""
+    ops = ["BT", f"1 0 0 1 300 820 Tm", f"[({page_num})] TJ", "ET"]
+    for i in range(lines):
+        ops += ["BT", f"1 0 0 1 50 {780 - (i % 700)} Tm", f"[(Container kho 20 {i})] TJ", "ET"]
+    ops += ["BT", "1 0 0 1 50 13.07 Tm", "[<0015002D002B0034>] TJ", "ET"]
+    return "\n".join(ops).encode("latin-1")
+
+
+if __name__ == "__main__":
+    workers = min(4, available_cpus())
+    pages = [(idx, 842.0, [page_stream(idx + 1)]) for idx in range(120)]
+
+    started = time.perf_counter()
+    sequential = [(idx, FileCleaner._filter_page_streams(data, height)) for idx, height, data in pages]
+    sequential_ms = (time.perf_counter() - started) * 1000
+
+    executor = _get_clean_executor(workers)
+    # Start the worker processes before timing
+    list(executor.map(_filter_pages, [[]] * workers))
+    started = time.perf_counter()
+    shard = max(1, len(pages) // (workers * 4))
+    futures = [executor.submit(_filter_pages, pages[i:i + shard]) for i in range(0, len(pages), shard)]
+    parallel = [plan for future in futures for plan in future.result()]
+    parallel_ms = (time.perf_counter() - started) * 1000
+    shutdown_clean_pool()
+
+    assert parallel == sequential
+    print(f"{'pages':>6} {'workers':>8} {'sequential ms':>14} {'parallel ms':>12} {'speedup':>8}")
+    print(f"{len(pages):>6} {workers:>8} {sequential_ms:>14.0f} {parallel_ms:>12.0f} {sequential_ms / parallel_ms:>7.1f}x")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tokenizing header/footer filter on PDF content streams.
+
+Filters the same synthetic page laid out one operator per line (as the former
+line-based filter expected) and several operators per line (as many PDF
+producers write it), reporting throughput and how many header/footer text
+operators were found in each layout. Run from the repository root:
+
+    python benchmarks/bench_content_stream.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.content_stream import iter_operations
+from src.core.file_cleaner import FileCleaner
+
+
+def page_objects(page_num: int, lines: int = 1500) -> list:
+    """Text objects of one page: body rows, a footer page number and a hex footer."""
+    objects = [["BT", "1 0 0 1 300 30 Tm", f"[({page_num})] TJ", "ET"]]
+    for i in range(lines):
+        objects.append(["BT", f"1 0 0 1 50 {780 - (i % 600)} Tm", f"[(Container kho 20 {i})] TJ", "ET"])
+    objects.append(["BT", "1 0 0 1 50 13.07 Tm", "[<0015002D002B0034>] TJ", "ET"])
+    return objects
+
+
+if __name__ == "__main__":
+    page_height = 842.0
+    pages = 40
+    layouts = {
+        "one op per line": lambda objects: "\n".join(op for obj in objects for op in obj),
+        "one object per line": lambda objects: "\n".join(" ".join(obj) for obj in objects),
+    }
+
+    print(f"{'layout':>20}  {'MB':>6}  {'tokenize MB/s':>13}  {'filter MB/s':>11}  {'removed/page':>12}")
+    for name, render in layouts.items():
+        streams = [render(page_objects(page_num)).encode("latin-1") for page_num in range(1, pages + 1)]
+        size_mb = sum(len(data) for data in streams) / 1024 / 1024
+
+        started = time.perf_counter()
+        for data in streams:
+            list(iter_operations(data))
+        tokenize_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        removed = sum(FileCleaner._filter_page_streams([data], page_height)[2] for data in streams)
+        filter_s = time.perf_counter() - started
+
+        print(f"{name:>20}  {size_mb:6.1f}  {size_mb / tokenize_s:13.1f}  {size_mb / filter_s:11.1f}  {removed / pages:12.1f}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FastAPI default JSON responses vs FastJSONResponse.
+
+Uses the /documents/split and /documents/markdown payloads built from
+sample/markdown.md. Run from the repository root:
+
+    python benchmarks/bench_json_response.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from src.core.document_splitter import DocumentSplitter
+from src.utils import responses
+from src.utils.responses import FastJSONResponse
+
+
+def best_of(func, repeat: int = 5, number: int = 20) -> float:
+    """Best average time per call in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1000
+
+
+def default_render(content) -> bytes:
+    """What FastAPI does for a plain dict returned from a handler."""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def build_payloads():
+    """Split and markdown response bodies for sample/markdown.md (and a 5x larger split)."""
+    markdown = Path("sample/markdown.md").read_text(encoding="utf-8")
+    chunks = DocumentSplitter().parse_markdown(markdown)
+    split = {"status": "success", "total_chunks": len(chunks), "chunks": chunks}
+    split_5x = {"status": "success", "total_chunks": len(chunks) * 5, "chunks": chunks * 5}
+    markdown_payload = {
+        "filename": "markdown.md",
+        "markdown_content": markdown,
+        "metadata": {"word_count": len(markdown.split()), "markdown_source": "extracted"},
+        "cleaned": True,
+        "cached": False,
+    }
+    return {
+        f"split ({len(chunks)} chunks)": split,
+        f"split ({len(chunks) * 5} chunks)": split_5x,
+        "markdown": markdown_payload,
+    }
+
+
+def bench_serialization(payloads) -> None:
+    print(f"orjson: {responses.ORJSON_AVAILABLE}, brotli: {responses.BROTLI_AVAILABLE}\n")
+    print(f"{'payload':<22} {'default ms':>11} {'fast ms':>9} {'speedup':>8} {'json KB':>8} {'gzip KB':>8} {'gzip ms':>8}")
+    for name, payload in payloads.items():
+        default_ms = best_of(lambda: default_render(payload))
+        fast_ms = best_of(lambda: FastJSONResponse(payload).body)
+        body = FastJSONResponse(payload).body
+        gzip_ms = best_of(lambda: responses.compress(body, "gzip"))
+        gzip_kb = len(responses.compress(body, "gzip")) / 1024
+        print(
+            f"{name:<22} {default_ms:>11.2f} {fast_ms:>9.2f} {default_ms / fast_ms:>7.1f}x "
+            f"{len(body) / 1024:>8.1f} {gzip_kb:>8.1f} {gzip_ms:>8.2f}"
+        )
+
+
+def bench_endpoint(payload) -> None:
+    """Full request through FastAPI routing (TestClient, in-process)."""
+    app = FastAPI()
+
+    @app.get("/default")
+    async def default_route():
+        return payload
+
+    @app.get("/fast")
+    async def fast_route(request: Request):
+        return FastJSONResponse(payload, request=request)
+
+    with TestClient(app) as client:
+        plain = {"Accept-Encoding": "identity"}
+        for path, headers in (("/default", plain), ("/fast", plain), ("/fast", {"Accept-Encoding": "gzip, br"})):
+            response = client.get(path, headers=headers)
+            wire = len(response.content) if "content-encoding" not in response.headers else int(
+                response.headers["content-length"]
+            )
+            ms = best_of(lambda: client.get(path, headers=headers), repeat=3, number=20)
+            encoding = response.headers.get("content-encoding", "identity")
+            print(f"GET {path:<9} {encoding:<9} {ms:>8.2f} ms  {wire / 1024:>7.1f} KB on the wire")
+
+
+if __name__ == "__main__":
+    payloads = build_payloads()
+    bench_serialization(payloads)
+    print()
+    bench_endpoint(payloads[list(payloads)[1]])
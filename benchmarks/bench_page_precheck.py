@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark: header/footer candidate pre-check before content-stream filtering.
+
+A document of single-stream A4 pages, a few with a bottom page number.
+Compares filtering every page with running the pre-check first and filtering
+only the pages it flags. Run from the repository root:
+
+    python benchmarks/bench_page_precheck.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.file_cleaner import FileCleaner
+
+
+def page_stream(page_num: int, with_footer: bool, lines: int = 800) -> bytes:
+    """Body text objects, plus a bottom page number on footer pages."""
+    objects = [f"BT 1 0 0 1 50 {740 - (i % 600)} Tm [(Container kho 20 {i})] TJ ET" for i in range(lines)]
+    if with_footer:
+        objects.append(f"BT 1 0 0 1 300 30 Tm [({page_num})] TJ ET")
+    return "\n".join(objects).encode("latin-1")
+
+
+if __name__ == "__main__":
+    page_height = 842.0
+    pages = [[page_stream(page_num, with_footer=page_num % 10 == 0)] for page_num in range(1, 201)]
+
+    started = time.perf_counter()
+    full = [FileCleaner._filter_page_streams(stream_data, page_height) for stream_data in pages]
+    full_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    flagged = [FileCleaner._page_needs_filtering(stream_data, page_height) for stream_data in pages]
+    checked = [
+        FileCleaner._filter_page_streams(stream_data, page_height) if needs else (set(), {}, 0)
+        for stream_data, needs in zip(pages, flagged)
+    ]
+    checked_ms = (time.perf_counter() - started) * 1000
+
+    assert checked == full
+    print(f"{'pages':>6}  {'flagged':>7}  {'filter all ms':>13}  {'pre-check ms':>12}  {'speedup':>7}")
+    print(f"{len(pages):6d}  {sum(flagged):7d}  {full_ms:13.0f}  {checked_ms:12.0f}  {full_ms / checked_ms:6.1f}x")
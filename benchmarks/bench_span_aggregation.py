@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-span watermark checks vs batched span aggregation.
+
+Builds synthetic ``page.get_text("dict")`` blocks for a dense tariff page and
+times the old per-line loop (one ``re.search`` per watermark pattern per span)
+against ``extract_elements`` with the combined watermark pattern. Run from the
+repository root:
+
+    python benchmarks/bench_span_aggregation.py
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.page_layout import extract_elements
+from src.core.patterns import WATERMARK_PATTERN, WATERMARK_PATTERNS
+
+
+def build_blocks(lines: int, spans_per_line: int):
+    """One page worth of text blocks with a few watermark spans mixed in."""
+    rng = random.Random(0)
+    words = ["Container khô 20'", "1.250.000", "tàu/sà lan", "CƯỚC", "Bảng 01", "x_Approved"]
+    blocks = []
+    for start in range(0, lines, 10):
+        block_lines = []
+        for i in range(start, min(start + 10, lines)):
+            spans = [{"text": rng.choice(words), "size": 11.0} for _ in range(spans_per_line)]
+            block_lines.append({"bbox": (50.0, i * 12.0, 500.0, i * 12.0 + 11), "spans": spans})
+        blocks.append({"type": 0, "lines": block_lines})
+    return blocks
+
+
+def per_span(blocks):
+    """What _extract_page did before: a regex search per pattern per span."""
+    for block in blocks:
+        for line in block["lines"]:
+            line_text = ""
+            font_sizes = []
+            for span in line["spans"]:
+                text = span["text"].strip()
+                if text:
+                    if any(re.search(p, text) for p in WATERMARK_PATTERNS):
+                        continue
+                    font_sizes.append(span["size"])
+                    line_text += text + " "
+            if line_text.strip():
+                sum(font_sizes) / len(font_sizes)
+
+
+def batched(blocks):
+    """Current implementation."""
+    extract_elements(blocks, WATERMARK_PATTERN)
+
+
+if __name__ == "__main__":
+    print(f"{'spans':>7} {'per-span ms':>12} {'batched ms':>11} {'speedup':>8}")
+    for lines, per_line in ((60, 4), (200, 6), (600, 8)):
+        blocks = build_blocks(lines, per_line)
+        timings = []
+        for func in (per_span, batched):
+            started = time.perf_counter()
+            for _ in range(20):
+                func(blocks)
+            timings.append((time.perf_counter() - started) * 1000 / 20)
+        print(f"{lines * per_line:>7} {timings[0]:>12.2f} {timings[1]:>11.2f} {timings[0] / timings[1]:>7.1f}x")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FileCleaner content-stream decoding with and without the document cache.
+
+Builds a PDF whose pages all draw one large Flate-compressed watermark stream
+(as many exported contracts do) next to a small per-page body, then filters
+every page once through the per-document cache and once decoding each page's
+streams separately. Requires pikepdf. Run from the repository root:
+
+    python benchmarks/bench_stream_cache.py
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pikepdf
+
+from src.core.file_cleaner import ContentStreamCache, FileCleaner
+
+
+def build_pdf(pages: int = 200) -> bytes:
+    """Pages sharing one large watermark stream, plus their own body stream."""
+    ops = [f"q 0.9 g BT /F1 40 Tf 0.7 0.7 -0.7 0.7 {100 + i % 300} {200 + i % 400} Tm (DRAFT) Tj ET Q" for i in range(6000)]
+    with pikepdf.new() as pdf:
+        watermark = pdf.make_stream("\n".join(ops).encode("latin-1"))
+        for page_num in range(1, pages + 1):
+            pdf.add_blank_page(page_size=(595, 842))
+            body = pdf.make_stream(f"BT /F1 11 Tf 1 0 0 1 50 400 Tm [(Body of page {page_num})] TJ ET".encode())
+            pdf.pages[-1].Contents = pikepdf.Array([body, watermark])
+        buffer = io.BytesIO()
+        pdf.save(buffer, compress_streams=True)
+        return buffer.getvalue()
+
+
+def run(data: bytes, shared_cache: bool):
+    """Filter all pages; returns (seconds, peak traced MB, decoded MB)."""
+    cleaner = FileCleaner(output_dir="temp/bench")
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        tracemalloc.start()
+        started = time.perf_counter()
+        if shared_cache:
+            page_streams = [cleaner._read_page_content(page)[1] for page in pdf.pages]
+            cache = ContentStreamCache(page_streams)
+            for page, content_streams in zip(pdf.pages, page_streams):
+                cleaner._remove_header_footer_from_content(page, pdf, (842.0, content_streams), cache)
+        else:
+            cache = ContentStreamCache([])
+            for page in pdf.pages:
+                page_height, content_streams = cleaner._read_page_content(page)
+                cleaner._remove_header_footer_from_content(page, pdf, (page_height, content_streams), cache)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, cache.stats["decoded_bytes"] / 1024 / 1024
+
+
+if __name__ == "__main__":
+    data = build_pdf()
+    print(f"{'mode':>18}  {'seconds':>8}  {'peak MB':>8}  {'decoded MB':>10}")
+    for name, shared_cache in (("per-page decoding", False), ("document cache", True)):
+        elapsed, peak_mb, decoded_mb = run(data, shared_cache)
+        print(f"{name:>18}  {elapsed:8.2f}  {peak_mb:8.1f}  {decoded_mb:10.1f}")
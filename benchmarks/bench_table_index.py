@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: linear table scans vs the sorted TableIndex / PageLayout lookups.
+
+Uses a synthetic document with hundreds of tables and a "Bảng" heading per
+table, i.e. the worst case for the old per-heading and per-line scans. Run
+from the repository root:
+
+    python benchmarks/bench_table_index.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.page_layout import PageLayout, TableIndex, TableRegion
+
+
+def build_layouts(pages: int, tables_per_page: int):
+    """Pages filled with thin stacked tables."""
+    layouts = []
+    for page_num in range(1, pages + 1):
+        tables = [
+            TableRegion(bbox=(50, 20 + i * 8, 500, 26 + i * 8), markdown=f"| {page_num}.{i} |")
+            for i in range(tables_per_page)
+        ]
+        layouts.append(PageLayout(page_num=page_num, tables=tables))
+    return layouts
+
+
+def linear(layouts, headings, lines):
+    """What _convert_pdf did before: rescan every table per heading and per line."""
+    extracted = [(r.markdown, l.page_num, r.top) for l in layouts for r in l.tables]
+    matched = set()
+    for page_num, y in headings:
+        best_idx, best_distance = None, float("inf")
+        for idx, (_, table_page, table_y) in enumerate(extracted):
+            if idx in matched or abs(table_page - page_num) > 1:
+                continue
+            distance = abs(table_page - page_num) * 10000 + abs(table_y - y)
+            if distance < best_distance:
+                best_idx, best_distance = idx, distance
+        if best_idx is not None:
+            matched.add(best_idx)
+    for layout, bbox in lines:
+        any(region.contains(bbox) for region in layout.tables)
+
+
+def indexed(layouts, headings, lines):
+    """Current implementation."""
+    index = TableIndex(layouts)
+    for page_num, y in headings:
+        index.take_nearest(page_num, y)
+    for layout, bbox in lines:
+        layout.table_containing(bbox)
+
+
+if __name__ == "__main__":
+    print(f"{'tables':>7} {'linear ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for pages, per_page in ((10, 20), (20, 50), (40, 100)):
+        layouts = build_layouts(pages, per_page)
+        headings = [(l.page_num, r.top - 4) for l in layouts for r in l.tables]
+        lines = [(l, (60, r.top + 1, 200, r.top + 5)) for l in layouts for r in l.tables for _ in range(4)]
+
+        timings = []
+        for func in (linear, indexed):
+            for layout in layouts:
+                layout._by_top = None  # rebuild lazily inside the timed run
+            started = time.perf_counter()
+            func(layouts, headings, lines)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        print(f"{pages * per_page:>7} {timings[0]:>10.1f} {timings[1]:>11.1f} {timings[0] / timings[1]:>7.1f}x")
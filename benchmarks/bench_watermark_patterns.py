@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-span watermark check with raw pattern strings vs the compiled
+WATERMARK_PATTERN alternation from src.core.patterns.
+
+"before" is the former ``_is_watermark``: a function-local ``import re`` and one
+``re.search`` (pattern cache lookup + scan) per pattern string. Run from the
+repository root:
+
+    python benchmarks/bench_watermark_patterns.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.patterns import WATERMARK_PATTERN, WATERMARK_PATTERNS
+
+SPANS = ["Container khô 20'", "1.250.000", "tàu/sà lan", "CƯỚC XẾP DỠ", "x_Approved", "Bảng 01"]
+
+
+def before(text, patterns=WATERMARK_PATTERNS):
+    """The former MarkdownConverter._is_watermark."""
+    import re
+
+    for pattern in patterns:
+        if re.search(pattern, text):
+            return True
+    return False
+
+
+def after(text):
+    """Current implementation."""
+    return WATERMARK_PATTERN.search(text) is not None
+
+
+if __name__ == "__main__":
+    spans = SPANS * 50000
+    assert [before(s) for s in SPANS] == [after(s) for s in SPANS]
+    timings = []
+    for func in (before, after):
+        started = time.perf_counter()
+        for span in spans:
+            func(span)
+        timings.append((time.perf_counter() - started) * 1e9 / len(spans))
+    print(f"{'spans':>7} {'before ns/span':>15} {'after ns/span':>14} {'speedup':>8}")
+    print(f"{len(spans):>7} {timings[0]:>15.0f} {timings[1]:>14.0f} {timings[0] / timings[1]:>7.1f}x")
@@ -0,0 +1,65 @@
+"""
+Production server profile.
+
+    gunicorn -c gunicorn.conf.py src.api:app
+
+One uvicorn worker process per available CPU. The app is imported and warmed
+up once in the master, then forked, so schemas, converters and initialized
+PDF libraries are shared copy-on-write between workers.
+
+Each worker has its own conversion and batch pools. Their default size is
+CPUS_PER_WORKER = max(1, CPUs // workers), so all workers together run about
+one CPU-bound task per CPU. Setting WORKER_POOL_SIZE / BATCH_POOL_SIZE
+overrides it per worker; the totals are then multiplied by the worker count.
+"""
+import gc
+import os
+import shutil
+
+from src.utils.worker_pool import available_cpus
+
+
+# Per-worker metrics are merged through snapshot files (see src/utils/metrics.py).
+# Must be set before the app is imported.
+os.environ.setdefault("METRICS_MULTIPROC_DIR", "temp/metrics")
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8005')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+# Must be set before the app is imported (pools are created at import time)
+os.environ.setdefault("CPUS_PER_WORKER", str(max(1, available_cpus() // workers)))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# Large PDFs can take minutes; recycle workers periodically to bound memory growth
+timeout = int(os.getenv("WORKER_TIMEOUT", "300"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+max_requests = int(os.getenv("MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def on_starting(server):
+    """Drop metric snapshots left by a previous run."""
+    shutil.rmtree(os.environ["METRICS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["METRICS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def when_ready(server):
+    """Warm up once in the master, before any worker is forked."""
+    from src import api
+
+    api.warm_up_pipeline()
+    # Keep warmed-up objects out of the collector so forked workers do not copy their pages
+    gc.freeze()
+    server.log.info(f"Warm-up done, starting {server.num_workers} workers")
+
+
+def child_exit(server, worker):
+    """Stop reporting gauges of a worker that exited."""
+    from src import api
+
+    api.metrics.remove_snapshot(worker.pid)
@@ -1,5 +1,7 @@
 """
-Main entry point for running the API server.
+Development entry point for running the API server (auto-reload).
+
+Production: gunicorn -c gunicorn.conf.py src.api:app
 """
 import uvicorn
 from src.utils.logger import setup_logging
@@ -1,40 +1,744 @@
 """
 FastAPI application for the document chunking pipeline.
 """
+import asyncio
+import html
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
+import zipfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from loguru import logger
 import re
 from pydantic import BaseModel
-from src.core.stage1_markdown import MarkdownConverter
-from src.core.file_cleaner import FileCleaner
+from starlette.background import BackgroundTask
+from src.core.stage1_markdown import MarkdownConverter, parse_page_ranges, shutdown_page_pool
+from src.core.file_cleaner import FileCleaner, shutdown_clean_pool
 from src.core.document_splitter import DocumentSplitter
 from src.core.markdown_to_bullet import MarkdownToBulletConverter
 from src.core.html_converter import HtmlConverter
+from src.core.pipeline import convert_markdown, get_markdown_converter, process_document
+from src.core.warmup import is_warm, warm_up
 from src.schemas.schema_loader import get_schema_loader
+from src.storage.job_store import JobStore
+from src.storage.cleaned_file_cache import CleanedFileCache
+from src.storage.result_cache import ResultCache
+from src.utils.metrics import MetricsRegistry
+from src.utils.responses import FastJSONResponse
+from src.utils.upload_spool import (
+    RequestBodyLimitMiddleware,
+    SpooledUpload,
+    UploadTooLargeError,
+    spool_file,
+    spool_upload,
+)
+from src.utils.worker_pool import WorkerPool, WorkerPoolFullError
+from src.utils.workspace import Workspace, WorkspaceManager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    # Resume jobs interrupted by a previous worker restart
+    await asyncio.to_thread(job_store.purge_finished, older_than_seconds=JOB_RETENTION_HOURS * 3600)
+    for job_id in await asyncio.to_thread(job_store.claim_orphaned):
+        schedule_job(job_id)
+
+    gc_task = asyncio.create_task(collect_workspace_garbage())
+    metrics_task = asyncio.create_task(flush_metrics()) if metrics.multiprocess_dir else None
+
+    # Skipped when a preloading server master already warmed up before forking
+    if not is_warm():
+        try:
+            await asyncio.to_thread(warm_up_pipeline)
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {e}")
+    app.state.ready = True
+
+    yield
+
+    app.state.ready = False
+    gc_task.cancel()
+    if metrics_task:
+        metrics_task.cancel()
+    worker_pool.shutdown(wait=False)
+    batch_pool.shutdown(wait=False)
+    shutdown_page_pool(wait=False)
+    shutdown_clean_pool(wait=False)
 
 
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Document Markdown Chunking API",
     description="Simple API for converting documents to markdown and chunking tables",
     version="1.0.0",
 )
+# Set once startup (including warm-up) has finished; reported by /health/ready
+app.state.ready = False
 
 # Initialize components
 schema_loader = get_schema_loader(schemas_dir="config/schemas")
-markdown_converter = MarkdownConverter()
-file_cleaner = FileCleaner()
+# PDF_PAGE_WORKERS > 1 shards the pages of large PDFs across worker processes.
+# Per-page extraction results are cached by page content, so a revised document
+# only re-parses the pages that changed (PAGE_CACHE_MB=0 disables the cache).
+# PDFs of PDF_LOW_MEMORY_MIN_PAGES or more are extracted in windows of
+# PDF_LOW_MEMORY_WINDOW pages with intermediate output on disk (0 disables).
+# Process pool workers build their own converter from the same options (see convert_markdown()).
+MARKDOWN_CONVERTER_OPTIONS = {
+    "page_workers": int(os.getenv("PDF_PAGE_WORKERS", "1")),
+    "parallel_min_pages": int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16")),
+    "page_cache_dir": os.getenv("PAGE_CACHE_DIR", "temp/page_cache") if int(os.getenv("PAGE_CACHE_MB", "256")) else None,
+    "page_cache_max_bytes": int(os.getenv("PAGE_CACHE_MB", "256")) * 1024 * 1024,
+    "low_memory_min_pages": int(os.getenv("PDF_LOW_MEMORY_MIN_PAGES", "200")),
+    "low_memory_window_pages": int(os.getenv("PDF_LOW_MEMORY_WINDOW", "16")),
+}
+markdown_converter = get_markdown_converter(MARKDOWN_CONVERTER_OPTIONS)
+# PDFs up to IN_MEMORY_PDF_MB are cleaned into memory and opened by PyMuPDF from
+# there, with no cleaned copy written to or read back from disk (0 disables).
+# Larger PDFs are cleaned into a file; from CLEAN_MMAP_MIN_MB on, pikepdf
+# memory-maps the upload instead of reading it into a buffer.
+IN_MEMORY_PDF_MAX_BYTES = int(os.getenv("IN_MEMORY_PDF_MB", "32")) * 1024 * 1024
+# Every request works in its own scratch directory; downloadable outputs are
+# kept under OUTPUT_DIR/<workspace id>/ and reclaimed by TTL and size budget
+workspace_manager = WorkspaceManager(
+    root=os.getenv("WORKSPACE_ROOT", "temp/work"),
+    output_dir=os.getenv("OUTPUT_DIR", "temp/cleaned"),
+    use_tmpfs=os.getenv("WORKSPACE_TMPFS", "0") == "1",
+    output_ttl_seconds=float(os.getenv("OUTPUT_TTL_HOURS", "24")) * 3600,
+    output_max_bytes=int(os.getenv("OUTPUT_MAX_MB", "1024")) * 1024 * 1024,
+)
+WORKSPACE_GC_INTERVAL = float(os.getenv("WORKSPACE_GC_INTERVAL_SECONDS", "300"))
+
+# Cleaned files keyed by original content under OUTPUT_DIR/cache/, so cleaning
+# the same bytes again returns the earlier result (CLEANED_CACHE_MB=0 disables)
+cleaned_file_cache = CleanedFileCache(
+    cache_dir=str(workspace_manager.cache_dir),
+    max_bytes=int(os.getenv("CLEANED_CACHE_MB", "512")) * 1024 * 1024,
+    ttl_seconds=float(os.getenv("CLEANED_CACHE_TTL_HOURS", "24")) * 3600,
+) if int(os.getenv("CLEANED_CACHE_MB", "512")) else None
+# CLEAN_PAGE_WORKERS > 1 filters the page content streams of large PDFs in worker processes
+file_cleaner = FileCleaner(
+    mmap_min_bytes=int(os.getenv("CLEAN_MMAP_MIN_MB", "32")) * 1024 * 1024,
+    page_workers=int(os.getenv("CLEAN_PAGE_WORKERS", "1")),
+    parallel_min_pages=int(os.getenv("CLEAN_PARALLEL_MIN_PAGES", "50")),
+    output_cache=cleaned_file_cache,
+)
 document_splitter = DocumentSplitter()
 bullet_converter = MarkdownToBulletConverter()
 html_converter = HtmlConverter()
 
+# Blocking conversion work runs here so the event loop keeps serving other requests.
+# WORKER_POOL_KIND=process moves CPU-bound parsing out of the GIL. Pool sizes default
+# to this server worker's share of the CPUs (CPUS_PER_WORKER, see gunicorn.conf.py).
+worker_pool = WorkerPool(
+    kind=os.getenv("WORKER_POOL_KIND", "thread"),
+    max_workers=int(os.getenv("WORKER_POOL_SIZE", "0")) or None,
+    max_queue=int(os.getenv("WORKER_QUEUE_DEPTH", "16")),
+)
+
+# /documents/batch fans files out across separate worker processes; each process
+# keeps its own converter instances, so model init is paid once per worker
+batch_pool = WorkerPool(
+    kind=os.getenv("BATCH_POOL_KIND", "process"),
+    max_workers=int(os.getenv("BATCH_POOL_SIZE", "0")) or None,
+    max_queue=int(os.getenv("BATCH_QUEUE_DEPTH", "64")),
+    name="batch",
+)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+
+# Uploads are copied into the request workspace in chunks. Request bodies over the
+# limit are refused before Starlette parses (and spools) them; a batch request may
+# carry several files, up to MAX_BATCH_REQUEST_MB in total
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+MAX_BATCH_REQUEST_SIZE = int(os.getenv("MAX_BATCH_REQUEST_MB", "1024")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+# Room for the multipart framing and form fields around one file
+MULTIPART_OVERHEAD = 64 * 1024
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    max_body_size=MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+    path_limits={"/documents/batch": MAX_BATCH_REQUEST_SIZE},
+)
+
+# Conversion results keyed by upload content, so repeated uploads skip cleaning and extraction
+result_cache = ResultCache(
+    cache_dir=os.getenv("RESULT_CACHE_DIR", "temp/cache"),
+    max_memory_bytes=int(os.getenv("RESULT_CACHE_MEMORY_MB", "64")) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv("RESULT_CACHE_DISK_MB", "512")) * 1024 * 1024,
+)
+
+# Background conversion jobs (POST /jobs) persist their state in SQLite
+JOBS_DIR = Path(os.getenv("JOBS_DIR", "temp/jobs"))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+JOB_OUTPUT_FORMATS = {"markdown", "bullet", "html"}
+job_store = JobStore(db_path=str(JOBS_DIR / "jobs.db"))
+job_slots = asyncio.Semaphore(worker_pool.max_workers)
+_background_tasks = set()
+
+# Operational metrics exposed at GET /metrics (Prometheus text format).
+# With several server workers, METRICS_MULTIPROC_DIR lets any worker report all of them.
+metrics = MetricsRegistry(multiprocess_dir=os.getenv("METRICS_MULTIPROC_DIR") or None)
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_latency = metrics.histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route", ("method", "route")
+)
+stage_latency = metrics.histogram(
+    "pipeline_stage_duration_seconds",
+    "Pipeline stage duration (clean, markdown, table_detection, text_extraction, bullet, html, split)",
+    ("stage",),
+)
+upload_size = metrics.histogram(
+    "upload_size_bytes",
+    "Size of uploaded files",
+    buckets=[2 ** exponent * 1024 for exponent in range(0, 18, 2)],  # 1 KB .. 64 MB
+)
+document_pages = metrics.histogram(
+    "document_pages", "Page count of converted PDF documents", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+cache_gauge = metrics.gauge("result_cache", "Result cache state (hits, misses, hit_ratio, evictions, sizes)", ("field",))
+pool_gauge = metrics.gauge(
+    "worker_pool", "Worker pool state (workers, in_flight, queue_depth, completed, rejected)", ("pool", "field")
+)
+
 # Configure logging
 logger.add("logs/api.log", rotation="500 MB", retention="10 days", level="INFO")
 
 
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Run a blocking pipeline call in the worker pool.
+
+    Raises:
+        HTTPException: 503 if the worker pool queue is full
+    """
+    try:
+        return await worker_pool.run(func, *args, **kwargs)
+    except WorkerPoolFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other documents. Please retry later.",
+            headers={"Retry-After": "5"},
+        )
+
+
+def markdown_cache_key(
+    content_hash: str,
+    file_ext: str,
+    clean_before_convert: bool,
+    extract_options: Optional[Dict[str, str]] = None,
+) -> str:
+    """Result cache key for the clean -> markdown stages of one uploaded file."""
+    return ResultCache.make_key(
+        content_hash,
+        ext=file_ext,
+        clean=clean_before_convert and file_ext in {".pdf", ".docx"},
+        cleaner_version=FileCleaner.VERSION,
+        converter_version=MarkdownConverter.VERSION,
+        # Only present for partial extraction, so whole-document keys stay unchanged
+        **(extract_options or {}),
+    )
+
+
+def extraction_options(pages: Optional[str], start_heading: Optional[str]) -> Dict[str, str]:
+    """
+    Validate the partial-extraction parameters of a conversion request.
+
+    Returns:
+        MarkdownConverter.convert() keyword arguments for the options that are set
+
+    Raises:
+        HTTPException: 400 if the page selection or heading regex is invalid
+    """
+    options = {}
+    if pages:
+        try:
+            parse_page_ranges(pages)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        options["pages"] = pages
+    if start_heading:
+        try:
+            re.compile(start_heading)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid start_heading regex: {e}")
+        options["start_heading"] = start_heading
+    return options
+
+
+async def run_stage(stage: str, func, *args, **kwargs):
+    """run_in_pool() that records the call duration as a pipeline stage metric."""
+    started = time.perf_counter()
+    result = await run_in_pool(func, *args, **kwargs)
+    stage_latency.observe(time.perf_counter() - started, stage=stage)
+    return result
+
+
+def record_timings(timings: Dict[str, float]) -> None:
+    """Record per-stage timings (seconds) computed elsewhere, e.g. in a batch worker process."""
+    for stage, seconds in timings.items():
+        stage_latency.observe(seconds, stage=stage)
+
+
+async def convert_document(
+    source_file: Path,
+    content_hash: str,
+    clean_before_convert: bool = True,
+    work_dir: Optional[Path] = None,
+    on_stage: Optional[Callable[[str, Optional[float]], Awaitable[None]]] = None,
+    extract_options: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the clean -> markdown pipeline for an uploaded file, using the result cache.
+
+    Args:
+        source_file: Path to the uploaded file
+        content_hash: SHA-256 hex digest of the uploaded bytes
+        clean_before_convert: Clean PDF/DOCX files before conversion
+        work_dir: Directory for intermediate files (default: next to source_file)
+        on_stage: Optional coroutine function awaited as on_stage(stage, None) when a
+            stage ("clean", "markdown") starts and on_stage(stage, seconds) when it finishes
+        extract_options: Partial extraction options from extraction_options()
+
+    Returns:
+        Markdown result dictionary from MarkdownConverter, plus "cache_hit" and
+        per-stage "timings" (seconds)
+    """
+    file_ext = source_file.suffix.lower()
+    should_clean = clean_before_convert and file_ext in {".pdf", ".docx"}
+
+    cache_key = markdown_cache_key(content_hash, file_ext, clean_before_convert, extract_options)
+    cached_result = await get_cached_result(cache_key, source_file)
+    if cached_result is not None:
+        logger.info(f"Result cache hit for {source_file.name} ({content_hash[:12]})")
+        cached_result["cache_hit"] = True
+        cached_result["timings"] = {}
+        return cached_result
+
+    timings = {}
+
+    # Clean file if requested (for PDF/DOCX only)
+    file_to_convert, cleaned_data = await clean_for_conversion(
+        source_file, should_clean, timings, work_dir, on_stage, content_hash=content_hash
+    )
+
+    # Convert to markdown from file (or from the cleaned PDF in memory)
+    logger.info("Converting file to markdown...")
+    if on_stage:
+        await on_stage("markdown", None)
+    started = time.perf_counter()
+    markdown_result = await run_in_pool(
+        convert_markdown,
+        MARKDOWN_CONVERTER_OPTIONS,
+        str(file_to_convert),
+        data=cleaned_data,
+        **(extract_options or {}),
+    )
+    timings["markdown"] = time.perf_counter() - started
+    if on_stage:
+        await on_stage("markdown", timings["markdown"])
+
+    await finish_conversion(cache_key, markdown_result, timings)
+    return markdown_result
+
+
+async def clean_for_conversion(
+    source_file: Path,
+    should_clean: bool,
+    timings: Dict[str, float],
+    work_dir: Optional[Path] = None,
+    on_stage: Optional[Callable[[str, Optional[float]], Awaitable[None]]] = None,
+    content_hash: Optional[str] = None,
+) -> Tuple[Path, Optional[bytes]]:
+    """
+    Run the optional clean stage of convert_document().
+
+    Small PDFs are cleaned in memory (see IN_MEMORY_PDF_MAX_BYTES); everything
+    else is cleaned into a file in work_dir. Either way bytes cleaned before are
+    taken from the cleaned file cache (content_hash saves hashing the file again).
+
+    Returns:
+        Tuple of (path of the file to convert, cleaned PDF bytes or None). The path
+        is the cleaned file, or source_file if cleaning was not requested, failed
+        or happened in memory; pass both to MarkdownConverter.convert(path, data=...)
+    """
+    if not should_clean:
+        return source_file, None
+
+    in_memory = (
+        IN_MEMORY_PDF_MAX_BYTES > 0
+        and source_file.suffix.lower() == ".pdf"
+        and source_file.stat().st_size <= IN_MEMORY_PDF_MAX_BYTES
+    )
+
+    logger.info(f"Cleaning file before conversion: {source_file.name}")
+    if on_stage:
+        await on_stage("clean", None)
+    started = time.perf_counter()
+    if in_memory:
+        success, message, cleaned = await run_in_pool(
+            file_cleaner.clean_pdf_in_memory, str(source_file), content_hash=content_hash
+        )
+    else:
+        success, message, cleaned = await run_in_pool(
+            file_cleaner.clean_file, str(source_file), str(work_dir or source_file.parent), content_hash=content_hash
+        )
+    timings["clean"] = time.perf_counter() - started
+    if on_stage:
+        await on_stage("clean", timings["clean"])
+
+    if success and cleaned:
+        if in_memory:
+            logger.info(f"Using cleaned PDF from memory ({len(cleaned)} bytes)")
+            return source_file, cleaned
+        logger.info(f"Using cleaned file: {cleaned}")
+        return Path(cleaned), None
+
+    logger.warning(f"File cleaning skipped, using original: {message}")
+    return source_file, None
+
+
+async def get_cached_result(cache_key: str, source_file: Path) -> Optional[Dict[str, Any]]:
+    """
+    Look up a markdown result in the result cache without blocking the event loop.
+
+    Cached results are stored without a source file (see store_result()); a hit
+    reports the file of the current request instead.
+    """
+    cached_result = await asyncio.to_thread(result_cache.get, cache_key)
+    if cached_result is not None:
+        cached_result.setdefault("metadata", {})["source_file"] = str(source_file)
+    return cached_result
+
+
+async def store_result(cache_key: str, markdown_result: Dict[str, Any]) -> None:
+    """Store a markdown result in the result cache without blocking the event loop."""
+    # The source file is a temp path of the request that produced the result, and
+    # memory and page cache stats describe that run only; neither is replayed on hits
+    metadata = {
+        key: value
+        for key, value in markdown_result.get("metadata", {}).items()
+        if key not in ("source_file", "page_cache")
+    }
+    if "low_memory" in metadata:
+        metadata["low_memory"] = {
+            key: value for key, value in metadata["low_memory"].items() if key != "peak_rss_delta_mb"
+        }
+    await asyncio.to_thread(result_cache.put, cache_key, {**markdown_result, "metadata": metadata})
+
+
+async def finish_conversion(cache_key: str, markdown_result: Dict[str, Any], timings: Dict[str, float]) -> None:
+    """Record metrics for a fresh markdown result and store it in the result cache."""
+    # Converter sub-stage timings are reported as metrics but never cached
+    timings.update(markdown_result.pop("timings", {}))
+    record_timings(timings)
+    if "page_count" in markdown_result.get("metadata", {}):
+        document_pages.observe(markdown_result["metadata"]["page_count"])
+
+    await store_result(cache_key, markdown_result)
+    markdown_result["cache_hit"] = False
+    markdown_result["timings"] = timings
+
+
+async def collect_workspace_garbage() -> None:
+    """Periodically reclaim expired outputs and abandoned workspaces."""
+    while True:
+        try:
+            await asyncio.to_thread(workspace_manager.collect_garbage)
+            if cleaned_file_cache:
+                await asyncio.to_thread(cleaned_file_cache.collect_garbage)
+        except Exception as e:
+            logger.warning(f"Workspace GC failed: {e}")
+        await asyncio.sleep(WORKSPACE_GC_INTERVAL)
+
+
+def update_state_gauges() -> None:
+    """Copy current result cache and worker pool state into gauges."""
+    cache_stats = result_cache.stats()
+    for field in ("hits", "misses", "hit_ratio", "evictions", "memory_bytes", "disk_bytes", "disk_entries"):
+        cache_gauge.set(cache_stats[field], field=field)
+
+    for pool in (worker_pool, batch_pool):
+        pool_stats = pool.stats()
+        pool_gauge.set(pool_stats["max_workers"], pool=pool.name, field="workers")
+        for field in ("in_flight", "queue_depth", "completed", "rejected"):
+            pool_gauge.set(pool_stats[field], pool=pool.name, field=field)
+
+
+async def flush_metrics() -> None:
+    """Periodically publish this worker's metrics for the other workers' /metrics."""
+    while True:
+        try:
+            update_state_gauges()
+            await asyncio.to_thread(metrics.write_snapshot)
+        except Exception as e:
+            logger.warning(f"Metrics snapshot failed: {e}")
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+
+
+def warm_up_pipeline() -> None:
+    """Run a synthetic document through the shared converters before serving traffic."""
+    warm_up(file_cleaner, markdown_converter, bullet_converter, html_converter)
+
+
+def schedule_job(job_id: str) -> None:
+    """Run a job in the background, keeping a reference until it finishes."""
+    task = asyncio.create_task(run_job(job_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def run_job(job_id: str) -> None:
+    """
+    Run the clean -> markdown -> bullet/html pipeline for a queued job.
+
+    Progress and per-stage timings are written to the job store as each stage
+    finishes. When the worker pool is full the job waits and retries instead of failing.
+    SQLite calls run in a thread, so a slow disk does not stall the event loop.
+    """
+    job = await asyncio.to_thread(job_store.get, job_id, include_result=False)
+    if job is None:
+        return
+    input_path = Path(await asyncio.to_thread(job_store.get_input_path, job_id) or "")
+    options = job["options"]
+
+    async def record_stage(stage: str, seconds: Optional[float]) -> None:
+        if seconds is None:
+            await asyncio.to_thread(job_store.start_stage, job_id, stage)
+        else:
+            await asyncio.to_thread(job_store.finish_stage, job_id, stage, seconds)
+
+    async with job_slots:
+        while True:
+            try:
+                if not input_path.is_file():
+                    await asyncio.to_thread(job_store.fail, job_id, "Uploaded file is no longer available")
+                    return
+
+                markdown_result = await convert_document(
+                    input_path,
+                    options["content_hash"],
+                    options["clean_before_convert"],
+                    work_dir=input_path.parent,
+                    on_stage=record_stage,
+                    extract_options=options.get("extract_options"),
+                )
+
+                if markdown_result["cache_hit"]:
+                    for stage in ("clean", "markdown"):
+                        if stage in job["stages"]:
+                            await asyncio.to_thread(job_store.finish_stage, job_id, stage, 0, status="cached")
+
+                markdown_content = markdown_result["markdown"]
+                result = {
+                    "markdown_content": markdown_content,
+                    "metadata": markdown_result.get("metadata", {}),
+                    "cached": markdown_result["cache_hit"],
+                }
+
+                output_format = options["output_format"]
+                if output_format == "bullet":
+                    await record_stage("bullet", None)
+                    started = time.perf_counter()
+                    result["bullet_content"] = await run_stage("bullet", bullet_converter.convert, markdown_content)
+                    await record_stage("bullet", time.perf_counter() - started)
+                elif output_format == "html":
+                    await record_stage("html", None)
+                    started = time.perf_counter()
+                    result["html_content"] = await run_stage(
+                        "html", html_converter.markdown_to_html, markdown_content, result["metadata"]
+                    )
+                    await record_stage("html", time.perf_counter() - started)
+
+                await asyncio.to_thread(job_store.complete, job_id, result)
+                break
+
+            except HTTPException as e:
+                if e.status_code != 503:
+                    await asyncio.to_thread(job_store.fail, job_id, str(e.detail))
+                    break
+                # Worker pool is saturated - stay queued and try again shortly
+                await asyncio.to_thread(job_store.set_status, job_id, "queued")
+                await asyncio.sleep(2)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                await asyncio.to_thread(job_store.fail, job_id, str(e))
+                break
+
+    await asyncio.to_thread(shutil.rmtree, input_path.parent, ignore_errors=True)
+
+
+async def save_upload(file: UploadFile, destination: Path) -> SpooledUpload:
+    """
+    Stream an upload to disk without holding it in memory.
+
+    Raises:
+        HTTPException: 413 if the file exceeds MAX_UPLOAD_MB
+    """
+    try:
+        upload = await spool_upload(file, destination, max_size=MAX_UPLOAD_SIZE, chunk_size=UPLOAD_CHUNK_SIZE)
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejected upload {file.filename}: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    upload_size.observe(upload.size)
+    return upload
+
+
+BATCH_EXTENSIONS = {".pdf", ".docx", ".pptx", ".csv", ".txt"}
+
+
+def expand_archive(archive_path: Path, destination: Path, first_index: int) -> List[Dict[str, Any]]:
+    """
+    Extract the documents of a zip archive, one subdirectory per member.
+
+    Member names are reduced to their base name, so entries cannot escape the
+    workspace. Directories and hidden/metadata entries are skipped.
+
+    Args:
+        archive_path: Uploaded .zip file
+        destination: Workspace directory
+        first_index: Batch index of the first extracted member
+
+    Returns:
+        Batch items: {"index", "filename", "path", "size", "sha256"} or {"index", "filename", "error"}
+    """
+    items = []
+    with zipfile.ZipFile(archive_path) as archive:
+        for member in archive.infolist():
+            filename = Path(member.filename).name
+            if member.is_dir() or not filename or filename.startswith(".") or "__MACOSX" in member.filename:
+                continue
+
+            index = first_index + len(items)
+            if index >= BATCH_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Too many files in batch (max {BATCH_MAX_FILES})")
+
+            item = {"index": index, "filename": filename}
+            items.append(item)
+
+            if Path(filename).suffix.lower() not in BATCH_EXTENSIONS:
+                item["error"] = f"Invalid file type: {Path(filename).suffix.lower()}"
+                continue
+            if member.file_size > MAX_UPLOAD_SIZE:
+                item["error"] = f"File too large: {member.file_size} bytes (max {MAX_UPLOAD_SIZE} bytes)"
+                continue
+
+            item_dir = destination / f"{index:04d}"
+            item_dir.mkdir()
+            try:
+                with archive.open(member) as source:
+                    # The size check is repeated while reading; headers can lie
+                    spooled = spool_file(source, item_dir / filename, MAX_UPLOAD_SIZE, UPLOAD_CHUNK_SIZE)
+            except (UploadTooLargeError, zipfile.BadZipFile, OSError) as e:
+                item["error"] = str(e)
+                continue
+            item.update(path=spooled.path, size=spooled.size, sha256=spooled.sha256)
+
+    return items
+
+
+async def convert_batch_item(
+    item: Dict[str, Any],
+    output_format: str,
+    clean_before_convert: bool,
+    slots: asyncio.Semaphore,
+    extract_options: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the pipeline for one batch file in the batch process pool.
+
+    Never raises: failures are reported in the returned NDJSON entry.
+    extract_options (from extraction_options()) apply to every file of the batch.
+
+    Returns:
+        Per-file result entry with status, outputs, timings and cache flag
+    """
+    entry = {"type": "result", "index": item["index"], "filename": item["filename"], "size": item.get("size", 0)}
+    if "error" in item:
+        entry.update(status="error", error=item["error"])
+        return entry
+
+    started = time.perf_counter()
+    source_file = item["path"]
+    file_ext = source_file.suffix.lower()
+    csv_html = output_format == "html" and file_ext == ".csv"
+    cache_key = markdown_cache_key(item["sha256"], file_ext, clean_before_convert, extract_options)
+    cached_result = None if csv_html else await get_cached_result(cache_key, source_file)
+
+    try:
+        if cached_result is not None and output_format == "markdown":
+            outcome = {"markdown_result": cached_result, "timings": {}}
+        else:
+            async with slots:
+                while True:
+                    try:
+                        outcome = await batch_pool.run(
+                            process_document,
+                            str(source_file),
+                            output_format,
+                            clean_before_convert,
+                            str(source_file.parent),
+                            cached_result,
+                            IN_MEMORY_PDF_MAX_BYTES,
+                            extract_options,
+                        )
+                        break
+                    except WorkerPoolFullError:
+                        # Other batches hold the pool; wait instead of failing the file
+                        await asyncio.sleep(0.5)
+
+        record_timings(outcome["timings"])
+        markdown_result = outcome["markdown_result"]
+        if markdown_result is not None:
+            if cached_result is None:
+                if "page_count" in markdown_result.get("metadata", {}):
+                    document_pages.observe(markdown_result["metadata"]["page_count"])
+                await store_result(cache_key, markdown_result)
+            entry["markdown_content"] = markdown_result["markdown"]
+            entry["metadata"] = markdown_result.get("metadata", {})
+        for key in ("bullet_content", "html_content"):
+            if key in outcome:
+                entry[key] = outcome[key]
+
+        entry.update(
+            status="success",
+            cached=cached_result is not None,
+            timings={stage: round(seconds, 3) for stage, seconds in outcome["timings"].items()},
+        )
+    except Exception as e:
+        logger.error(f"Batch file {item['filename']} failed: {e}", exc_info=True)
+        entry.update(status="error", error=str(e))
+
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route template (not per raw path)."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        http_requests.inc(method=request.method, route=route_path, status=str(status_code))
+        http_latency.observe(time.perf_counter() - started, method=request.method, route=route_path)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -97,31 +801,34 @@ async def clean_file(file: UploadFile = File(...)):
 
     logger.info(f"Cleaning file: {file.filename}")
 
-    # Save uploaded file temporarily
-    temp_dir = Path("temp")
-    temp_dir.mkdir(exist_ok=True)
-    temp_file = temp_dir / file.filename
+    # Save uploaded file in an isolated per-request workspace
+    workspace = workspace_manager.create()
+    temp_file = workspace.file(file.filename)
 
     try:
-        # Save file
-        content = await file.read()
-        with open(temp_file, "wb") as f:
-            f.write(content)
+        # Copy the parsed upload into the workspace in chunks
+        upload = await save_upload(file, temp_file)
 
-        # Clean file
-        success, message, output_path = file_cleaner.clean_file(str(temp_file))
+        # Clean file into this workspace's download directory (a cached cleaned file is copied there)
+        output_dir = workspace_manager.output_dir_for(workspace)
+        success, message, output_path = await run_stage(
+            "clean", file_cleaner.clean_file, str(temp_file), str(output_dir), content_hash=upload.sha256
+        )
 
         if not success:
             logger.error(f"File cleaning failed: {message}")
+            shutil.rmtree(output_dir, ignore_errors=True)
             raise HTTPException(status_code=400, detail=message)
 
         logger.info(f"File cleaned successfully: {output_path}")
+        output_name = workspace_manager.relative_output_name(Path(output_path))
 
         return {
             "status": "success",
             "message": message,
-            "filename": Path(output_path).name,
+            "filename": output_name,
             "output_path": output_path,
+            "download_url": f"/documents/download/{output_name}",
         }
 
     except HTTPException:
@@ -131,15 +838,17 @@ async def clean_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        # Clean up temp file
-        if temp_file.exists():
-            temp_file.unlink()
+        # Remove the request workspace (upload and intermediate files)
+        workspace_manager.release(workspace)
 
 
 @app.post("/documents/markdown")
 async def convert_to_markdown(
+    request: Request,
     file: UploadFile = File(...),
     clean_before_convert: bool = True,
+    pages: Optional[str] = None,
+    start_heading: Optional[str] = None,
 ):
     """
     Convert document to markdown format.
@@ -147,8 +856,11 @@ async def convert_to_markdown(
     Optionally cleans file first (removes watermarks, headers, footers).
 
     Args:
+        request: Incoming HTTP request (Accept-Encoding for response compression)
         file: Document file (PDF, DOCX, PPTX, CSV)
         clean_before_convert: If True, clean PDF/DOCX before conversion (default: True)
+        pages: PDF only - pages to extract, e.g. "5-12,20" or "30-"
+        start_heading: PDF only - regex; start at the first line matching it
 
     Returns:
         Markdown content
@@ -162,79 +874,60 @@ async def convert_to_markdown(
             status_code=400,
             detail=f"Invalid file type. Only PDF, DOCX, PPTX, CSV are allowed. Got: {file_ext}"
         )
+    extract_options = extraction_options(pages, start_heading)
 
     logger.info(f"Converting to markdown: {file.filename}")
 
-    # Save uploaded file temporarily
-    temp_dir = Path("temp")
-    temp_dir.mkdir(exist_ok=True)
-    temp_file = temp_dir / file.filename
+    # Save uploaded file in an isolated per-request workspace
+    workspace = workspace_manager.create()
+    temp_file = workspace.file(file.filename)
 
     try:
-        # Save file
-        content = await file.read()
-        with open(temp_file, "wb") as f:
-            f.write(content)
-
-        # Clean file if requested (for PDF/DOCX only)
-        file_to_convert = temp_file
-        if clean_before_convert and file_ext in {".pdf", ".docx"}:
-            logger.info(f"Cleaning file before conversion: {file.filename}")
-            success, message, cleaned_path = file_cleaner.clean_file(str(temp_file))
-
-            if success and cleaned_path:
-                file_to_convert = Path(cleaned_path)
-                logger.info(f"Using cleaned file: {cleaned_path}")
-            else:
-                logger.warning(f"File cleaning skipped, using original: {message}")
+        # Stream file to disk, hashing it on the fly for the result cache
+        upload = await save_upload(file, temp_file)
 
-        # Convert to markdown from file
-        logger.info("Converting file to markdown...")
-        markdown_result = markdown_converter.convert(str(file_to_convert))
+        # Clean (optional) and convert, reusing cached results for identical uploads
+        markdown_result = await convert_document(
+            temp_file, upload.sha256, clean_before_convert, extract_options=extract_options
+        )
         markdown_content = markdown_result["markdown"]
         logger.info(f"Extracted markdown ({len(markdown_content)} characters)")
 
         metadata = {
-            "source_file": str(file_to_convert),
+            "source_file": markdown_result.get("metadata", {}).get("source_file", str(temp_file)),
             "markdown_source": "extracted",
         }
+        if "extracted_pages" in markdown_result.get("metadata", {}):
+            metadata["extracted_pages"] = markdown_result["metadata"]["extracted_pages"]
 
-        # Save to sample/markdown_v1.md for review
-        sample_dir = Path("sample")
-        sample_dir.mkdir(exist_ok=True)
-        markdown_output_path = sample_dir / "markdown_v1.md"
-
-        with open(markdown_output_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
-
-        logger.info(f"✓ Saved to: {markdown_output_path} (source: {markdown_source})")
-
-        return {
+        return await FastJSONResponse.create({
             "filename": file.filename,
             "markdown_content": markdown_content,
             "metadata": metadata,
             "cleaned": clean_before_convert and file_ext in {".pdf", ".docx"},
-            "output_file": str(markdown_output_path),
-            "message": f"Markdown saved to {markdown_output_path}"
-        }
+            "cached": markdown_result["cache_hit"],
+            "message": f"Markdown extracted ({len(markdown_content)} characters)"
+        }, request=request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error converting document: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        # Clean up temp file
-        if temp_file.exists():
-            temp_file.unlink()
+        # Remove the request workspace (upload and intermediate files)
+        workspace_manager.release(workspace)
 
 
 @app.post("/documents/split")
-async def split_by_table(request: MarkdownChunkRequest):
+async def split_by_table(request: MarkdownChunkRequest, http_request: Request):
     """
     Split markdown document by tables with hierarchy preservation.
 
     Args:
         request: Markdown content to split
+        http_request: Incoming HTTP request (Accept-Encoding for response compression)
 
     Returns:
         JSON array of table chunks with metadata
@@ -243,16 +936,18 @@ async def split_by_table(request: MarkdownChunkRequest):
         logger.info("Processing split request...")
 
         # Parse and split tables
-        chunks = document_splitter.parse_markdown(request.markdown_content)
+        chunks = await run_stage("split", document_splitter.parse_markdown, request.markdown_content)
 
         logger.info(f"Successfully split document into {len(chunks)} chunks")
 
-        return {
+        return await FastJSONResponse.create({
             "status": "success",
             "total_chunks": len(chunks),
             "chunks": chunks
-        }
+        }, request=http_request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error splitting document: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -279,7 +974,7 @@ async def convert_text_to_bullet(request: BulletRequest):
             raise HTTPException(status_code=400, detail="Text content cannot be empty")
 
         # Convert to bullet format
-        bullet_content = bullet_converter.convert(request.text)
+        bullet_content = await run_stage("bullet", bullet_converter.convert, request.text)
 
         logger.info("Successfully converted text to bullet format")
 
@@ -296,39 +991,32 @@ async def convert_text_to_bullet(request: BulletRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/documents/download/{filename}")
+@app.get("/documents/download/{filename:path}")
 async def download_file(filename: str):
     """
     Download cleaned or processed file.
 
     Args:
-        filename: Name of the file to download (from temp/cleaned/ directory)
+        filename: Name of the file to download, relative to the output directory
+            (as returned by /documents/cleanfile and /documents/list-files)
 
     Returns:
         File for download
     """
-    # Security: only allow files from temp/cleaned directory
-    # Use absolute path from current working directory
-    base_dir = Path.cwd()
-    temp_dir = base_dir / "temp" / "cleaned"
-    file_path = temp_dir / filename
+    logger.debug(f"Download request: filename={filename}, output_dir={workspace_manager.output_dir}")
 
-    logger.debug(f"Download request: filename={filename}, temp_dir={temp_dir}, file_path={file_path}")
-
-    # Prevent directory traversal attacks
+    # Security: only allow files from the output directory (prevents directory traversal)
     try:
-        file_path = file_path.resolve()
-        temp_dir = temp_dir.resolve()
-        if not str(file_path).startswith(str(temp_dir)):
-            logger.warning(f"Access denied: {file_path} not in {temp_dir}")
-            raise HTTPException(status_code=403, detail="Access denied")
-    except HTTPException:
-        raise
+        file_path = workspace_manager.resolve_output(filename)
     except Exception as e:
         logger.error(f"Path validation error: {e}")
         raise HTTPException(status_code=403, detail="Invalid file path")
 
-    if not file_path.exists():
+    if file_path is None:
+        logger.warning(f"Access denied: {filename} not in {workspace_manager.output_dir}")
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    if not file_path.is_file():
         logger.warning(f"File not found: {file_path}")
         raise HTTPException(status_code=404, detail=f"File not found: {filename}")
 
@@ -336,7 +1024,7 @@ async def download_file(filename: str):
 
     return FileResponse(
         path=file_path,
-        filename=filename,
+        filename=file_path.name,
         media_type="application/octet-stream"
     )
 
@@ -349,25 +1037,15 @@ async def list_cleaned_files():
     Returns:
         List of cleaned files with download URLs
     """
-    # Use absolute path from current working directory
-    base_dir = Path.cwd()
-    temp_dir = base_dir / "temp" / "cleaned"
-    temp_dir.mkdir(parents=True, exist_ok=True)
-
-    logger.debug(f"Listing files from: {temp_dir}")
+    output_dir = workspace_manager.output_dir
+    logger.debug(f"Listing files from: {output_dir}")
 
     files = []
-    if temp_dir.exists():
-        for file_path in sorted(temp_dir.glob("*"), key=lambda p: p.stat().st_mtime, reverse=True):
-            if file_path.is_file():
-                files.append({
-                    "filename": file_path.name,
-                    "size": file_path.stat().st_size,
-                    "modified": file_path.stat().st_mtime,
-                    "download_url": f"/documents/download/{file_path.name}"
-                })
+    for entry in workspace_manager.list_outputs():
+        entry["download_url"] = f"/documents/download/{entry['filename']}"
+        files.append(entry)
 
-    logger.info(f"Listed {len(files)} cleaned files from {temp_dir}")
+    logger.info(f"Listed {len(files)} cleaned files from {output_dir}")
 
     return {
         "total": len(files),
@@ -375,19 +1053,45 @@ async def list_cleaned_files():
     }
 
 
+def save_html_output(filename: str, html_content: str) -> Path:
+    """Write converted HTML to sample/<stem>.html (runs after the response is sent)."""
+    output_dir = Path("sample")
+    output_dir.mkdir(exist_ok=True)
+    output_path = output_dir / f"{Path(filename).stem}.html"
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+    logger.info(f"✓ Saved HTML: {output_path}")
+    return output_path
+
+
 @app.post("/documents/html")
 async def convert_to_html(
     file: UploadFile = File(...),
-    clean_before_convert: bool = True
+    clean_before_convert: bool = True,
+    stream: bool = False,
+    save_output: bool = True,
+    pages: Optional[str] = None,
+    start_heading: Optional[str] = None,
 ):
     """
     Convert document to HTML format.
 
     Supports: PDF, DOCX, DOC, CSV, PPTX, TXT
 
+    With stream=True the document head and CSS are sent immediately, followed
+    by body fragments page by page (or section by section) and the closing
+    tags, so browsers can start rendering before the whole document is ready.
+    The page title then comes from the file metadata, read before conversion.
+
     Args:
         file: Document file to convert
         clean_before_convert: Clean file before conversion (PDF/DOCX only)
+        stream: Stream the HTML in pieces instead of one response (non-CSV files)
+        save_output: Also write the HTML to sample/<stem>.html, after the response
+        pages: PDF only - pages to extract, e.g. "5-12,20" or "30-"
+        start_heading: PDF only - regex; start at the first line matching it
 
     Returns:
         HTML content rendered as page
@@ -400,80 +1104,460 @@ async def convert_to_html(
             status_code=400,
             detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}. Got: {file_ext}"
         )
+    extract_options = extraction_options(pages, start_heading)
 
     logger.info(f"Converting to HTML: {file.filename}")
 
-    # Save uploaded file temporarily
-    temp_dir = Path("temp")
-    temp_dir.mkdir(exist_ok=True)
-    temp_file = temp_dir / file.filename
+    # Save uploaded file in an isolated per-request workspace
+    workspace = workspace_manager.create()
+    temp_file = workspace.file(file.filename)
+    # A streamed response releases the workspace itself once the body is sent
+    streaming = False
 
     try:
-        # Save file
-        content = await file.read()
-        with open(temp_file, "wb") as f:
-            f.write(content)
-
-        # Clean file if requested
-        file_to_convert = temp_file
-        if clean_before_convert and file_ext in {".pdf", ".docx"}:
-            logger.info(f"Cleaning file before conversion: {file.filename}")
-            success, message, cleaned_path = file_cleaner.clean_file(str(temp_file))
-
-            if success and cleaned_path:
-                file_to_convert = Path(cleaned_path)
-                logger.info(f"Using cleaned file: {cleaned_path}")
-            else:
-                logger.warning(f"File cleaning skipped, using original: {message}")
+        # Stream file to disk, hashing it on the fly for the result cache
+        upload = await save_upload(file, temp_file)
 
         # Special handling for CSV
         if file_ext == ".csv":
-            csv_content = file_to_convert.read_text(encoding="utf-8")
-            html_content = html_converter.csv_to_html(csv_content)
-
-            # Save HTML
-            output_dir = Path("sample")
-            output_dir.mkdir(exist_ok=True)
-            html_filename = f"{Path(file.filename).stem}.html"
-            output_path = output_dir / html_filename
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-
-            logger.info(f"✓ Converted CSV to HTML: {output_path}")
-
-            return HTMLResponse(content=html_content, status_code=200)
-
-        # For other formats: convert to markdown first, then to HTML
-        logger.info("Converting file to markdown...")
-        markdown_result = markdown_converter.convert(str(file_to_convert))
+            csv_content = temp_file.read_text(encoding="utf-8")
+            html_content = await run_stage("html", html_converter.csv_to_html, csv_content)
+
+            logger.info(f"✓ Converted CSV to HTML: {file.filename}")
+
+            return HTMLResponse(
+                content=html_content,
+                status_code=200,
+                background=BackgroundTask(save_html_output, file.filename, html_content) if save_output else None,
+            )
+
+        if stream:
+            # Read before responding, so unreadable files still fail with an error status
+            head_metadata = await asyncio.to_thread(markdown_converter.read_metadata, str(temp_file))
+            streaming = True
+            return StreamingResponse(
+                stream_html(file.filename, temp_file, upload, clean_before_convert, save_output,
+                            head_metadata, workspace, extract_options),
+                media_type="text/html; charset=utf-8",
+                headers={"X-Accel-Buffering": "no"},
+            )
+
+        # For other formats: convert to markdown first (cached), then to HTML
+        markdown_result = await convert_document(
+            temp_file, upload.sha256, clean_before_convert, extract_options=extract_options
+        )
         markdown_content = markdown_result["markdown"]
 
         # Convert markdown to HTML
         metadata = markdown_result.get("metadata", {})
-        html_content = html_converter.markdown_to_html(markdown_content, metadata)
+        html_content = await run_stage("html", html_converter.markdown_to_html, markdown_content, metadata)
 
-        # Save HTML
-        output_dir = Path("sample")
-        output_dir.mkdir(exist_ok=True)
-        html_filename = f"{Path(file.filename).stem}.html"
-        output_path = output_dir / html_filename
+        logger.info(f"✓ Converted to HTML: {file.filename}")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
-        logger.info(f"✓ Converted to HTML: {output_path}")
-
-        return HTMLResponse(content=html_content, status_code=200)
+        return HTMLResponse(
+            content=html_content,
+            status_code=200,
+            headers={"X-Cache": "HIT" if markdown_result["cache_hit"] else "MISS"},
+            background=BackgroundTask(save_html_output, file.filename, html_content) if save_output else None,
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error converting to HTML: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        # Clean up temp file
-        if temp_file.exists():
-            temp_file.unlink()
+        # Remove the request workspace (upload and intermediate files)
+        if not streaming:
+            workspace_manager.release(workspace)
+
+
+async def stream_html(
+    filename: str,
+    source_file: Path,
+    upload: SpooledUpload,
+    clean_before_convert: bool,
+    save_output: bool,
+    head_metadata: Dict[str, Any],
+    workspace: Workspace,
+    extract_options: Optional[Dict[str, str]] = None,
+):
+    """
+    Yield an HTML document for /documents/html?stream=true.
+
+    The head goes out before conversion starts; body fragments follow per
+    page/section. On a result cache miss with a thread worker pool, pages are
+    rendered while the PDF is still being extracted. Errors after the head has
+    been sent are reported inside the document, since the status code can no
+    longer change.
+    """
+    pieces = []
+    try:
+        head = html_converter.document_head(head_metadata)
+        pieces.append(head)
+        yield head
+
+        file_ext = source_file.suffix.lower()
+        cache_key = markdown_cache_key(upload.sha256, file_ext, clean_before_convert, extract_options)
+        # Only PDFs are extracted page by page, and generators cannot cross into a
+        # process pool, so extraction is only streamed for PDFs on a thread pool
+        stream_extraction = file_ext == ".pdf" and worker_pool.kind == "thread"
+        markdown_result = await get_cached_result(cache_key, source_file) if stream_extraction else None
+
+        if stream_extraction and markdown_result is None:
+            fragments = stream_html_body(
+                source_file, cache_key, clean_before_convert and file_ext in {".pdf", ".docx"}, extract_options
+            )
+            async for fragment in fragments:
+                pieces.append(fragment)
+                yield fragment
+        else:
+            if markdown_result is None:
+                markdown_result = await convert_document(
+                    source_file, upload.sha256, clean_before_convert, extract_options=extract_options
+                )
+
+            started = time.perf_counter()
+            fragments = html_converter.iter_html_body(markdown_result["markdown"])
+            while True:
+                fragment = await asyncio.to_thread(next, fragments, None)
+                if fragment is None:
+                    break
+                pieces.append(fragment)
+                yield fragment
+            stage_latency.observe(time.perf_counter() - started, stage="html")
+
+        tail = html_converter.document_tail()
+        pieces.append(tail)
+        yield tail
+
+        logger.info(f"✓ Streamed HTML: {filename}")
+        if save_output:
+            await asyncio.to_thread(save_html_output, filename, "".join(pieces))
+
+    except Exception as e:
+        logger.error(f"Error streaming HTML: {e}", exc_info=True)
+        yield f'\n<p class="error">Conversion failed: {html.escape(str(e))}</p>' + html_converter.document_tail()
+
+    finally:
+        workspace_manager.release(workspace)
+
+
+async def stream_html_body(
+    source_file: Path,
+    cache_key: str,
+    should_clean: bool,
+    extract_options: Optional[Dict[str, str]] = None,
+):
+    """
+    Clean and convert a file, yielding HTML body fragments as pages are extracted.
+
+    Each step of the markdown -> HTML generator chain runs in the (thread) worker
+    pool. The finished markdown is stored in the result cache like convert_document() does.
+    """
+    timings: Dict[str, float] = {}
+    file_to_convert, cleaned_data = await clean_for_conversion(source_file, should_clean, timings)
+
+    converter_result: Dict[str, Any] = {}
+    chunks: List[str] = []
+
+    def markdown_chunks():
+        for chunk in markdown_converter.iter_markdown(
+            str(file_to_convert), result=converter_result, data=cleaned_data, **(extract_options or {})
+        ):
+            chunks.append(chunk)
+            yield chunk
+
+    started = time.perf_counter()
+    fragments = html_converter.iter_html_body_stream(markdown_chunks())
+    while True:
+        fragment = await run_in_pool(next, fragments, None)
+        if fragment is None:
+            break
+        yield fragment
+    elapsed = time.perf_counter() - started
+
+    # Extraction and rendering are interleaved; the converter reports its own share
+    converter_timings = converter_result.get("timings", {})
+    timings["markdown"] = sum(converter_timings.values())
+    stage_latency.observe(max(0.0, elapsed - timings["markdown"]), stage="html")
+
+    await finish_conversion(cache_key, {
+        "markdown": "".join(chunks),
+        "metadata": converter_result.get("metadata", {}),
+        "timings": converter_timings,
+    }, timings)
+
+
+@app.post("/documents/batch")
+async def convert_batch(
+    files: List[UploadFile] = File(...),
+    output_format: str = "markdown",
+    clean_before_convert: bool = True,
+    pages: Optional[str] = None,
+    start_heading: Optional[str] = None,
+):
+    """
+    Convert many documents in one request.
+
+    Accepts several files and/or zip archives of files. Each document runs
+    through clean -> markdown -> bullet/html in the batch process pool, and one
+    NDJSON line is streamed back per file as soon as it finishes (in completion
+    order, with its upload "index"). The last line holds aggregate throughput stats.
+
+    Args:
+        files: Documents (PDF, DOCX, PPTX, CSV, TXT) or .zip archives of documents
+        output_format: "markdown", "bullet" or "html"
+        clean_before_convert: If True, clean PDF/DOCX before conversion (default: True)
+        pages: PDF only - pages to extract from every PDF, e.g. "5-12,20" or "30-"
+        start_heading: PDF only - regex; start each PDF at the first line matching it
+
+    Returns:
+        application/x-ndjson stream of {"type": "result", ...} lines and a final {"type": "summary", ...}
+    """
+    if output_format not in JOB_OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output_format. Allowed: {', '.join(sorted(JOB_OUTPUT_FORMATS))}. Got: {output_format}"
+        )
+    extract_options = extraction_options(pages, start_heading)
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files in batch (max {BATCH_MAX_FILES})")
+
+    workspace = workspace_manager.create()
+    items: List[Dict[str, Any]] = []
+
+    try:
+        for file in files:
+            filename = Path(file.filename or "").name
+            file_ext = Path(filename).suffix.lower()
+            index = len(items)
+
+            if file_ext == ".zip":
+                archive_path = workspace.file(f"{uuid.uuid4().hex}.zip")
+                await save_upload(file, archive_path)
+                try:
+                    items.extend(await asyncio.to_thread(expand_archive, archive_path, workspace.path, index))
+                except zipfile.BadZipFile:
+                    items.append({"index": index, "filename": filename, "error": "Invalid zip archive"})
+                archive_path.unlink(missing_ok=True)
+            elif file_ext not in BATCH_EXTENSIONS:
+                items.append({"index": index, "filename": filename, "error": f"Invalid file type: {file_ext}"})
+            else:
+                item_dir = workspace.path / f"{index:04d}"
+                item_dir.mkdir()
+                upload = await save_upload(file, item_dir / filename)
+                items.append({
+                    "index": index,
+                    "filename": filename,
+                    "path": upload.path,
+                    "size": upload.size,
+                    "sha256": upload.sha256,
+                })
+
+            if len(items) > BATCH_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Too many files in batch (max {BATCH_MAX_FILES})")
+
+        if not items:
+            raise HTTPException(status_code=400, detail="No documents found in batch")
+    except BaseException:
+        workspace_manager.release(workspace)
+        raise
+
+    logger.info(f"Batch of {len(items)} files ({output_format}), {batch_pool.max_workers} workers")
+
+    async def result_stream():
+        started = time.perf_counter()
+        # Leave room in the shared pool queue for other batches
+        slots = asyncio.Semaphore(batch_pool.max_workers)
+        tasks = [
+            asyncio.create_task(convert_batch_item(item, output_format, clean_before_convert, slots, extract_options))
+            for item in items
+        ]
+        succeeded = cached = 0
+        total_bytes = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                entry = await next_done
+                if entry["status"] == "success":
+                    succeeded += 1
+                    cached += entry["cached"]
+                    total_bytes += entry["size"]
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+            elapsed = time.perf_counter() - started
+            summary = {
+                "type": "summary",
+                "total_files": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "cached": cached,
+                "total_bytes": total_bytes,
+                "elapsed_seconds": round(elapsed, 3),
+                "files_per_second": round(succeeded / elapsed, 3) if elapsed else None,
+                "mb_per_second": round(total_bytes / (1024 * 1024) / elapsed, 3) if elapsed else None,
+                "workers": batch_pool.max_workers,
+            }
+            logger.info(f"Batch finished: {summary}")
+            yield json.dumps(summary) + "\n"
+        finally:
+            # Client went away or batch finished; drop pending files and the workspace
+            for task in tasks:
+                task.cancel()
+            workspace_manager.release(workspace)
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    output_format: str = "markdown",
+    clean_before_convert: bool = True,
+    pages: Optional[str] = None,
+    start_heading: Optional[str] = None,
+):
+    """
+    Submit a document for background conversion.
+
+    The clean -> markdown -> bullet/html pipeline runs in the background; poll
+    GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events for progress.
+
+    Args:
+        file: Document file (PDF, DOCX, PPTX, CSV, TXT)
+        output_format: "markdown", "bullet" or "html"
+        clean_before_convert: If True, clean PDF/DOCX before conversion (default: True)
+        pages: PDF only - pages to extract, e.g. "5-12,20" or "30-"
+        start_heading: PDF only - regex; start at the first line matching it
+
+    Returns:
+        Job id and status URLs
+    """
+    allowed_extensions = {".pdf", ".docx", ".pptx", ".csv", ".txt"}
+    filename = Path(file.filename).name
+    file_ext = Path(filename).suffix.lower()
+
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(sorted(allowed_extensions))}. Got: {file_ext}"
+        )
+    if output_format not in JOB_OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output_format. Allowed: {', '.join(sorted(JOB_OUTPUT_FORMATS))}. Got: {output_format}"
+        )
+    extract_options = extraction_options(pages, start_heading)
+
+    # Keep the upload until the job finishes so it can be resumed after a restart
+    job_id = uuid.uuid4().hex
+    job_dir = JOBS_DIR / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    input_path = job_dir / filename
+
+    try:
+        upload = await save_upload(file, input_path)
+    except BaseException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    should_clean = clean_before_convert and file_ext in {".pdf", ".docx"}
+    stages = (["clean"] if should_clean else []) + ["markdown"]
+    if output_format != "markdown":
+        stages.append(output_format)
+
+    await asyncio.to_thread(
+        job_store.create,
+        filename=filename,
+        input_path=str(input_path),
+        options={
+            "output_format": output_format,
+            "clean_before_convert": clean_before_convert,
+            "content_hash": upload.sha256,
+            "extract_options": extract_options,
+        },
+        stages=stages,
+        job_id=job_id,
+    )
+    schedule_job(job_id)
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get job status, per-stage timings and (once completed) the result.
+
+    Args:
+        job_id: Id returned by POST /jobs
+    """
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream job progress as Server-Sent Events.
+
+    Emits a "progress" event on every status/stage change and a final "done"
+    event once the job has completed or failed. Results are fetched from GET /jobs/{job_id}.
+    """
+    if await asyncio.to_thread(job_store.get, job_id, include_result=False) is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def event_stream():
+        last_update = None
+        last_sent = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(job_store.get, job_id, include_result=False)
+            if job is None:
+                break
+
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                last_sent = time.monotonic()
+                yield f"event: progress\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+
+            if job["status"] in ("completed", "failed"):
+                yield f"event: done\ndata: {json.dumps({'job_id': job_id, 'status': job['status']})}\n\n"
+                break
+
+            # Comment line keeps proxies from closing an idle connection
+            if time.monotonic() - last_sent > 15:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache hit/miss counters and sizes."""
+    return result_cache.stats()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Request, pipeline stage, upload, cache and worker pool metrics in Prometheus text format."""
+    update_state_gauges()
+    content = await asyncio.to_thread(metrics.render) if metrics.multiprocess_dir else metrics.render()
+    return PlainTextResponse(content, media_type=MetricsRegistry.CONTENT_TYPE)
 
 
 @app.get("/health")
@@ -482,9 +1566,32 @@ async def health_check():
     return {
         "status": "healthy",
         "version": "1.0.0",
+        "worker_pool": worker_pool.stats(),
+        "batch_pool": batch_pool.stats(),
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and its event loop is responsive."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: warm-up has finished and the worker pool can accept work.
+
+    Returns 503 while starting, shutting down or saturated, so load balancers
+    route new documents to other instances.
+    """
+    if not app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "not_ready"})
+    if worker_pool.in_flight >= worker_pool.capacity:
+        return JSONResponse(status_code=503, content={"status": "busy", "worker_pool": worker_pool.stats()})
+    return {"status": "ready"}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,151 @@
+"""
+Tokenizer for PDF page content streams: operands followed by an operator.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterator, List
+
+
+class ContentStreamError(ValueError):
+    """Raised when a content stream cannot be tokenized."""
+
+
+# PDF whitespace and delimiter characters (ISO 32000-1, 7.2.2)
+_WS = rb"[\x00\t\n\x0c\r ]"
+_REGULAR = rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]"
+
+# Literal string with up to one level of nested parentheses
+_STRING = rb"\((?:[^()\\]++|\\.|\((?:[^()\\]++|\\.)*+\))*+\)"
+_HEX = rb"<[0-9A-Fa-f\x00\t\n\x0c\r ]*+>"
+_NUMBER = rb"[+-]?(?:\d+\.?\d*|\.\d+)(?!" + _REGULAR + rb")"
+
+_OPERAND = b"|".join([
+    _NUMBER,
+    rb"/" + _REGULAR + rb"*",
+    _STRING,
+    rb"<<(?:[^<>()]++|" + _STRING + rb"|" + _HEX + rb")*+>>",
+    _HEX,
+    rb"\[(?:[^\[\]()]++|" + _STRING + rb")*+\]",
+    rb"(?:true|false|null)(?!" + _REGULAR + rb")",
+])
+
+# First bytes of a number, and keywords that are operands rather than operators
+_NUMBER_START = frozenset(b"+-.0123456789")
+_KEYWORD_OPERANDS = (b"true", b"false", b"null")
+
+# Operand sequence of an operation. Numbers are matched as runs together with
+# the whitespace between them, which keeps the scan cheap on coordinate-heavy
+# streams; OPERAND_PATTERN splits them exactly when operands are read.
+_OPERANDS = b"|".join([
+    rb"[-+.0-9\x00\t\n\x0c\r ]++",
+    rb"%[^\r\n]*+",
+    rb"/" + _REGULAR + rb"*+",
+    _STRING,
+    rb"<<(?:[^<>()]++|" + _STRING + rb"|" + _HEX + rb")*+>>",
+    _HEX,
+    rb"\[(?:[^\[\]()]++|" + _STRING + rb")*+\]",
+    rb"(?:true|false|null)(?!" + _REGULAR + rb")",
+])
+
+# One operation: whitespace/comments, operands, then the operator keyword.
+# Groups are contiguous, so their lengths give each operation's byte span.
+OPERATION_PATTERN = re.compile(
+    rb"((?:" + _WS + rb"++|%[^\r\n]*+)*+)"
+    rb"((?:" + _OPERANDS + rb")*+)"
+    rb"(" + _REGULAR + rb"++)",
+    re.DOTALL,
+)
+OPERAND_PATTERN = re.compile(_OPERAND, re.DOTALL)
+# Operands that are only numbers and names split on whitespace
+SIMPLE_OPERANDS_PATTERN = re.compile(rb"[^()<>\[\]{}%\x00\x0b]*")
+TRAILING_PATTERN = re.compile(rb"(?:" + _WS + rb"|%[^\r\n]*)*\Z")
+# End of inline image data: whitespace, EI, then whitespace or end of stream
+INLINE_IMAGE_END_PATTERN = re.compile(_WS + rb"EI(?=" + _WS + rb"|\Z)")
+
+# Elements inside an array operand, e.g. [(Gi) 20 (á)] or [<0015002D>]
+ARRAY_ELEMENT_PATTERN = re.compile(_WS + rb"+|(?P<string>" + _STRING + rb")|(?P<hex>" + _HEX + rb")|(?P<number>" + _NUMBER + rb")", re.DOTALL)
+
+
+@dataclass(slots=True)
+class Operation:
+    """One content stream operation, with its raw operand bytes and its byte span."""
+
+    operator: bytes
+    raw_operands: bytes
+    start: int
+    end: int
+
+    @property
+    def operands(self) -> List[bytes]:
+        """Operand tokens, e.g. [b"1", b"0", b"0", b"1", b"50", b"700"] for a Tm."""
+        if SIMPLE_OPERANDS_PATTERN.fullmatch(self.raw_operands):
+            return self.raw_operands.split()
+        return OPERAND_PATTERN.findall(self.raw_operands)
+
+
+def iter_operations(data: bytes) -> Iterator[Operation]:
+    """
+    Split a decoded content stream into operations, in stream order.
+
+    Operators may share lines with other operators or span several lines.
+    Arrays and dictionaries are single operands; inline image data (BI ... ID
+    ... EI) is skipped. Operands are split only when ``Operation.operands`` is
+    read, so scanning past operators a caller ignores stays cheap.
+
+    Args:
+        data: Decoded (unfiltered) content stream bytes
+
+    Yields:
+        Operation per operator; ``start``/``end`` cover its operands and operator
+
+    Raises:
+        ContentStreamError: If the stream contains something that is not a
+            well-formed operand or operator
+    """
+    pos = 0
+    scanning = True
+    while scanning:
+        scanning = False
+        # findall() searches past bytes it cannot match; the running position
+        # then falls behind and the trailing check below catches it
+        for lead, operands, operator in OPERATION_PATTERN.findall(data, pos):
+            start = pos + len(lead)
+            pos = start + len(operands) + len(operator)
+            if operator[0] in _NUMBER_START or operator in _KEYWORD_OPERANDS:
+                raise ContentStreamError(f"Operands without operator at byte {start}")
+            yield Operation(operator, operands, start, pos)
+
+            if operator == b"ID":
+                image_end = INLINE_IMAGE_END_PATTERN.search(data, pos)
+                if image_end is None:
+                    raise ContentStreamError(f"Unterminated inline image at byte {pos}")
+                yield Operation(b"EI", b"", image_end.start() + 1, image_end.end())
+                pos = image_end.end()
+                # Matches found inside the image data are discarded
+                scanning = True
+                break
+
+    if not TRAILING_PATTERN.match(data, pos):
+        raise ContentStreamError(f"Unexpected content at byte {pos}: {data[pos:pos + 20]!r}")
+
+
+def array_elements(operand: bytes) -> List[bytes]:
+    """
+    Elements of an array operand (strings, hex strings and numbers), as raw tokens.
+
+    Raises:
+        ContentStreamError: If the array contains anything else
+    """
+    if not (operand.startswith(b"[") and operand.endswith(b"]")):
+        raise ContentStreamError(f"Not an array: {operand[:20]!r}")
+
+    elements = []
+    pos, end = 1, len(operand) - 1
+    while pos < end:
+        match = ARRAY_ELEMENT_PATTERN.match(operand, pos, end)
+        if match is None:
+            raise ContentStreamError(f"Unexpected array element: {operand[pos:pos + 20]!r}")
+        if match.lastgroup:
+            elements.append(match.group())
+        pos = match.end()
+    return elements
@@ -1,11 +1,28 @@
 """
 File Cleaner: Remove watermarks, headers, and footers from PDF and DOCX files using pikepdf.
 """
+import io
+import math
+import multiprocessing
 import os
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from loguru import logger
 
+from src.core.content_stream import (
+    ContentStreamError,
+    Operation,
+    iter_operations,
+)
+from src.core.patterns import HEX_TEXT_ARRAY_PATTERN
+from src.storage.cleaned_file_cache import CleanedFileCache, file_sha256
+from src.storage.result_cache import ResultCache
+
 try:
     import pikepdf
     PIKEPDF_AVAILABLE = True
@@ -21,23 +38,61 @@ except ImportError:
     PYTHON_DOCX_AVAILABLE = False
 
 
+# Operators that draw text strings
+TEXT_SHOW_OPERATORS = (b"Tj", b"TJ")
+# Very specific footer Y positions for Vietnamese documents (hex-encoded footers)
+FOOTER_Y_POSITIONS = (0, 10, 13.07, 28.3, 29.97, 30.97, 46.87)
+
+
 class FileCleaner:
     """Clean PDF and DOCX files by removing watermarks, headers, and footers."""
 
-    def __init__(self, output_dir: str = "temp/cleaned"):
+    # Bump when cleaning output changes so cached results are invalidated
+    VERSION = "1"
+
+    def __init__(
+        self,
+        output_dir: str = "temp/cleaned",
+        mmap_min_bytes: int = 32 * 1024 * 1024,
+        page_workers: int = 1,
+        parallel_min_pages: int = 50,
+        output_cache: Optional[CleanedFileCache] = None,
+    ):
         """Initialize file cleaner.
 
         Args:
             output_dir: Directory to save cleaned files
+            mmap_min_bytes: PDFs of at least this size are memory-mapped while cleaning
+            page_workers: Processes used to filter PDF content streams in parallel (1 = sequential)
+            parallel_min_pages: Smaller PDFs are always filtered sequentially
+            output_cache: Cache of cleaned files by original content; clean_file()
+                returns a cached file for bytes it has cleaned before
         """
         self.output_dir = Path(output_dir)
+        self.mmap_min_bytes = mmap_min_bytes
+        self.page_workers = max(1, page_workers)
+        self.parallel_min_pages = parallel_min_pages
+        self.output_cache = output_cache
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def clean_file(self, file_path: str) -> Tuple[bool, str, Optional[str]]:
+    def clean_file(
+        self,
+        file_path: str,
+        output_dir: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Tuple[bool, str, Optional[str]]:
         """Clean a file (PDF or DOCX).
 
+        With an output cache, a file whose bytes were cleaned before is not opened
+        again: the cached cleaned file is copied into output_dir under
+        this file's name, and its original message is returned.
+
         Args:
             file_path: Path to the file to clean
+            output_dir: Directory for the cleaned file (default: self.output_dir)
+            content_hash: SHA-256 hex digest of the file, if already known
+            use_cache: Consult and fill the output cache (if configured)
 
         Returns:
             Tuple of (success: bool, message: str, output_path: Optional[str])
@@ -48,23 +103,118 @@ class FileCleaner:
             return False, f"File not found: {file_path}", None
 
         ext = file_path.suffix.lower()
+        output_dir = Path(output_dir) if output_dir else self.output_dir
+
+        cache_key = None
+        if self.output_cache is not None and use_cache and ext in (".pdf", ".docx"):
+            cache_key = self._output_cache_key(file_path, ext, content_hash)
+            cached = self.output_cache.get(cache_key)
+            if cached is not None:
+                cached_path, message = cached
+                output_path = output_dir / f"cleaned_{file_path.stem}{ext}"
+                try:
+                    output_dir.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(cached_path, output_path)
+                except OSError as e:
+                    logger.warning(f"Could not reuse cached cleaned file {cached_path}: {e}")
+                else:
+                    logger.info(f"Cleaned file cache hit for {file_path.name}: {cached_path}")
+                    return True, message, str(output_path)
 
         try:
             if ext == ".pdf":
-                return self._clean_pdf(file_path)
+                success, message, output_path = self._clean_pdf(file_path, output_dir)
             elif ext == ".docx":
-                return self._clean_docx(file_path)
+                success, message, output_path = self._clean_docx(file_path, output_dir)
             else:
                 return False, f"Unsupported file format: {ext}. Only PDF and DOCX are supported.", None
         except Exception as e:
             logger.error(f"Error cleaning file: {e}", exc_info=True)
             return False, f"Error processing file: {str(e)}", None
 
-    def _clean_pdf(self, file_path: Path) -> Tuple[bool, str, Optional[str]]:
+        if cache_key is not None and success and output_path:
+            try:
+                self.output_cache.put(cache_key, Path(output_path), message)
+            except OSError as e:
+                logger.warning(f"Could not cache cleaned file {output_path}: {e}")
+        return success, message, output_path
+
+    def clean_pdf_in_memory(
+        self,
+        file_path: str,
+        content_hash: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Tuple[bool, str, Optional[bytes]]:
+        """Clean a PDF without writing the cleaned file to disk.
+
+        The cleaned document is saved into a memory buffer, ready for
+        ``fitz.open(stream=...)``, which skips a disk write and read per request.
+        With an output cache, bytes cleaned before (by either method) are read
+        from the cache instead, and a fresh result is stored there.
+
+        Args:
+            file_path: Path to the PDF file to clean
+            content_hash: SHA-256 hex digest of the file, if already known
+            use_cache: Consult and fill the output cache (if configured)
+
+        Returns:
+            Tuple of (success: bool, message: str, cleaned PDF bytes or None)
+        """
+        file_path = Path(file_path)
+
+        if not file_path.exists():
+            return False, f"File not found: {file_path}", None
+        if file_path.suffix.lower() != ".pdf":
+            return False, f"In-memory cleaning only supports PDF, got {file_path.suffix}", None
+
+        cache_key = None
+        if self.output_cache is not None and use_cache:
+            cache_key = self._output_cache_key(file_path, ".pdf", content_hash)
+            cached = self.output_cache.get(cache_key)
+            if cached is not None:
+                cached_path, message = cached
+                try:
+                    cleaned = cached_path.read_bytes()
+                except OSError as e:
+                    logger.warning(f"Could not reuse cached cleaned file {cached_path}: {e}")
+                else:
+                    logger.info(f"Cleaned file cache hit for {file_path.name}: {cached_path}")
+                    return True, message, cleaned
+
+        if not PIKEPDF_AVAILABLE:
+            return False, "pikepdf not installed. Install with: pip install pikepdf", None
+
+        logger.info(f"Cleaning PDF in memory with pikepdf: {file_path.name}")
+
+        try:
+            with self._open_pdf(file_path) as pdf:
+                annotation_count, content_removed_count = self._clean_pdf_pages(pdf)
+
+                buffer = io.BytesIO()
+                pdf.save(buffer, compress_streams=True)
+
+            logger.info(f"Original size: {file_path.stat().st_size} bytes, Cleaned size: {buffer.tell()} bytes (in memory)")
+            message = f"PDF cleaned successfully. Removed {annotation_count} annotations and {content_removed_count} header/footer elements."
+            cleaned = buffer.getvalue()
+
+        except Exception as e:
+            logger.error(f"Error cleaning PDF: {e}", exc_info=True)
+            return False, f"Error cleaning PDF: {str(e)}", None
+
+        if cache_key is not None:
+            self.output_cache.put_bytes(cache_key, cleaned, ".pdf", message)
+        return True, message, cleaned
+
+    def _output_cache_key(self, file_path: Path, ext: str, content_hash: Optional[str]) -> str:
+        """Output cache key of a file's original bytes (shared by clean_file() and clean_pdf_in_memory())."""
+        return ResultCache.make_key(content_hash or file_sha256(file_path), ext=ext, cleaner_version=self.VERSION)
+
+    def _clean_pdf(self, file_path: Path, output_dir: Path) -> Tuple[bool, str, Optional[str]]:
         """Clean PDF by removing watermarks and annotations using pikepdf.
 
         Args:
             file_path: Path to PDF file
+            output_dir: Directory for the cleaned file
 
         Returns:
             Tuple of (success: bool, message: str, output_path: Optional[str])
@@ -76,44 +226,12 @@ class FileCleaner:
 
         try:
             # Open PDF with pikepdf
-            with pikepdf.open(file_path) as pdf:
-                total_pages = len(pdf.pages)
-                annotation_count = 0
-                content_removed_count = 0
-
-                logger.info(f"Processing {total_pages} pages")
-
-                # Process each page
-                for page_num, page in enumerate(pdf.pages, start=1):
-                    try:
-                        # Remove all annotations (watermarks, comments, etc)
-                        if "/Annots" in page:
-                            annots = page["/Annots"]
-                            if annots is not None:
-                                annotation_count += len(annots)
-                                del page["/Annots"]
-                                logger.debug(f"Page {page_num}: Removed {len(annots)} annotations")
-
-                        # Remove watermark/header/footer from content streams
-                        if "/Contents" in page:
-                            try:
-                                content_removed = self._remove_header_footer_from_content(page, pdf)
-                                content_removed_count += content_removed
-                                if content_removed > 0:
-                                    logger.debug(f"Page {page_num}: Removed {content_removed} header/footer elements")
-                            except Exception as content_err:
-                                logger.debug(f"Page {page_num}: Could not process content stream: {content_err}")
-                                continue
-
-                    except Exception as page_error:
-                        logger.warning(f"Error processing page {page_num}: {page_error}")
-                        continue
-
-                logger.info(f"Removed {annotation_count} annotations and {content_removed_count} header/footer elements")
+            with self._open_pdf(file_path) as pdf:
+                annotation_count, content_removed_count = self._clean_pdf_pages(pdf)
 
                 # Save cleaned PDF
                 output_filename = f"cleaned_{file_path.stem}.pdf"
-                output_path = self.output_dir / output_filename
+                output_path = output_dir / output_filename
 
                 # Save with compression
                 pdf.save(str(output_path), compress_streams=True)
@@ -135,7 +253,82 @@ class FileCleaner:
             logger.error(f"Error cleaning PDF: {e}", exc_info=True)
             return False, f"Error cleaning PDF: {str(e)}", None
 
-    def _remove_header_footer_from_content(self, page, pdf) -> int:
+    def _open_pdf(self, file_path: Path):
+        """Open a PDF with pikepdf; large files are memory-mapped instead of read into a buffer."""
+        if file_path.stat().st_size >= self.mmap_min_bytes:
+            return pikepdf.open(file_path, access_mode=pikepdf.AccessMode.mmap)
+        return pikepdf.open(file_path)
+
+    def _clean_pdf_pages(self, pdf) -> Tuple[int, int]:
+        """Remove annotations and header/footer content from every page of an open PDF.
+
+        Args:
+            pdf: pikepdf PDF object (modified in place)
+
+        Returns:
+            Tuple of (annotations removed, header/footer elements removed)
+        """
+        total_pages = len(pdf.pages)
+        annotation_count = 0
+        content_removed_count = 0
+        # Content streams of large documents are filtered in worker processes afterwards
+        parallel = self.page_workers > 1 and total_pages >= self.parallel_min_pages
+
+        logger.info(f"Processing {total_pages} pages")
+
+        page_contents = {}  # page index -> (page height, content streams)
+        for page_idx, page in enumerate(pdf.pages):
+            try:
+                page_content = self._read_page_content(page)
+            except Exception as e:
+                logger.debug(f"Page {page_idx + 1}: Could not read content streams: {e}")
+                continue
+            if page_content is not None:
+                page_contents[page_idx] = page_content
+        stream_cache = ContentStreamCache(content_streams for _, content_streams in page_contents.values())
+
+        # Process each page
+        for page_num, page in enumerate(pdf.pages, start=1):
+            try:
+                # Remove all annotations (watermarks, comments, etc)
+                if "/Annots" in page:
+                    annots = page["/Annots"]
+                    if annots is not None:
+                        annotation_count += len(annots)
+                        del page["/Annots"]
+                        logger.debug(f"Page {page_num}: Removed {len(annots)} annotations")
+
+                # Remove watermark/header/footer from content streams
+                if not parallel and page_num - 1 in page_contents:
+                    try:
+                        content_removed = self._remove_header_footer_from_content(
+                            page, pdf, page_contents[page_num - 1], stream_cache
+                        )
+                        content_removed_count += content_removed
+                        if content_removed > 0:
+                            logger.debug(f"Page {page_num}: Removed {content_removed} header/footer elements")
+                    except Exception as content_err:
+                        logger.debug(f"Page {page_num}: Could not process content stream: {content_err}")
+                        continue
+
+            except Exception as page_error:
+                logger.warning(f"Error processing page {page_num}: {page_error}")
+                continue
+
+        if parallel:
+            content_removed_count = self._remove_header_footer_parallel(pdf, page_contents, stream_cache)
+
+        logger.info(f"Content streams: {stream_cache.summary()}")
+        logger.info(f"Removed {annotation_count} annotations and {content_removed_count} header/footer elements")
+        return annotation_count, content_removed_count
+
+    def _remove_header_footer_from_content(
+        self,
+        page,
+        pdf,
+        page_content: Optional[Tuple[float, list]] = None,
+        stream_cache: Optional["ContentStreamCache"] = None,
+    ) -> int:
         """Remove header/footer content from page content stream.
 
         Strategy: Use multi-pronged approach:
@@ -146,152 +339,321 @@ class FileCleaner:
         Args:
             page: pikepdf page object
             pdf: pikepdf PDF object (needed for creating new streams)
+            page_content: Result of _read_page_content() for the page, if already read
+            stream_cache: Document-wide decoded stream cache; the page's streams
+                are released from it once the page is written
 
         Returns:
             Count of elements removed
         """
         try:
-            # Get page dimensions
-            if "/MediaBox" not in page:
-                return 0
-
-            mediabox = page["/MediaBox"]
-            page_height = float(mediabox[3]) - float(mediabox[1])
-            page_width = float(mediabox[2]) - float(mediabox[0])
+            if page_content is None:
+                page_content = self._read_page_content(page)
+                if page_content is None:
+                    return 0
+
+            page_height, content_streams = page_content
+            if stream_cache is None:
+                stream_cache = ContentStreamCache([content_streams])
+            try:
+                stream_data = stream_cache.read(content_streams)
+                if not self._page_needs_filtering(stream_data, page_height):
+                    logger.debug("No header/footer candidates, content streams left untouched")
+                    return 0
+                plan = self._filter_page_streams(stream_data, page_height)
+                return self._apply_page_filter(page, pdf, content_streams, plan)
+            finally:
+                stream_cache.release(content_streams)
 
-            # Define regions (top 10% and bottom 10% of page)
-            header_threshold = page_height * 0.90  # Top 10%: y > 90% of height
-            footer_threshold = page_height * 0.10  # Bottom 10%: y < 10% of height
+        except Exception as e:
+            logger.debug(f"Error filtering content: {e}")
+            return 0
 
-            logger.debug(f"Page dimensions: {page_width} x {page_height}, header_threshold={header_threshold}, footer_threshold={footer_threshold}")
+    def _remove_header_footer_parallel(self, pdf, page_contents: Dict[int, Tuple[float, list]], stream_cache: "ContentStreamCache") -> int:
+        """_remove_header_footer_from_content() for every page, filtering in worker processes.
 
-            # Get content stream(s)
-            if "/Contents" not in page:
-                return 0
+        The parent reads each page's decoded content streams and height, workers
+        run _filter_page_streams() on those bytes, and the parent writes the
+        results back into the pikepdf document.
 
-            contents = page["/Contents"]
-            if contents is None:
-                return 0
+        Args:
+            pdf: pikepdf PDF object (modified in place)
+            page_contents: Page index -> result of _read_page_content()
+            stream_cache: Document-wide decoded stream cache
 
-            # Contents can be a single stream or an array of streams (pikepdf.Array)
-            content_streams = []
+        Returns:
+            Count of elements removed across all pages
+        """
+        page_streams = {}
+        inputs = []  # (page index, page height, stream bytes)
+        for page_idx, (page_height, content_streams) in page_contents.items():
             try:
-                # Use isinstance to check if it's an array
-                if isinstance(contents, pikepdf.Array):
-                    # It's an array of streams
-                    content_streams = list(contents)
-                else:
-                    # Single stream
-                    content_streams = [contents]
-            except:
-                # Fallback: treat as single stream
-                content_streams = [contents]
+                stream_data = stream_cache.read(content_streams)
+            except Exception as e:
+                logger.debug(f"Page {page_idx + 1}: Could not read content streams: {e}")
+                stream_cache.release(content_streams)
+                continue
+            # Pages without candidates are neither sent to workers nor rewritten
+            if not self._page_needs_filtering(stream_data, page_height):
+                stream_cache.release(content_streams)
+                continue
+            inputs.append((page_idx, page_height, stream_data))
+            page_streams[page_idx] = content_streams
+
+        logger.info(f"{len(inputs)} of {len(page_contents)} pages have header/footer candidates")
+        if not inputs:
+            return 0
+
+        # Several shards per worker even out pages of very different sizes
+        workers = min(self.page_workers, len(inputs))
+        shard_size = math.ceil(len(inputs) / (workers * 4))
+        shards = [inputs[start:start + shard_size] for start in range(0, len(inputs), shard_size)]
+        logger.info(f"Filtering {len(inputs)} pages in {len(shards)} shards across {workers} processes")
 
-            # First pass: Identify streams to remove entirely (small header/footer streams)
-            streams_to_remove = set()
-            total_stream_size = sum(len(stream.read_bytes()) for stream in content_streams)
+        executor = _get_clean_executor(self.page_workers)
+        futures = [executor.submit(_filter_pages, shard) for shard in shards]
+        del inputs, shards
 
-            for stream_idx, stream in enumerate(content_streams):
+        removed_count = 0
+        for future in futures:
+            for page_idx, plan in future.result():
                 try:
-                    content_data = stream.read_bytes()
-                    stream_size = len(content_data)
-                    content_str = content_data.decode('latin-1', errors='ignore')
-                    lines = content_str.split('\n')
-
-                    # Count text and graphics operators
-                    text_ops = sum(1 for line in lines if line.strip().endswith(('Tj', 'TJ')))
-
-                    # Check for rotation/skew/transformation indicators (header/footer watermarks)
-                    has_rotation = any(
-                        line.strip().startswith(('-')) and 'Tm' in line  # Negative scale = rotation/flip
-                        for line in lines
-                    )
-
-                    # Check for very high X positions (right side of page - signature box)
-                    has_right_edge_text = any(
-                        float(parts[-3]) > 350  # X position > 350 (close to right edge of ~595 width page)
-                        for line in lines
-                        if line.strip().endswith('Tm') and len((parts := line.strip().split())) >= 6
-                        for _ in [None]  # Dummy to allow parts to be defined
-                    )
-
-                    # Heuristic: Stream is likely ONLY header/footer if:
-                    # 1. Is small (<5%) AND has no text, OR
-                    # 2. Is very small AND has only rotated content, OR
-                    # 3. Has very few text operators (<15) in header/footer region (watermark indicator)
-                    # BUT: Don't remove streams that mix legitimate content with watermarks!
-                    is_purely_small_empty = stream_size < total_stream_size * 0.05 and text_ops == 0
-                    is_purely_rotated = has_rotation and stream_size < total_stream_size * 0.03 and text_ops < 10
-
-                    # New heuristic: Detect watermarks by very low text operator count in small-to-medium streams
-                    # This catches streams like: 1062 bytes with only 7 text operators (watermark font/text)
-                    # BUT: Don't treat large graphics-only streams as watermarks (they may be page content)
-                    # Only mark as watermark if: has SOME text (1-15 ops) AND is small-to-medium size
-                    # Raised threshold from 10% to 20% to catch larger watermark streams (pages 3, 19, 21, 26)
-                    is_likely_watermark = (0 < text_ops < 15) and stream_size < total_stream_size * 0.2 and stream_size > 100
-
-                    if is_purely_small_empty or is_purely_rotated or is_likely_watermark:
-                        reason = "empty" if is_purely_small_empty else ("rotated" if is_purely_rotated else "watermark_low_text_ops")
-                        logger.debug(f"Stream {stream_idx}: Marked for removal (size={stream_size}, text_ops={text_ops}, rotation={has_rotation}, right_edge={has_right_edge_text}, reason={reason})")
-                        streams_to_remove.add(stream_idx)
-                    elif (has_rotation or has_right_edge_text) and text_ops < 30:
-                        # Stream has mixed content (watermark + legitimate text)
-                        # Don't remove entirely, but mark for filtering instead
-                        logger.debug(f"Stream {stream_idx}: Will be filtered (mixed content, size={stream_size}, text_ops={text_ops}, rotation={has_rotation})")
+                    content_removed = self._apply_page_filter(pdf.pages[page_idx], pdf, page_streams[page_idx], plan)
                 except Exception as e:
-                    logger.debug(f"Error analyzing stream {stream_idx}: {e}")
+                    logger.debug(f"Page {page_idx + 1}: Could not write content streams: {e}")
+                    continue
+                finally:
+                    stream_cache.release(page_streams[page_idx])
+                removed_count += content_removed
+                if content_removed > 0:
+                    logger.debug(f"Page {page_idx + 1}: Removed {content_removed} header/footer elements")
 
-            # Second pass: Process remaining streams
-            total_text_ops_removed = 0
-            new_streams = []
+        return removed_count
 
-            for stream_idx, stream in enumerate(content_streams):
-                if stream_idx in streams_to_remove:
-                    # Skip this stream entirely
-                    total_text_ops_removed += 1
-                    logger.debug(f"Stream {stream_idx}: Removed entirely (header/footer)")
-                    continue
+    def _read_page_content(self, page) -> Optional[Tuple[float, list]]:
+        """Get a page's height and its content streams.
+
+        Args:
+            page: pikepdf page object
+
+        Returns:
+            Tuple of (page height, list of content stream objects), or None if
+            the page has no MediaBox or no contents
+        """
+        # Get page dimensions
+        if "/MediaBox" not in page:
+            return None
+
+        mediabox = page["/MediaBox"]
+        page_height = float(mediabox[3]) - float(mediabox[1])
+        page_width = float(mediabox[2]) - float(mediabox[0])
+        logger.debug(f"Page dimensions: {page_width} x {page_height}")
+
+        # Get content stream(s)
+        if "/Contents" not in page:
+            return None
+
+        contents = page["/Contents"]
+        if contents is None:
+            return None
+
+        # Contents can be a single stream or an array of streams (pikepdf.Array)
+        content_streams = []
+        try:
+            # Use isinstance to check if it's an array
+            if isinstance(contents, pikepdf.Array):
+                # It's an array of streams
+                content_streams = list(contents)
+            else:
+                # Single stream
+                content_streams = [contents]
+        except:
+            # Fallback: treat as single stream
+            content_streams = [contents]
+
+        return page_height, content_streams
+
+    @staticmethod
+    def _page_needs_filtering(stream_data: List[bytes], page_height: float) -> bool:
+        """Cheap pre-check whether _filter_page_streams() could change a page.
+
+        Conservative: False only if no stream is small enough for the
+        stream-removal heuristics (all need < 20% of the page's content) and the
+        page is too tall for text-level removal. Hex-encoded footers are only
+        removed at footer-specific positions outside the footer region, and on
+        pages taller than ten times the highest such position that region
+        covers all of them.
+
+        Args:
+            stream_data: Decoded bytes of each content stream of the page
+            page_height: Page height
+
+        Returns:
+            True if the page must go through _filter_page_streams()
+        """
+        if len(stream_data) > 1:
+            total_stream_size = sum(len(content_data) for content_data in stream_data)
+            if any(len(content_data) < total_stream_size * 0.2 for content_data in stream_data):
+                return True
+
+        return page_height * 0.10 < max(FOOTER_Y_POSITIONS) + 1.0
+
+    @staticmethod
+    def _filter_page_streams(stream_data: List[bytes], page_height: float) -> Tuple[Set[int], Dict[int, bytes], int]:
+        """Decide how to rewrite a page's content streams.
+
+        Works on decoded stream bytes only (no pikepdf objects), so it can run
+        in a worker process.
+
+        Args:
+            stream_data: Decoded bytes of each content stream of the page
+            page_height: Page height
+
+        Returns:
+            Tuple of (indices of streams to drop, index -> filtered bytes for
+            streams that changed, count of elements removed)
+        """
+        # Define regions (top 10% and bottom 10% of page)
+        header_threshold = page_height * 0.90  # Top 10%: y > 90% of height
+        footer_threshold = page_height * 0.10  # Bottom 10%: y < 10% of height
+
+        logger.debug(f"header_threshold={header_threshold}, footer_threshold={footer_threshold}")
 
+        # First pass: Identify streams to remove entirely (small header/footer streams)
+        streams_to_remove = set()
+        total_stream_size = sum(len(content_data) for content_data in stream_data)
+
+        # Each stream is tokenized once; both passes work on its operations
+        stream_operations = {}
+
+        for stream_idx, content_data in enumerate(stream_data):
+            try:
+                stream_size = len(content_data)
                 try:
-                    content_data = stream.read_bytes()
-                    filtered_content, text_ops_removed = self._filter_content_stream(
-                        content_data, header_threshold, footer_threshold, page_height
-                    )
-
-                    total_text_ops_removed += text_ops_removed
-
-                    if filtered_content != content_data:
-                        logger.debug(f"Stream {stream_idx}: Removed {text_ops_removed} text operators")
-                        # Create new stream with filtered content
-                        # Note: pikepdf.Stream requires (pdf, bytes) not (page, bytes)
-                        new_stream = pikepdf.Stream(pdf, filtered_content)
-                        new_streams.append(new_stream)
-                    else:
-                        new_streams.append(stream)
-
-                except Exception as stream_err:
-                    logger.debug(f"Error processing stream {stream_idx}: {stream_err}, keeping original")
-                    new_streams.append(stream)
-
-            # Replace content streams if any were modified
-            if total_text_ops_removed > 0:
-                if len(new_streams) == 1:
-                    page["/Contents"] = new_streams[0]
-                else:
-                    page["/Contents"] = pikepdf.Array(new_streams)
+                    operations = list(iter_operations(content_data))
+                except ContentStreamError as e:
+                    logger.debug(f"Stream {stream_idx}: Cannot be tokenized, keeping it unchanged ({e})")
+                    continue
+                stream_operations[stream_idx] = operations
 
-            return total_text_ops_removed
+                # Count text operators
+                text_ops = sum(1 for op in operations if op.operator in TEXT_SHOW_OPERATORS)
 
-        except Exception as e:
-            logger.debug(f"Error filtering content: {e}")
-            return 0
+                # Text matrices: a b c d e f Tm (e=x, f=y)
+                text_matrices = [operands for op in operations if op.operator == b"Tm" and len(operands := op.operands) == 6]
+
+                # Check for rotation/skew/transformation indicators (header/footer watermarks)
+                has_rotation = any(
+                    operands[0].startswith(b"-")  # Negative scale = rotation/flip
+                    for operands in text_matrices
+                )
+
+                # Check for very high X positions (right side of page - signature box)
+                has_right_edge_text = any(
+                    float(operands[4]) > 350  # X position > 350 (close to right edge of ~595 width page)
+                    for operands in text_matrices
+                )
+
+                # Heuristic: Stream is likely ONLY header/footer if:
+                # 1. Is small (<5%) AND has no text, OR
+                # 2. Is very small AND has only rotated content, OR
+                # 3. Has very few text operators (<15) in header/footer region (watermark indicator)
+                # BUT: Don't remove streams that mix legitimate content with watermarks!
+                is_purely_small_empty = stream_size < total_stream_size * 0.05 and text_ops == 0
+                is_purely_rotated = has_rotation and stream_size < total_stream_size * 0.03 and text_ops < 10
+
+                # New heuristic: Detect watermarks by very low text operator count in small-to-medium streams
+                # This catches streams like: 1062 bytes with only 7 text operators (watermark font/text)
+                # BUT: Don't treat large graphics-only streams as watermarks (they may be page content)
+                # Only mark as watermark if: has SOME text (1-15 ops) AND is small-to-medium size
+                # Raised threshold from 10% to 20% to catch larger watermark streams (pages 3, 19, 21, 26)
+                is_likely_watermark = (0 < text_ops < 15) and stream_size < total_stream_size * 0.2 and stream_size > 100
+
+                if is_purely_small_empty or is_purely_rotated or is_likely_watermark:
+                    reason = "empty" if is_purely_small_empty else ("rotated" if is_purely_rotated else "watermark_low_text_ops")
+                    logger.debug(f"Stream {stream_idx}: Marked for removal (size={stream_size}, text_ops={text_ops}, rotation={has_rotation}, right_edge={has_right_edge_text}, reason={reason})")
+                    streams_to_remove.add(stream_idx)
+                elif (has_rotation or has_right_edge_text) and text_ops < 30:
+                    # Stream has mixed content (watermark + legitimate text)
+                    # Don't remove entirely, but mark for filtering instead
+                    logger.debug(f"Stream {stream_idx}: Will be filtered (mixed content, size={stream_size}, text_ops={text_ops}, rotation={has_rotation})")
+            except Exception as e:
+                logger.debug(f"Error analyzing stream {stream_idx}: {e}")
+
+        # Second pass: Filter the remaining streams
+        total_text_ops_removed = len(streams_to_remove)
+        replacements = {}
+
+        for stream_idx, content_data in enumerate(stream_data):
+            if stream_idx in streams_to_remove:
+                logger.debug(f"Stream {stream_idx}: Removed entirely (header/footer)")
+                continue
+            if stream_idx not in stream_operations:
+                continue
+
+            try:
+                filtered_content, text_ops_removed = FileCleaner._filter_content_stream(
+                    content_data, header_threshold, footer_threshold, page_height, stream_operations[stream_idx]
+                )
+
+                total_text_ops_removed += text_ops_removed
+
+                if filtered_content != content_data:
+                    logger.debug(f"Stream {stream_idx}: Removed {text_ops_removed} text operators")
+                    replacements[stream_idx] = filtered_content
+
+            except Exception as stream_err:
+                logger.debug(f"Error processing stream {stream_idx}: {stream_err}, keeping original")
 
-    def _filter_content_stream(self, content: bytes, header_threshold: float, footer_threshold: float, page_height: float) -> Tuple[bytes, int]:
+        return streams_to_remove, replacements, total_text_ops_removed
+
+    def _apply_page_filter(self, page, pdf, content_streams: list, plan: Tuple[Set[int], Dict[int, bytes], int]) -> int:
+        """Write a plan from _filter_page_streams() back into the page.
+
+        Args:
+            page: pikepdf page object
+            pdf: pikepdf PDF object (needed for creating new streams)
+            content_streams: The page's content stream objects
+            plan: Streams to drop, filtered stream bytes and removed count
+
+        Returns:
+            Count of elements removed
+        """
+        streams_to_remove, replacements, total_text_ops_removed = plan
+
+        new_streams = []
+        for stream_idx, stream in enumerate(content_streams):
+            if stream_idx in streams_to_remove:
+                continue
+            if stream_idx in replacements:
+                # Create new stream with filtered content
+                # Note: pikepdf.Stream requires (pdf, bytes) not (page, bytes)
+                new_streams.append(pikepdf.Stream(pdf, replacements[stream_idx]))
+            else:
+                new_streams.append(stream)
+
+        # Replace content streams if any were modified
+        if total_text_ops_removed > 0:
+            if len(new_streams) == 1:
+                page["/Contents"] = new_streams[0]
+            else:
+                page["/Contents"] = pikepdf.Array(new_streams)
+
+        return total_text_ops_removed
+
+    @staticmethod
+    def _filter_content_stream(
+        content: bytes,
+        header_threshold: float,
+        footer_threshold: float,
+        page_height: float,
+        operations: Optional[List[Operation]] = None,
+    ) -> Tuple[bytes, int]:
         """Filter content stream to remove header/footer text and signature blocks.
 
-        Strategy: Parse PDF content operators, track text matrix (Tm), and skip
-        text drawing commands (Tj, TJ) when text positioning indicates header/footer.
-        Also removes signature/approval blocks like "Người in: ..."
+        Strategy: Tokenize the PDF content operators, track text matrix (Tm), and
+        drop text drawing commands (Tj, TJ) that show hex-encoded text at
+        footer-specific positions. Everything else is kept byte for byte.
 
         Note: Y coordinates can be negative or outside normal page range due to
         coordinate transformations (cm commands). We detect these as header/footer.
@@ -301,158 +663,79 @@ class FileCleaner:
             header_threshold: Y position for top boundary
             footer_threshold: Y position for bottom boundary
             page_height: Total page height for context
+            operations: Operations of ``content`` if already tokenized
 
         Returns:
             Tuple of (filtered content bytes, count of text operators removed)
         """
         try:
-            content_str = content.decode('latin-1', errors='ignore')
-
-            # Split into tokens/lines for processing
-            lines = content_str.split('\n')
-            filtered_lines = []
-            skip_next_text = False
-            skip_hex_footer = False  # ← Track footer-specific Y position separately!
-            removed_count = 0
+            if operations is None:
+                operations = list(iter_operations(content))
+        except ContentStreamError as e:
+            logger.debug(f"Content stream cannot be tokenized, keeping it unchanged: {e}")
+            return content, 0
 
-            # Page dimensions (approximate - typical A4 PDF)
-            page_width = 595  # Approximate standard page width
-            footer_y_positions = [0, 10, 13.07, 28.3, 29.97, 30.97, 46.87]
+        skip_hex_footer = False  # ← Track footer-specific Y position separately!
+        removed_spans = []
 
-            for i, line in enumerate(lines):
-                line_stripped = line.strip()
+        footer_y_positions = FOOTER_Y_POSITIONS
 
-                if not line_stripped:
-                    filtered_lines.append(line)
+        for op in operations:
+            operator = op.operator
+            # Track text positioning - Tm sets absolute position
+            # Format: a b c d e f Tm; positions are read from d and e, as the
+            # former line filter did, so cleaning output is unchanged
+            if operator == b"Tm":
+                operands = op.operands
+                if len(operands) != 6:
+                    continue
+                try:
+                    x_pos = float(operands[3])
+                    y_pos = float(operands[4])
+                except ValueError:
                     continue
 
-                # Track text positioning - Tm sets absolute position
-                # Format: a b c d e f Tm (e=x, f=y in standard coordinates)
-                if line_stripped.endswith('Tm'):
-                    parts = line_stripped.split()
-                    if len(parts) >= 6:
-                        try:
-                            # Extract positioning
-                            x_pos = float(parts[-4])
-                            y_pos = float(parts[-3])
-
-                            # Detect header/footer by multiple criteria:
-                            # 1. Y is in top 10% (y > 90% of height)
-                            # 2. Y is in bottom 10% (y < 10% of height)
-                            # 3. Y is negative (common for headers/footers in rotated content)
-                            # 4. Y is way below page (footer outside visible area)
-                            # 5. Page numbers/footers: Very bottom (0 < Y < 50) - usually contains page numbers
-                            # 6. Footer specific Y positions: 0, 13.07, 28.3, 29.97, 30.97 (Vietnamese doc pattern)
-                            # 7. Center top: Very top (y > 95% height) AND center X (200-400)
-                            is_header = y_pos >= header_threshold
-                            is_footer = y_pos <= footer_threshold
-                            is_unusual = y_pos < 0 or y_pos > page_height + 100
-                            is_page_number_top = y_pos >= page_height * 0.95 and 200 < x_pos < 400
-                            # Very specific footer Y positions for Vietnamese documents
-                            # Only use for hex-footer detection, NOT for general header/footer region
-                            is_footer_specific_y = any(abs(y_pos - fy) < 1.0 for fy in footer_y_positions)
-
-                            # Set skip_next_text for NORMAL header/footer removal (page numbers, footer lines)
-                            if is_header or is_footer or is_unusual or is_page_number_top:
-                                skip_next_text = True
-                                skip_hex_footer = False  # Don't skip hex at header!
-                                if is_page_number_top:
-                                    logger.debug(f"Page number detected at top X={x_pos:.1f}, Y={y_pos:.1f}")
-                            # Set skip_hex_footer ONLY for footer-specific Y positions
-                            elif is_footer_specific_y:
-                                skip_next_text = False  # Don't skip everything
-                                skip_hex_footer = True  # Only skip hex-encoded footer
-                            else:
-                                skip_next_text = False
-                                skip_hex_footer = False
-                        except (ValueError, IndexError):
-                            pass
-
-                # Also track Td/TD (relative positioning) - this resets positioning within text object
-                # but we keep skip flag since we're still in the same text object
-                elif line_stripped.endswith('Td') or line_stripped.endswith('TD'):
-                    pass  # Keep skip flag if already in header/footer text
-
-                # Check if this looks like page number/footer/line decoration
-                # Pattern: [<hex>], [(number)], [(_____)], etc
-                elif line_stripped.endswith(('Tj', 'TJ')):
-                    content = line_stripped
-                    stripped_content = content.replace('Tj', '').replace('TJ', '').strip()
-
-                    # Check patterns VERY CAREFULLY to avoid removing main content:
-                    # Only remove SPECIFIC patterns, not all short text!
-
-                    # 1. ONLY page numbers: very specific patterns like [(1)], [( 1 )], [(1: )], etc
-                    # Must be 1-3 digits only, with optional spaces and colon
-                    is_page_number = (
-                        stripped_content.startswith('[') and
-                        stripped_content.endswith(']') and
-                        '(' in stripped_content and ')' in stripped_content and
-                        len(stripped_content) < 30 and  # Very short
-                        # Extract content between [ and ]
-                        all(c in '()0123456789 \t:' for c in stripped_content)  # Only parens, digits, colon
-                    )
-
-                    # 2. Footer lines: ONLY dashes/underscores (decoration lines)
-                    is_footer_line = (
-                        stripped_content.startswith('[') and
-                        stripped_content.endswith(']') and
-                        '(' in stripped_content and ')' in stripped_content and
-                        all(c in '()- _\t' for c in stripped_content) and
-                        any(c in '-_' for c in stripped_content)
-                    )
-
-                    # 3. Hex-encoded footer text at footer-specific positions
-                    # Pattern like [<0015002D002B0034>] ONLY at footer-specific Y positions
-                    is_hex_footer = (
-                        skip_hex_footer and  # ← ONLY for footer-specific Y (not header!)
-                        stripped_content.startswith('[<') and
-                        stripped_content.endswith('>]') and
-                        len(stripped_content) < 80 and  # Short
-                        all(c in '[]<>0123456789ABCDEFabcdef \t-' for c in stripped_content)
-                    )
-
-                    in_header_footer_region = skip_next_text
-
-                    # Skip specific patterns - page numbers, footer lines, and hex-encoded footer text
-                    should_skip = is_page_number or is_footer_line or is_hex_footer
-
-                    if should_skip:
-                        if is_page_number:
-                            logger.debug(f"Skipping page number: {content[:50]}")
-                        elif is_footer_line:
-                            logger.debug(f"Skipping footer line: {content[:50]}")
-                        elif is_hex_footer:
-                            logger.debug(f"Skipping hex-encoded footer: {content[:50]}")
-                        removed_count += 1
-                        continue
-
-                # NOTE: Graphics command removal disabled due to false positives
-                # These commands (m, l, S) are part of normal PDF graphics and are difficult to
-                # distinguish from footer-drawing commands without more context.
-                # Footer detection by position (via Tm/text positioning) is more reliable.
-                # TODO: Implement more sophisticated footer line detection if needed
-
-                # Reset flag on text object end (ET) or start (BT)
-                elif line_stripped == 'ET':  # End text object
-                    skip_next_text = False
-                elif line_stripped == 'BT':  # Begin text object - start fresh
-                    skip_next_text = False
-
-                filtered_lines.append(line)
-
-            filtered_content = '\n'.join(filtered_lines)
-            return filtered_content.encode('latin-1', errors='ignore'), removed_count
-
-        except Exception as e:
-            logger.debug(f"Error in content filtering: {e}")
+                # Detect header/footer by multiple criteria:
+                # 1. Y is in top 10% (y > 90% of height)
+                # 2. Y is in bottom 10% (y < 10% of height)
+                # 3. Y is negative (common for headers/footers in rotated content)
+                # 4. Y is way below page (footer outside visible area)
+                # 5. Center top: Very top (y > 95% height) AND center X (200-400)
+                is_header = y_pos >= header_threshold
+                is_footer = y_pos <= footer_threshold
+                is_unusual = y_pos < 0 or y_pos > page_height + 100
+                is_page_number_top = y_pos >= page_height * 0.95 and 200 < x_pos < 400
+                # Only use for hex-footer detection, NOT for general header/footer region
+                is_footer_specific_y = any(abs(y_pos - fy) < 1.0 for fy in footer_y_positions)
+
+                # Don't skip hex in the header/footer region
+                skip_hex_footer = is_footer_specific_y and not (is_header or is_footer or is_unusual or is_page_number_top)
+
+            # Hex-encoded footer text, e.g. [<0015002D002B0034>], ONLY at footer-specific Y positions
+            elif operator in TEXT_SHOW_OPERATORS and skip_hex_footer:
+                operand = op.raw_operands.rstrip()
+                if len(operand) < 80 and HEX_TEXT_ARRAY_PATTERN.fullmatch(operand):
+                    logger.debug(f"Skipping hex-encoded footer: {content[op.start:op.end][:50]!r}")
+                    removed_spans.append((op.start, op.end))
+
+        if not removed_spans:
             return content, 0
 
-    def _clean_docx(self, file_path: Path) -> Tuple[bool, str, Optional[str]]:
+        # Cut the removed operations out; all other bytes stay as they were
+        pieces = []
+        pos = 0
+        for start, end in removed_spans:
+            pieces.append(content[pos:start])
+            pos = end
+        pieces.append(content[pos:])
+        return b"".join(pieces), len(removed_spans)
+
+    def _clean_docx(self, file_path: Path, output_dir: Path) -> Tuple[bool, str, Optional[str]]:
         """Clean DOCX by removing headers, footers, and watermarks.
 
         Args:
             file_path: Path to DOCX file
+            output_dir: Directory for the cleaned file
 
         Returns:
             Tuple of (success: bool, message: str, output_path: Optional[str])
@@ -487,7 +770,7 @@ class FileCleaner:
 
             # Save cleaned DOCX
             output_filename = f"cleaned_{file_path.stem}.docx"
-            output_path = self.output_dir / output_filename
+            output_path = output_dir / output_filename
             doc.save(str(output_path))
 
             logger.info(f"Cleaned DOCX saved to: {output_path}")
@@ -500,3 +783,128 @@ class FileCleaner:
         except Exception as e:
             logger.error(f"Error cleaning DOCX: {e}", exc_info=True)
             return False, f"Error cleaning DOCX: {str(e)}", None
+
+
+class ContentStreamCache:
+    """Decoded page content streams of one document, each decompressed once.
+
+    Streams used by several pages (or several times on one page), such as a
+    shared header or watermark, are kept until the last page using them has
+    been written. Streams used once are decoded and handed out without being
+    kept.
+    """
+
+    def __init__(self, page_streams: Iterable[list]):
+        """Count how often each content stream is used.
+
+        Args:
+            page_streams: The content stream objects of every page that will be read
+        """
+        self._uses = Counter(
+            key for content_streams in page_streams for stream in content_streams
+            if (key := self._key(stream)) is not None
+        )
+        self._data: Dict[Tuple[int, int], bytes] = {}
+        self.cached_bytes = 0
+        self.stats = {
+            "decoded": 0,
+            "decoded_bytes": 0,
+            "decode_ms": 0.0,
+            "reused": 0,
+            "reused_bytes": 0,
+            "peak_cached_bytes": 0,
+        }
+
+    @staticmethod
+    def _key(stream) -> Optional[Tuple[int, int]]:
+        """Object id and generation of an indirect stream; None for direct objects."""
+        objgen = tuple(stream.objgen)
+        return objgen if objgen != (0, 0) else None
+
+    def read(self, content_streams: list) -> List[bytes]:
+        """Decoded bytes of each stream, decompressing only those not cached."""
+        stream_data = []
+        for stream in content_streams:
+            key = self._key(stream)
+            data = self._data.get(key) if key is not None else None
+            if data is not None:
+                self.stats["reused"] += 1
+                self.stats["reused_bytes"] += len(data)
+            else:
+                started = time.perf_counter()
+                data = stream.read_bytes()
+                self.stats["decode_ms"] += (time.perf_counter() - started) * 1000
+                self.stats["decoded"] += 1
+                self.stats["decoded_bytes"] += len(data)
+                if self._uses[key] > 1:
+                    self._data[key] = data
+                    self.cached_bytes += len(data)
+                    self.stats["peak_cached_bytes"] = max(self.stats["peak_cached_bytes"], self.cached_bytes)
+            stream_data.append(data)
+        return stream_data
+
+    def release(self, content_streams: list) -> None:
+        """Mark a page's streams as used; drop cached bytes nothing else needs."""
+        for stream in content_streams:
+            key = self._key(stream)
+            if key is None or key not in self._uses:
+                continue
+            self._uses[key] -= 1
+            if self._uses[key] <= 0:
+                del self._uses[key]
+                data = self._data.pop(key, None)
+                if data is not None:
+                    self.cached_bytes -= len(data)
+
+    def summary(self) -> str:
+        """One-line decode/reuse statistics for logging."""
+        stats = self.stats
+        return (
+            f"decoded {stats['decoded']} ({stats['decoded_bytes'] / 1024:.0f} KB in {stats['decode_ms']:.0f} ms), "
+            f"reused {stats['reused']} ({stats['reused_bytes'] / 1024:.0f} KB) from cache, "
+            f"peak cache {stats['peak_cached_bytes'] / 1024:.0f} KB"
+        )
+
+
+# Content-stream filtering pool shared by all cleaners in this process, created on first use
+_clean_executor: Optional[ProcessPoolExecutor] = None
+_clean_executor_workers = 0
+_clean_executor_lock = threading.Lock()
+
+
+def _get_clean_executor(workers: int) -> ProcessPoolExecutor:
+    """Get the content-stream filtering process pool, (re)creating it for a different size."""
+    global _clean_executor, _clean_executor_workers
+    with _clean_executor_lock:
+        if _clean_executor is None or _clean_executor_workers != workers:
+            if _clean_executor is not None:
+                _clean_executor.shutdown(wait=False)
+            # spawn avoids forking a process that already runs event loop threads
+            _clean_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _clean_executor_workers = workers
+            logger.info(f"Started content-stream filtering pool (workers={workers})")
+        return _clean_executor
+
+
+def shutdown_clean_pool(wait: bool = True) -> None:
+    """Shut down the content-stream filtering process pool, if one was started."""
+    global _clean_executor
+    with _clean_executor_lock:
+        executor, _clean_executor = _clean_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+        logger.info("Stopped content-stream filtering pool")
+
+
+def _filter_pages(pages: List[Tuple[int, float, List[bytes]]]) -> List[Tuple[int, Tuple[Set[int], Dict[int, bytes], int]]]:
+    """Run FileCleaner._filter_page_streams() for (page index, height, stream bytes) items in a worker process."""
+    plans = []
+    for page_idx, page_height, stream_data in pages:
+        try:
+            plans.append((page_idx, FileCleaner._filter_page_streams(stream_data, page_height)))
+        except Exception as e:
+            logger.debug(f"Page {page_idx + 1}: Error filtering content: {e}")
+    return plans
@@ -4,8 +4,9 @@ Supports: Markdown → HTML, CSV → HTML Table, DOCX → HTML
 """
 
 import csv
+import re
 from io import StringIO
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Pattern
 from pathlib import Path
 from loguru import logger
 
@@ -17,6 +18,14 @@ except ImportError:
     MARKDOWN_AVAILABLE = False
 
 
+# Page markers emitted by MarkdownConverter, used as streaming section boundaries
+PAGE_MARKER_PATTERN = re.compile(r"^<!-- Page \d+ -->$")
+HEADING_PATTERN = re.compile(r"^#{1,6}\s")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+# Document-wide references (footnotes, abbreviations, link definitions) need the whole text
+REFERENCE_DEFINITION_PATTERN = re.compile(r"^ {0,3}(\[\^?[^\]]+\]:|\*\[[^\]]+\]:)", re.MULTILINE)
+
+
 class HtmlConverter:
     """Convert various formats to HTML."""
 
@@ -46,6 +55,17 @@ class HtmlConverter:
 
         logger.info("Converting markdown to HTML...")
 
+        # Convert markdown to HTML
+        html_body = self._create_markdown(include_toc).convert(markdown_content)
+
+        # Wrap in complete HTML document
+        full_html = self._wrap_in_html_document(html_body, metadata)
+
+        logger.info(f"Successfully converted markdown to HTML ({len(full_html)} bytes)")
+        return full_html
+
+    def _create_markdown(self, include_toc: bool = False) -> "markdown.Markdown":
+        """Create a Markdown renderer with the extensions used for all documents."""
         # Configure extensions for markdown
         extensions = [
             'tables',           # Support for markdown tables
@@ -57,9 +77,7 @@ class HtmlConverter:
         if include_toc:
             extensions.append('toc')  # Table of contents
 
-        # Convert markdown to HTML
-        html_body = markdown.markdown(
-            markdown_content,
+        return markdown.Markdown(
             extensions=extensions,
             extension_configs={
                 'toc': {
@@ -69,11 +87,116 @@ class HtmlConverter:
             }
         )
 
-        # Wrap in complete HTML document
-        full_html = self._wrap_in_html_document(html_body, metadata)
+    def split_sections(self, markdown_content: str) -> List[str]:
+        """
+        Split markdown into independently renderable sections.
 
-        logger.info(f"Successfully converted markdown to HTML ({len(full_html)} bytes)")
-        return full_html
+        Sections start at page markers (<!-- Page N -->), or at headings when
+        the document has no page markers. Splits happen only after a blank
+        line and outside fenced code, so the rendered sections joined with
+        newlines equal the rendering of the whole document.
+
+        Args:
+            markdown_content: Markdown text content
+
+        Returns:
+            List of markdown sections (a single section if the document cannot be split)
+        """
+        if REFERENCE_DEFINITION_PATTERN.search(markdown_content):
+            return [markdown_content]
+
+        lines = markdown_content.split("\n")
+        boundary = PAGE_MARKER_PATTERN if any(PAGE_MARKER_PATTERN.match(line) for line in lines) else HEADING_PATTERN
+        return list(self._iter_sections(lines, boundary))
+
+    @staticmethod
+    def _iter_sections(lines: Iterable[str], boundary: Pattern) -> Iterator[str]:
+        """Group lines into sections starting at ``boundary`` lines (see split_sections)."""
+        current: List[str] = []
+        in_fence = False
+        for line in lines:
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            elif not in_fence and current and not current[-1].strip() and boundary.match(line):
+                yield "\n".join(current)
+                current = []
+            current.append(line)
+        yield "\n".join(current)
+
+    def iter_html_body(self, markdown_content: str) -> Iterator[str]:
+        """
+        Render markdown to HTML body fragments, one per section.
+
+        Concatenating the fragments gives the same body as markdown_to_html().
+
+        Args:
+            markdown_content: Markdown text content
+
+        Yields:
+            HTML fragments
+        """
+        yield from self._render_sections(self.split_sections(markdown_content))
+
+    def iter_html_body_stream(self, markdown_chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Render markdown that arrives in pieces, one HTML fragment per page.
+
+        Meant for MarkdownConverter.iter_markdown(): each page section is rendered
+        as soon as the next page marker arrives, before extraction has finished.
+        Gives the same fragments as iter_html_body() on the joined markdown,
+        except that document-wide reference definitions (footnotes, link
+        definitions) only resolve within their own page.
+
+        Args:
+            markdown_chunks: Markdown text pieces, in order (may split lines)
+
+        Yields:
+            HTML fragments
+        """
+        yield from self._render_sections(self._iter_sections(self._iter_lines(markdown_chunks), PAGE_MARKER_PATTERN))
+
+    def _render_sections(self, sections: Iterable[str]) -> Iterator[str]:
+        """Render markdown sections with one reused Markdown instance."""
+        if not MARKDOWN_AVAILABLE:
+            raise RuntimeError("markdown library not installed. Install with: pip install markdown")
+
+        renderer = self._create_markdown()
+        for index, section in enumerate(sections):
+            renderer.reset()
+            fragment = renderer.convert(section)
+            yield fragment if index == 0 else "\n" + fragment
+
+    @staticmethod
+    def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+        """Yield the lines of the concatenated chunks, like ''.join(chunks).split('\\n')."""
+        partial = ""
+        for chunk in chunks:
+            lines = (partial + chunk).split("\n")
+            partial = lines.pop()
+            yield from lines
+        yield partial
+
+    def iter_markdown_to_html(
+        self,
+        markdown_content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """
+        Convert markdown content to an HTML document, yielded in pieces.
+
+        Yields the document head first, then body fragments per page/section,
+        then the closing tail. ''.join() of the pieces equals markdown_to_html().
+
+        Args:
+            markdown_content: Markdown text content
+            metadata: Optional metadata for HTML header (title, author, etc.)
+
+        Yields:
+            HTML text pieces
+        """
+        yield self.document_head(metadata)
+        yield from self.iter_html_body(markdown_content)
+        yield self.document_tail()
 
     def csv_to_html(self, csv_content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -153,6 +276,18 @@ class HtmlConverter:
         Returns:
             Complete HTML document
         """
+        return self.document_head(metadata) + html_body + self.document_tail()
+
+    def document_head(self, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the document start: <head> with CSS, page header and the opening <main>.
+
+        Args:
+            metadata: Optional metadata (title, author, description, etc.)
+
+        Returns:
+            HTML up to and including the opening <main> tag
+        """
         # Extract metadata
         title = "Document"
         author = ""
@@ -383,7 +518,7 @@ class HtmlConverter:
         }
         """
 
-        html_document = f"""<!DOCTYPE html>
+        return f"""<!DOCTYPE html>
 <html lang="vi">
 <head>
     <meta charset="UTF-8">
@@ -402,7 +537,16 @@ class HtmlConverter:
         </header>
 
         <main>
-{html_body}
+"""
+
+    def document_tail(self) -> str:
+        """
+        Build the document end: closing </main>, footer and closing tags.
+
+        Returns:
+            HTML from the closing </main> tag to the end
+        """
+        return f"""
         </main>
 
         <footer>
@@ -412,8 +556,6 @@ class HtmlConverter:
 </body>
 </html>"""
 
-        return html_document
-
     @staticmethod
     def _get_timestamp() -> str:
         """Get current timestamp."""
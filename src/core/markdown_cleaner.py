@@ -0,0 +1,75 @@
+"""
+Incremental markdown cleanup for converter output that arrives in pieces.
+"""
+from src.core.patterns import HEADING_LINE_PATTERN
+
+
+class MarkdownCleaner:
+    """Clean markdown formatting chunk by chunk.
+
+    Applies the converter's formatting rules without needing the whole text:
+    trailing whitespace is removed from every line, runs of blank lines are
+    collapsed to one, a heading is followed by one extra blank line, and
+    leading/trailing blank lines of the document are dropped.
+
+    ``feed()`` returns the cleaned text that is final so far and ``close()`` the
+    rest; concatenated they equal ``clean(text)`` of the concatenated input.
+    Only the current partial line and a blank-line count are buffered.
+    """
+
+    def __init__(self):
+        """Initialize an empty cleaner."""
+        self._partial = ""
+        self._raw_lines = 0
+        self._pending_blanks = 0
+        self._started = False
+        self._after_heading = False
+
+    @classmethod
+    def clean(cls, markdown: str) -> str:
+        """Clean a complete markdown document in one call."""
+        cleaner = cls()
+        return cleaner.feed(markdown) + cleaner.close()
+
+    def feed(self, text: str) -> str:
+        """
+        Add raw markdown and get the cleaned text that can already be emitted.
+
+        Args:
+            text: Next piece of raw markdown (may end mid-line)
+
+        Returns:
+            Cleaned text (possibly empty)
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        return "".join(self._clean_line(line) for line in lines)
+
+    def close(self) -> str:
+        """Flush the last (unterminated) line and end the document."""
+        last, self._partial = self._partial, ""
+        return self._clean_line(last)
+
+    def _clean_line(self, line: str) -> str:
+        """Clean one complete raw line; returns it with its leading separator, or ''."""
+        first_raw_line = self._raw_lines == 0
+        self._raw_lines += 1
+
+        line = line.rstrip()
+        if not line:
+            self._pending_blanks += 1
+            return ""
+
+        if self._started:
+            blanks = min(self._pending_blanks, 1) + (1 if self._after_heading else 0)
+            separator = "\n" * (1 + blanks)
+        else:
+            # Leading whitespace of the document is dropped
+            line = line.lstrip()
+            separator = ""
+
+        self._started = True
+        self._pending_blanks = 0
+        # The extra blank line only goes after headings that start on a new line
+        self._after_heading = not first_raw_line and HEADING_LINE_PATTERN.match(line) is not None
+        return separator + line
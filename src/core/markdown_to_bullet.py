@@ -12,6 +12,8 @@ from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 from loguru import logger
 
+from src.core.patterns import PRINT_DATE_PATTERN, PRINTED_BY_PATTERN
+
 
 class MarkdownToBulletConverter:
     """Convert markdown content to bullet list format with Vietnamese document styling"""
@@ -454,8 +456,8 @@ class MarkdownToBulletConverter:
     def _remove_watermark(self, content: str) -> str:
         """Remove watermark patterns from text"""
         # Remove "Người in", "Người ký", "Ngày in" patterns
-        content = re.sub(r'Người\s+(?:in|ký)\s*:.*?(?=\n[A-Z]|\n\n|$)', '', content, flags=re.DOTALL)
-        content = re.sub(r'Ngày\s+in\s*:.*?(?=\n[A-Z]|\n\n|$)', '', content, flags=re.DOTALL)
+        content = PRINTED_BY_PATTERN.sub('', content)
+        content = PRINT_DATE_PATTERN.sub('', content)
         return content
 
     def _should_skip_line(self, line: str) -> bool:
@@ -0,0 +1,429 @@
+"""
+Per-page layout of a PDF: detected tables with their bounding boxes and markdown,
+and the page's text lines and images in reading order.
+
+Table detection (``page.find_tables()``) is the most expensive PyMuPDF call in
+the pipeline. A PageLayout is computed once per page and then shared by every
+consumer that needs table positions or table content. Layouts only depend on
+their own page, so they can be built in separate processes, merged in order,
+and cached by page_fingerprint() across revisions of a document.
+"""
+import bisect
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+
+
+BBox = Tuple[float, float, float, float]
+
+# Slack (points) when deciding whether a text line lies inside a table
+TABLE_BBOX_TOLERANCE = 5.0
+
+# Font size thresholds (points) for heading levels ###, ## and #
+HEADING_SIZE_THRESHOLDS = (12, 14, 16)
+
+# Indirect object reference inside a PDF object's source ("12 0 R")
+OBJECT_REFERENCE_PATTERN = re.compile(r"\b(\d+) (\d+) R\b")
+
+
+@dataclass
+class TableRegion:
+    """One detected table on a page."""
+
+    bbox: BBox
+    # Markdown rendering of the table ("" when extraction yielded no usable rows)
+    markdown: str = ""
+
+    @property
+    def top(self) -> float:
+        """Y-position of the top edge, used to match tables to headings."""
+        return self.bbox[1]
+
+    def contains(self, bbox: Sequence[float], tolerance: float = TABLE_BBOX_TOLERANCE) -> bool:
+        """Whether ``bbox`` lies within this table's bounds (with ``tolerance`` slack)."""
+        return (bbox[0] >= self.bbox[0] - tolerance and
+                bbox[2] <= self.bbox[2] + tolerance and
+                bbox[1] >= self.bbox[1] - tolerance and
+                bbox[3] <= self.bbox[3] + tolerance)
+
+
+@dataclass
+class PageElement:
+    """A text line or an image on a page, in reading order."""
+
+    kind: str  # "text" or "image"
+    text: str = ""
+    # Average font size of the line's (non-watermark) spans
+    font_size: float = 0.0
+    bbox: Optional[BBox] = None
+    # Line lies inside a detected table (table cell content, not body text)
+    in_table: bool = False
+
+
+@dataclass
+class PageLayout:
+    """Tables and content elements of a single PDF page (1-based ``page_num``)."""
+
+    page_num: int
+    tables: List[TableRegion] = field(default_factory=list)
+    elements: List[PageElement] = field(default_factory=list)
+    # Seconds spent in table detection and rendering for this page
+    table_seconds: float = 0.0
+    # Lazily built lookup structure for table_containing(): tables sorted by top
+    # edge and the running maximum of their bottom edges
+    _by_top: Optional[List[TableRegion]] = field(default=None, init=False, repr=False, compare=False)
+    _tops: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
+    _max_bottoms: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_page(cls, page, page_num: int, extract_table: Callable[[object], str]) -> "PageLayout":
+        """
+        Run table detection on a PyMuPDF page and render each table once.
+
+        Args:
+            page: fitz.Page to analyse
+            page_num: 1-based page number
+            extract_table: Renders a PyMuPDF table object to markdown
+
+        Returns:
+            PageLayout with one TableRegion per detected table
+        """
+        started = time.perf_counter()
+        regions = [
+            TableRegion(bbox=tuple(table.bbox), markdown=extract_table(table))
+            for table in page.find_tables().tables
+        ]
+        return cls(page_num=page_num, tables=regions, table_seconds=time.perf_counter() - started)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dictionary (for the page cache)."""
+        return {
+            "page_num": self.page_num,
+            "tables": [{"bbox": list(region.bbox), "markdown": region.markdown} for region in self.tables],
+            "elements": [
+                {
+                    "kind": element.kind,
+                    "text": element.text,
+                    "font_size": element.font_size,
+                    "bbox": list(element.bbox) if element.bbox else None,
+                    "in_table": element.in_table,
+                }
+                for element in self.elements
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], page_num: Optional[int] = None) -> "PageLayout":
+        """
+        Rebuild a layout serialized with to_dict().
+
+        Args:
+            data: Serialized layout
+            page_num: Page number to use instead of the stored one (pages can move between revisions)
+        """
+        return cls(
+            page_num=page_num if page_num is not None else data["page_num"],
+            tables=[TableRegion(bbox=tuple(table["bbox"]), markdown=table["markdown"]) for table in data["tables"]],
+            elements=[
+                PageElement(
+                    kind=element["kind"],
+                    text=element["text"],
+                    font_size=element["font_size"],
+                    bbox=tuple(element["bbox"]) if element["bbox"] else None,
+                    in_table=element["in_table"],
+                )
+                for element in data["elements"]
+            ],
+        )
+
+    def table_containing(self, bbox: Optional[Sequence[float]]) -> Optional[TableRegion]:
+        """
+        Return the table a text line's bbox falls inside, if any.
+
+        Binary-searches the tables whose top edge is above the line, then walks
+        back only while a table could still reach below the line.
+        """
+        if not bbox or not self.tables:
+            return None
+
+        if self._by_top is None:
+            self._build_index()
+
+        tolerance = TABLE_BBOX_TOLERANCE
+        index = bisect.bisect_right(self._tops, bbox[1] + tolerance) - 1
+        while index >= 0 and self._max_bottoms[index] + tolerance >= bbox[3]:
+            region = self._by_top[index]
+            if region.contains(bbox, tolerance):
+                return region
+            index -= 1
+        return None
+
+    def _build_index(self) -> None:
+        """Sort tables by top edge for table_containing()."""
+        self._by_top = sorted(self.tables, key=lambda region: region.top)
+        self._tops = [region.top for region in self._by_top]
+        self._max_bottoms = []
+        max_bottom = float("-inf")
+        for region in self._by_top:
+            max_bottom = max(max_bottom, region.bbox[3])
+            self._max_bottoms.append(max_bottom)
+
+
+def extract_elements(blocks: List[Dict[str, Any]], watermark_pattern: Pattern) -> List[PageElement]:
+    """
+    Turn a page's ``get_text("dict")`` blocks into text line and image elements.
+
+    All non-blank spans of the page are collected into columns (text, size,
+    line) first. Watermark spans are then found with a single search of the
+    combined pattern over the page's span texts, and line texts and average
+    font sizes are computed per line from the columns. ``in_table`` is left
+    unset.
+
+    Args:
+        blocks: Blocks from page.get_text("dict")
+        watermark_pattern: Spans containing a match are dropped
+
+    Returns:
+        Elements in reading order (lines without visible text are skipped)
+    """
+    texts: List[str] = []
+    sizes: List[float] = []
+    span_lines: List[int] = []
+    # One slot per text line (its bbox) or image (None), in reading order
+    slots: List[Tuple[str, Optional[Sequence[float]]]] = []
+
+    for block in blocks:
+        if block["type"] == 0:  # Text block
+            for line in block["lines"]:
+                line_index = len(slots)
+                slots.append(("text", line.get("bbox", None)))
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if text:
+                        texts.append(text)
+                        sizes.append(span["size"])
+                        span_lines.append(line_index)
+        elif block["type"] == 1:  # Image block
+            slots.append(("image", None))
+
+    # Span texts never contain newlines, so no match can cross from one span into the next
+    watermarked = set()
+    if texts:
+        joined = "\n".join(texts)
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        for match in watermark_pattern.finditer(joined):
+            watermarked.add(bisect.bisect_right(starts, match.start()) - 1)
+
+    line_texts: Dict[int, List[str]] = {}
+    line_sizes: Dict[int, List[float]] = {}
+    for index, line_index in enumerate(span_lines):
+        if index not in watermarked:
+            line_texts.setdefault(line_index, []).append(texts[index])
+            line_sizes.setdefault(line_index, []).append(sizes[index])
+
+    elements = []
+    for line_index, (kind, bbox) in enumerate(slots):
+        if kind == "image":
+            elements.append(PageElement(kind="image"))
+        elif line_index in line_texts:
+            line_font_sizes = line_sizes[line_index]
+            elements.append(PageElement(
+                kind="text",
+                text=" ".join(line_texts[line_index]),
+                font_size=sum(line_font_sizes) / len(line_font_sizes),
+                bbox=tuple(bbox) if bbox else None,
+            ))
+    return elements
+
+
+def heading_level(font_size: float) -> int:
+    """Markdown heading level for a line's average font size (0 = body text)."""
+    level = bisect.bisect_left(HEADING_SIZE_THRESHOLDS, font_size)
+    return len(HEADING_SIZE_THRESHOLDS) + 1 - level if level else 0
+
+
+def page_fingerprint(doc, page, digests: Optional[Dict[int, str]] = None) -> str:
+    """
+    Hash everything a page's extraction depends on: geometry, content streams and resources.
+
+    Referenced objects (fonts, images, form XObjects) are hashed by their content
+    rather than their object numbers, so an unchanged page keeps its fingerprint
+    when a revised document renumbers its objects.
+
+    Args:
+        doc: fitz.Document the page belongs to
+        page: fitz.Page to fingerprint
+        digests: Per-document memo of object digests, shared across pages so
+            common fonts and images are hashed once
+
+    Returns:
+        Hex digest
+    """
+    if digests is None:
+        digests = {}
+
+    digest = hashlib.sha256()
+    digest.update(f"{tuple(page.rect)}|{tuple(page.cropbox)}|{page.rotation}|".encode())
+    digest.update(page.read_contents())
+
+    # Resources can be inherited from an ancestor page tree node
+    xref = page.xref
+    kind, value = doc.xref_get_key(xref, "Resources")
+    while kind == "null":
+        parent_kind, parent = doc.xref_get_key(xref, "Parent")
+        if parent_kind != "xref":
+            break
+        xref = int(parent.split()[0])
+        kind, value = doc.xref_get_key(xref, "Resources")
+
+    if kind == "xref":
+        digest.update(_object_digest(doc, int(value.split()[0]), digests).encode())
+    else:
+        digest.update(_resolve_references(doc, value, digests).encode())
+    return digest.hexdigest()
+
+
+def _object_digest(doc, xref: int, digests: Dict[int, str]) -> str:
+    """Content hash of a PDF object and everything it references (memoized)."""
+    if xref in digests:
+        return digests[xref]
+    # Placeholder while this object is being hashed, in case of reference cycles
+    digests[xref] = "cycle"
+
+    digest = hashlib.sha256(_resolve_references(doc, doc.xref_object(xref, compressed=True), digests).encode())
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+
+    digests[xref] = digest.hexdigest()
+    return digests[xref]
+
+
+def _resolve_references(doc, source: str, digests: Dict[int, str]) -> str:
+    """Replace indirect references in an object's source with the referenced objects' digests."""
+    return OBJECT_REFERENCE_PATTERN.sub(lambda match: _object_digest(doc, int(match.group(1)), digests), source)
+
+
+class TableIndex:
+    """Per-page sorted index of not-yet-matched tables, for heading-to-table matching.
+
+    Tables are matched to "Bảng XX" headings by proximity: the closest unmatched
+    table on the same page wins, otherwise the closest one on the previous or
+    next page. Each page keeps its unmatched tables sorted by top edge, so a
+    lookup is a binary search on at most three pages and a match removes the
+    table from its page.
+    """
+
+    # Same weighting as the original linear scan: any table on the heading's page
+    # beats any table on a neighbouring page
+    PAGE_DISTANCE_WEIGHT = 10000
+
+    def __init__(self, layouts: Sequence[PageLayout] = ()):
+        """
+        Index the tables (with usable markdown) of the given pages.
+
+        Args:
+            layouts: Page layouts in page order; more can be added with add_page()
+        """
+        # Tables in document order: (markdown, page_num, top)
+        self.tables: List[Tuple[str, int, float]] = []
+        # page_num -> unmatched entries sorted by (top, document order index)
+        self._pages: Dict[int, List[Tuple[float, int]]] = {}
+
+        for layout in layouts:
+            self.add_page(layout)
+
+    def add_page(self, layout: PageLayout) -> None:
+        """Index the tables of the next page (pages must be added in document order)."""
+        entries = []
+        for region in layout.tables:
+            if region.markdown:
+                entries.append((region.top, len(self.tables)))
+                self.tables.append((region.markdown, layout.page_num, region.top))
+        if entries:
+            self._pages.setdefault(layout.page_num, []).extend(entries)
+            self._pages[layout.page_num].sort()
+
+    def __len__(self) -> int:
+        """Number of tables still unmatched."""
+        return sum(len(entries) for entries in self._pages.values())
+
+    def take_nearest(self, page_num: int, y: float) -> Optional[int]:
+        """
+        Remove and return the index (into ``tables``) of the unmatched table closest to a heading.
+
+        Only tables on ``page_num`` and its direct neighbours are considered. Ties
+        go to the table that comes first in the document.
+
+        Args:
+            page_num: Page of the heading
+            y: Y-position of the heading
+
+        Returns:
+            Table index, or None when no unmatched table is close enough
+        """
+        best = None  # (distance, table index, page_num, position in page list)
+        for candidate_page in (page_num - 1, page_num, page_num + 1):
+            entries = self._pages.get(candidate_page)
+            if not entries:
+                continue
+            page_weight = abs(candidate_page - page_num) * self.PAGE_DISTANCE_WEIGHT
+            for position in self._nearest_positions(entries, y):
+                top, table_idx = entries[position]
+                key = (page_weight + abs(top - y), table_idx)
+                if best is None or key < best[:2]:
+                    best = (key[0], table_idx, candidate_page, position)
+
+        if best is None:
+            return None
+        _, table_idx, candidate_page, position = best
+        del self._pages[candidate_page][position]
+        return table_idx
+
+    def pop_pages_before(self, page_num: int) -> List[int]:
+        """
+        Remove the unmatched tables of all pages before ``page_num`` from the index.
+
+        Once every heading up to ``page_num`` has been matched, tables on earlier
+        pages can no longer be matched by later headings.
+
+        Returns:
+            Their table indices, in document order
+        """
+        popped = []
+        for candidate_page in [p for p in self._pages if p < page_num]:
+            popped.extend(table_idx for _, table_idx in self._pages.pop(candidate_page))
+        return sorted(popped)
+
+    def release(self, table_idx: int) -> None:
+        """Drop the markdown of a table that has been emitted; indices stay valid."""
+        _, page_num, top = self.tables[table_idx]
+        self.tables[table_idx] = ("", page_num, top)
+
+    def unmatched(self) -> List[int]:
+        """Indices of tables never matched to a heading, in document order."""
+        return sorted(table_idx for entries in self._pages.values() for _, table_idx in entries)
+
+    @staticmethod
+    def _nearest_positions(entries: List[Tuple[float, int]], y: float) -> List[int]:
+        """Positions of the entries at minimal |top - y| (all of them when several tables share a top)."""
+        pos = bisect.bisect_left(entries, (y, -1))
+        positions = []
+        if pos > 0:
+            top = entries[pos - 1][0]
+            left = pos - 1
+            while left > 0 and entries[left - 1][0] == top:
+                left -= 1
+            positions.extend(range(left, pos))
+        if pos < len(entries):
+            top = entries[pos][0]
+            right = pos
+            while right + 1 < len(entries) and entries[right + 1][0] == top:
+                right += 1
+            positions.extend(range(pos, right + 1))
+        return positions
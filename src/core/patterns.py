@@ -0,0 +1,63 @@
+"""
+Precompiled regular expressions shared by the converters and the file cleaner.
+
+Patterns are compiled once at import time; callers use the compiled objects
+instead of passing raw pattern strings to ``re`` on every line or span.
+"""
+import re
+from typing import List, Pattern
+
+
+def combine_patterns(patterns: List[str]) -> Pattern:
+    """
+    Compile regex strings into one alternation that matches wherever any of them matches.
+
+    A leading inline flag group such as ``(?i)`` is scoped to its own alternative.
+    """
+    alternatives = []
+    for pattern in patterns:
+        flags = re.match(r"\(\?([aiLmsux]+)\)", pattern)
+        if flags:
+            alternatives.append(f"(?{flags.group(1)}:{pattern[flags.end():]})")
+        else:
+            alternatives.append(f"(?:{pattern})")
+    return re.compile("|".join(alternatives))
+
+
+# --- Watermarks -------------------------------------------------------------
+
+# Common watermark texts in PDF spans
+WATERMARK_PATTERNS = [
+    r"(?i)watermark",
+    r"(?i)draft",
+    r"(?i)confidential",
+    r"(?i)do not copy",
+    r"(?i)internal use only",
+    r"(?i)approved",
+    r"_Approved",
+]
+
+# All watermark patterns as one alternation, so a page needs a single search
+WATERMARK_PATTERN = combine_patterns(WATERMARK_PATTERNS)
+
+# Print/signature stamps ("Người in: ...", "Người ký: ...", "Ngày in: ...") up to
+# the next capitalized line, blank line or end of text
+PRINTED_BY_PATTERN = re.compile(r"Người\s+(?:in|ký)\s*:.*?(?=\n[A-Z]|\n\n|$)", re.DOTALL)
+PRINT_DATE_PATTERN = re.compile(r"Ngày\s+in\s*:.*?(?=\n[A-Z]|\n\n|$)", re.DOTALL)
+
+# Hex-encoded text array drawn by a TJ/Tj operator, e.g. [<0015002D002B0034>]
+HEX_TEXT_ARRAY_PATTERN = re.compile(rb"\[<[][<>0-9A-Fa-f \t-]*>\]")
+
+# --- Markdown structure -----------------------------------------------------
+
+# A heading line: 1-6 hashes, whitespace, then text
+HEADING_LINE_PATTERN = re.compile(r"#{1,6}\s+\S")
+
+TITLE_PATTERN = re.compile(r"^#\s+(.+)", re.MULTILINE)
+HEADING_PATTERN = re.compile(r"^#{1,6}\s+", re.MULTILINE)
+TABLE_ROW_PATTERN = re.compile(r"^\|.+\|$", re.MULTILINE)
+LIST_ITEM_PATTERN = re.compile(r"^\s*[-*+]\s+", re.MULTILINE)
+MARKUP_CHARS_PATTERN = re.compile(r"[#*`\[\]|]")
+
+# Whitespace between two non-space characters (spaced-out text from PDF tables)
+INNER_WHITESPACE_PATTERN = re.compile(r"([^\s])\s+([^\s])")
@@ -0,0 +1,130 @@
+"""
+Single-document pipeline (clean -> markdown -> bullet/html) for worker processes.
+
+Functions here are module-level so they can be pickled into a process pool.
+Converters are created once per process and reused across documents.
+"""
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from src.core.file_cleaner import FileCleaner
+from src.core.html_converter import HtmlConverter
+from src.core.markdown_to_bullet import MarkdownToBulletConverter
+from src.core.stage1_markdown import MarkdownConverter
+
+
+OUTPUT_FORMATS = ("markdown", "bullet", "html")
+
+_components: Dict[Hashable, Any] = {}
+
+
+def _get(name: Hashable, factory):
+    """Get a per-process converter instance, creating it on first use."""
+    if name not in _components:
+        _components[name] = factory()
+    return _components[name]
+
+
+def get_markdown_converter(options: Optional[Dict[str, Any]] = None) -> MarkdownConverter:
+    """Get this process's MarkdownConverter built with the given constructor options."""
+    options = options or {}
+    return _get(("markdown", *sorted(options.items())), lambda: MarkdownConverter(**options))
+
+
+def convert_markdown(converter_options: Optional[Dict[str, Any]], file_path: str, **kwargs) -> Dict[str, Any]:
+    """
+    MarkdownConverter.convert() on this process's converter for ``converter_options``.
+
+    Unlike a bound convert method, this call pickles without the converter, so a
+    process pool worker keeps one converter (and its page cache handle) across calls.
+    """
+    return get_markdown_converter(converter_options).convert(file_path, **kwargs)
+
+
+def process_document(
+    file_path: str,
+    output_format: str = "markdown",
+    clean_before_convert: bool = True,
+    work_dir: Optional[str] = None,
+    markdown_result: Optional[Dict[str, Any]] = None,
+    in_memory_max_bytes: int = 0,
+    extract_options: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the full pipeline for one document.
+
+    Args:
+        file_path: Path to the document
+        output_format: "markdown", "bullet" or "html"
+        clean_before_convert: Clean PDF/DOCX files before conversion
+        work_dir: Directory for intermediate files (default: next to file_path)
+        markdown_result: Previously computed (e.g. cached) markdown result; skips clean and markdown stages
+        in_memory_max_bytes: PDFs up to this size are cleaned into memory and converted
+            from there, without writing the cleaned file (0 = always use a file)
+        extract_options: PDF only - partial extraction options ("pages", "start_heading")
+            passed to MarkdownConverter.convert()
+
+    Returns:
+        Dictionary with "markdown_result", optional "bullet_content"/"html_content",
+        "cleaned" flag and per-stage "timings" (seconds)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    source = Path(file_path)
+    ext = source.suffix.lower()
+    timings: Dict[str, float] = {}
+    result: Dict[str, Any] = {"cleaned": False}
+
+    # CSV renders straight to an HTML table, same as /documents/html
+    if output_format == "html" and ext == ".csv":
+        started = time.perf_counter()
+        html_converter = _get("html", HtmlConverter)
+        result["html_content"] = html_converter.csv_to_html(source.read_text(encoding="utf-8"))
+        timings["html"] = time.perf_counter() - started
+        result["markdown_result"] = None
+        result["timings"] = timings
+        return result
+
+    if markdown_result is None:
+        file_to_convert = source
+        cleaned_data = None
+        if clean_before_convert and ext in {".pdf", ".docx"}:
+            started = time.perf_counter()
+            file_cleaner = _get("cleaner", FileCleaner)
+            if ext == ".pdf" and in_memory_max_bytes > 0 and source.stat().st_size <= in_memory_max_bytes:
+                success, _, cleaned_data = file_cleaner.clean_pdf_in_memory(str(source))
+                cleaned = success and cleaned_data is not None
+            else:
+                success, _, cleaned_path = file_cleaner.clean_file(str(source), work_dir or str(source.parent))
+                cleaned = success and cleaned_path is not None
+                if cleaned:
+                    file_to_convert = Path(cleaned_path)
+            timings["clean"] = time.perf_counter() - started
+            result["cleaned"] = cleaned
+
+        started = time.perf_counter()
+        markdown_result = get_markdown_converter().convert(
+            str(file_to_convert), data=cleaned_data, **(extract_options or {})
+        )
+        timings["markdown"] = time.perf_counter() - started
+        # PDF sub-stages (table_detection, text_extraction)
+        timings.update(markdown_result.pop("timings", {}))
+
+    result["markdown_result"] = markdown_result
+    markdown_content = markdown_result["markdown"]
+
+    if output_format == "bullet":
+        started = time.perf_counter()
+        result["bullet_content"] = _get("bullet", MarkdownToBulletConverter).convert(markdown_content)
+        timings["bullet"] = time.perf_counter() - started
+    elif output_format == "html":
+        started = time.perf_counter()
+        result["html_content"] = _get("html", HtmlConverter).markdown_to_html(
+            markdown_content, markdown_result.get("metadata", {})
+        )
+        timings["html"] = time.perf_counter() - started
+
+    result["timings"] = timings
+    return result
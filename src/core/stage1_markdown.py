@@ -1,11 +1,34 @@
 """
 Stage 1: Convert documents (PDF, DOCX, etc.) to structured markdown.
 """
+import contextlib
+import json
+import math
+import multiprocessing
 import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, TextIO, Tuple
 from loguru import logger
 
+from src.core.markdown_cleaner import MarkdownCleaner
+from src.core.page_layout import PageLayout, TableIndex, extract_elements, heading_level, page_fingerprint
+from src.core.patterns import (
+    HEADING_PATTERN,
+    INNER_WHITESPACE_PATTERN,
+    LIST_ITEM_PATTERN,
+    MARKUP_CHARS_PATTERN,
+    TABLE_ROW_PATTERN,
+    TITLE_PATTERN,
+    WATERMARK_PATTERN,
+    WATERMARK_PATTERNS,
+)
+from src.storage.result_cache import ResultCache
+
 try:
     import fitz  # PyMuPDF
     PYMUPDF_AVAILABLE = True
@@ -31,16 +54,65 @@ except ImportError:
 class MarkdownConverter:
     """Convert various document formats to markdown."""
 
-    def __init__(self):
-        """Initialize markdown converter."""
-        self.markitdown = MarkItDown() if MARKITDOWN_AVAILABLE else None
+    # Bump when extraction output changes so cached results are invalidated
+    VERSION = "1"
+
+    # Common watermark patterns to filter out (matched as WATERMARK_PATTERN)
+    WATERMARK_PATTERNS = WATERMARK_PATTERNS
+
+    def __init__(
+        self,
+        page_workers: int = 1,
+        parallel_min_pages: int = 16,
+        page_cache_dir: Optional[str] = None,
+        page_cache_max_bytes: int = 256 * 1024 * 1024,
+        low_memory_min_pages: int = 0,
+        low_memory_window_pages: int = 16,
+    ):
+        """
+        Initialize markdown converter.
 
-    def convert(self, file_path: str) -> Dict[str, Any]:
+        Args:
+            page_workers: Processes used to extract PDF pages in parallel (1 = sequential)
+            parallel_min_pages: Smaller PDFs are always extracted sequentially
+            page_cache_dir: Directory for cached per-page extraction results
+                (None disables the page cache)
+            page_cache_max_bytes: Size budget of the page cache on disk
+            low_memory_min_pages: PDF selections of at least this many pages are
+                converted in bounded-memory mode (0 disables it)
+            low_memory_window_pages: Pages extracted per window in bounded-memory mode
+        """
+        self.markitdown = MarkItDown() if MARKITDOWN_AVAILABLE else None
+        self.page_workers = max(1, page_workers)
+        self.parallel_min_pages = parallel_min_pages
+        self.page_cache_dir = page_cache_dir
+        self.page_cache_max_bytes = page_cache_max_bytes
+        self.low_memory_min_pages = low_memory_min_pages
+        self.low_memory_window_pages = max(1, low_memory_window_pages)
+        # Opened on first use
+        self._page_cache: Optional[ResultCache] = None
+
+    def convert(
+        self,
+        file_path: str,
+        pages: Optional[str] = None,
+        start_heading: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        data: Optional[bytes] = None,
+    ) -> Dict[str, Any]:
         """
         Convert document to markdown.
 
         Args:
             file_path: Path to document file
+            pages: PDF only - page ranges to extract, e.g. "5-12,20" or "30-".
+                Other pages are never parsed.
+            start_heading: PDF only - regex; output starts at the first line matching
+                it and pages before that line are never parsed
+            on_chunk: Called with each markdown fragment as soon as it is ready
+                (see iter_markdown); the fragments join to the returned markdown
+            data: PDF only - document bytes already in memory; file_path then only
+                names the document and is never read
 
         Returns:
             Dictionary with markdown content and metadata
@@ -49,228 +121,519 @@ class MarkdownConverter:
             ValueError: If file format not supported
         """
         file_path = Path(file_path)
-
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
         # Get file extension
         ext = file_path.suffix.lower()
 
+        if data is not None and ext != ".pdf":
+            raise ValueError(f"In-memory conversion only supports PDF, got {ext}")
+        if data is None and not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
         # Route to appropriate converter
         if ext == ".pdf":
-            return self._convert_pdf(file_path)
+            return self._convert_pdf(file_path, pages=pages, start_heading=start_heading, on_chunk=on_chunk, data=data)
         elif ext == ".docx":
-            return self._convert_docx(file_path)
+            result = self._convert_docx(file_path)
         elif ext == ".md":
-            return self._read_markdown(file_path)
+            result = self._read_markdown(file_path)
         elif ext in [".txt"]:
-            return self._read_text(file_path)
+            result = self._read_text(file_path)
         else:
             # Try markitdown as fallback
             if self.markitdown:
-                return self._convert_with_markitdown(file_path)
+                result = self._convert_with_markitdown(file_path)
             else:
                 raise ValueError(f"Unsupported file format: {ext}")
 
-    def _convert_pdf(self, file_path: Path) -> Dict[str, Any]:
+        if on_chunk and result["markdown"]:
+            on_chunk(result["markdown"])
+        return result
+
+    def iter_markdown(
+        self,
+        file_path: str,
+        pages: Optional[str] = None,
+        start_heading: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+    ) -> Iterator[str]:
+        """
+        Convert document to markdown, yielding cleaned fragments as soon as they are ready.
+
+        PDF fragments (headings, paragraphs, tables, page markers) are produced
+        page by page while later pages are still being extracted, so consumers can
+        start early and the full text never has to be held in memory. Other
+        formats are converted in one go and yielded as a single fragment.
+        ''.join() of the fragments equals convert()["markdown"].
+
+        Args:
+            file_path: Path to document file
+            pages: PDF only - page ranges to extract (see convert())
+            start_heading: PDF only - regex to start at (see convert())
+            result: Optional dict that receives the "metadata" and "timings" of
+                the conversion; complete once the generator is exhausted
+            data: PDF only - document bytes already in memory (see convert())
+
+        Yields:
+            Markdown text fragments
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() != ".pdf":
+            converted = self.convert(str(file_path), data=data)
+            markdown_content = converted.pop("markdown")
+            if result is not None:
+                result.update(converted)
+            if markdown_content:
+                yield markdown_content
+            return
+
+        if data is None and not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        yield from self._iter_pdf(file_path, pages, start_heading, result if result is not None else {}, data)
+
+    def read_metadata(self, file_path: str) -> Dict[str, Any]:
+        """
+        Read document-level metadata (title, author) without extracting any content.
+
+        Cheap enough to call before convert(), e.g. to start a streamed HTML response.
+
+        Args:
+            file_path: Path to document file
+
+        Returns:
+            Metadata keys that convert() also reports (empty for non-PDF files)
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() != ".pdf" or not PYMUPDF_AVAILABLE:
+            return {}
+
+        with fitz.open(file_path) as doc:
+            return {
+                "title": doc.metadata.get("title", ""),
+                "author": doc.metadata.get("author", ""),
+            }
+
+    def _convert_pdf(
+        self,
+        file_path: Path,
+        pages: Optional[str] = None,
+        start_heading: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        data: Optional[bytes] = None,
+    ) -> Dict[str, Any]:
         """Convert PDF to markdown using PyMuPDF."""
+        result: Dict[str, Any] = {}
+        markdown_parts = []
+        spool: Optional[TextIO] = None
+        try:
+            for chunk in self._iter_pdf(file_path, pages, start_heading, result, data):
+                if spool is None and "low_memory" in result["metadata"]:
+                    # Bounded-memory mode: keep the fragments on disk until the end
+                    spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    markdown_parts.append(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+
+            if spool is not None:
+                spool.seek(0)
+                markdown = spool.read()
+            else:
+                markdown = "".join(markdown_parts)
+        finally:
+            if spool is not None:
+                spool.close()
+
+        return {
+            "markdown": markdown,
+            "metadata": result["metadata"],
+            # Sub-stage timings (seconds) for metrics; not part of the cached result
+            "timings": result["timings"],
+        }
+
+    def _iter_pdf(
+        self,
+        file_path: Path,
+        pages: Optional[str],
+        start_heading: Optional[str],
+        result: Dict[str, Any],
+        data: Optional[bytes] = None,
+    ) -> Iterator[str]:
+        """Extract a PDF page by page and yield cleaned markdown fragments (see iter_markdown)."""
         if not PYMUPDF_AVAILABLE:
             raise RuntimeError("PyMuPDF not installed. Install with: pip install pymupdf")
 
         logger.info(f"Converting PDF: {file_path.name}")
 
-        doc = fitz.open(file_path)
-        markdown_parts = []
-        metadata = {
-            "page_count": len(doc),
-            "title": doc.metadata.get("title", ""),
-            "author": doc.metadata.get("author", ""),
-            "source_file": str(file_path),
+        start_pattern = re.compile(start_heading) if start_heading else None
+
+        # Only time spent in here counts, not the consumer's work between fragments
+        busy_seconds = 0.0
+        resumed = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            doc = stack.enter_context(open_pdf(file_path, data))
+            page_count = len(doc)
+            metadata = {
+                "page_count": page_count,
+                "title": doc.metadata.get("title", ""),
+                "author": doc.metadata.get("author", ""),
+                "source_file": str(file_path),
+            }
+            result["metadata"] = metadata
+
+            # Pages to extract; anything left out is never parsed or table-detected
+            page_numbers = resolve_page_ranges(pages, page_count) if pages else list(range(1, page_count + 1))
+            if start_pattern:
+                page_numbers = self._pages_from_heading(doc, page_numbers, start_pattern)
+            if pages or start_pattern:
+                metadata["extracted_pages"] = len(page_numbers)
+
+            layout_stats = {"tables": 0, "table_seconds": 0.0, "cache_hits": 0, "cache_misses": 0}
+            low_memory = 0 < self.low_memory_min_pages <= len(page_numbers)
+            if low_memory:
+                start_rss = current_rss_mb()
+                layout_stats["peak_rss_mb"] = start_rss
+                logger.info(f"Low-memory mode: {len(page_numbers)} pages in windows of {self.low_memory_window_pages}")
+                metadata["low_memory"] = {"window_pages": self.low_memory_window_pages}
+                layouts = self._iter_layout_windows(doc, file_path, page_numbers, layout_stats, data)
+                # Unmatched tables wait on disk for the end of the document
+                table_spill = stack.enter_context(tempfile.TemporaryFile("w+", encoding="utf-8"))
+            else:
+                layouts = self._iter_layouts(doc, file_path, page_numbers, layout_stats, data)
+                table_spill = None
+
+            parts = self._iter_markdown_parts(
+                layouts,
+                start_pattern=start_pattern,
+                # The built-in section II heuristics only apply to whole-document conversion
+                default_start=not (pages or start_pattern),
+                table_spill=table_spill,
+            )
+
+            # Clean up excessive newlines as the parts arrive (formatting only, no content removal)
+            cleaner = MarkdownCleaner()
+            for index, part in enumerate(parts):
+                fragment = cleaner.feed(part if index == 0 else "\n" + part)
+                if fragment:
+                    busy_seconds += time.perf_counter() - resumed
+                    yield fragment
+                    resumed = time.perf_counter()
+            fragment = cleaner.close()
+            if fragment:
+                busy_seconds += time.perf_counter() - resumed
+                yield fragment
+                resumed = time.perf_counter()
+
+        logger.info(f"Found {layout_stats['tables']} tables across {len(page_numbers)} pages")
+        if low_memory and start_rss is not None:
+            # Growth of this process only (page workers are separate processes)
+            metadata["low_memory"]["peak_rss_delta_mb"] = round(layout_stats["peak_rss_mb"] - start_rss, 1)
+        if self.page_cache_dir:
+            metadata["page_cache"] = {"hits": layout_stats["cache_hits"], "misses": layout_stats["cache_misses"]}
+
+        # Clean and reorder: remove non-table content before section II, keep tables, reorder them
+        # DISABLED: Manual table insertion is being done in markdown.md file directly
+        # markdown_content = self._clean_and_reorder_content(markdown_content)
+
+        # Note: Orphaned table content lines are now handled by skipping heading conversion
+        # for text inside table bounding boxes. No need to remove them separately.
+
+        # Note: Watermark, header, footer removal should be handled by /documents/cleanfile API
+        # This markdown converter is responsible ONLY for text extraction and formatting
+
+        busy_seconds += time.perf_counter() - resumed
+        table_seconds = layout_stats["table_seconds"]
+        # In parallel mode table_detection is summed over workers (CPU time)
+        result["timings"] = {
+            "table_detection": table_seconds,
+            "text_extraction": max(0.0, busy_seconds - table_seconds),
         }
 
-        # Common watermark patterns to filter out
-        watermark_patterns = [
-            r"(?i)watermark",
-            r"(?i)draft",
-            r"(?i)confidential",
-            r"(?i)do not copy",
-            r"(?i)internal use only",
-            r"(?i)approved",
-            r"_Approved",
-        ]
-
-        # Flag to start processing from section II (pricing data section)
-        started_processing = False
-
-        # Pre-process: Extract all tables from all pages with their positions
-        # This helps match tables to headings by proximity rather than just sequential order
-        all_tables = []  # List of (table_object, page_num, y_position)
-        for page_num, page in enumerate(doc, start=1):
-            tables = page.find_tables()
-            if tables.tables:
-                for table in tables.tables:
-                    # Store table with its page number and y-position (top-left of bbox)
-                    all_tables.append((table, page_num, table.bbox[1]))
-
-        logger.info(f"Found {len(all_tables)} tables across {len(doc)} pages")
-
-        # Convert all tables to markdown once
-        extracted_tables = []  # List of (markdown_string, page_num, y_position)
-        for table, page_num, y_pos in all_tables:
-            markdown_table = self._extract_table_from_pdf(table)
-            if markdown_table:
-                extracted_tables.append((markdown_table, page_num, y_pos))
-                logger.debug(f"Extracted table on page {page_num} at y={y_pos:.1f}")
-
-        # Track which tables have been matched to headings
-        matched_table_indices = set()
-
-        for page_num, page in enumerate(doc, start=1):
-            # Extract text blocks
-            blocks = page.get_text("dict")["blocks"]
+    def _extract_page(self, page, page_num: int) -> PageLayout:
+        """
+        Extract one page: detect tables, then collect text lines and images in reading order.
+
+        Only depends on the page itself, so it can run in any process.
+
+        Args:
+            page: fitz.Page to extract
+            page_num: 1-based page number
+
+        Returns:
+            PageLayout with tables and elements filled in
+        """
+        layout = PageLayout.from_page(page, page_num, self._extract_table_from_pdf)
+
+        for element in extract_elements(page.get_text("dict")["blocks"], WATERMARK_PATTERN):
+            # Check if this line is inside a table bounding box
+            element.in_table = element.kind == "text" and layout.table_containing(element.bbox) is not None
+            layout.elements.append(element)
+
+        return layout
+
+    def _pages_from_heading(self, doc, page_numbers: List[int], start_pattern: Pattern) -> List[int]:
+        """
+        Drop the pages before the first one with a text line matching ``start_pattern``.
+
+        Uses plain text extraction only, which is far cheaper than table detection
+        and span dictionaries.
+        """
+        for position, page_num in enumerate(page_numbers):
+            page_lines = doc[page_num - 1].get_text("text").splitlines()
+            if any(start_pattern.search(line) for line in page_lines):
+                logger.info(f"Start heading found on page {page_num}")
+                return page_numbers[position:]
+
+        logger.warning(f"No page matches start heading {start_pattern.pattern!r}")
+        return []
+
+    def _iter_layouts(
+        self,
+        doc,
+        file_path: Path,
+        page_numbers: List[int],
+        stats: Dict[str, Any],
+        data: Optional[bytes] = None,
+    ) -> Iterator[PageLayout]:
+        """
+        Yield the layouts of ``page_numbers`` in page order, updating table and cache ``stats``.
+
+        Pages whose fingerprint is in the page cache are not parsed again. The
+        remaining per-page work (table detection, text extraction, span assembly)
+        is independent across pages: large selections are split into contiguous
+        shards that worker processes extract, each opening the PDF by path (or
+        from a copy of ``data`` for in-memory documents); shards are yielded in
+        order as they complete.
+        """
+        page_cache = self._get_page_cache()
+        cached: Dict[int, PageLayout] = {}
+        cache_keys: Dict[int, str] = {}
+        if page_cache is not None:
+            digests: Dict[int, str] = {}
+            for page_num in page_numbers:
+                fingerprint = page_fingerprint(doc, doc[page_num - 1], digests)
+                cache_keys[page_num] = ResultCache.make_key(fingerprint, converter_version=self.VERSION)
+                entry = page_cache.get(cache_keys[page_num])
+                if entry is not None:
+                    cached[page_num] = PageLayout.from_dict(entry, page_num=page_num)
+            stats["cache_hits"] += len(cached)
+            stats["cache_misses"] += len(page_numbers) - len(cached)
+            if cached:
+                logger.info(f"Page cache: {len(cached)} of {len(page_numbers)} pages already extracted")
+
+        missing = [page_num for page_num in page_numbers if page_num not in cached]
+        workers = min(self.page_workers, len(missing))
+        if workers > 1 and len(missing) >= self.parallel_min_pages:
+            shard_size = math.ceil(len(missing) / workers)
+            shards = [missing[start:start + shard_size] for start in range(0, len(missing), shard_size)]
+            logger.info(f"Extracting {len(missing)} pages in {len(shards)} shards across {workers} processes")
+
+            executor = _get_page_executor(self.page_workers)
+            futures = [executor.submit(_extract_pages, str(file_path), shard, data) for shard in shards]
+            extracted = (layout for future in futures for layout in future.result())
+        else:
+            extracted = (self._extract_page(doc[page_num - 1], page_num) for page_num in missing)
+
+        for page_num in page_numbers:
+            layout = cached.get(page_num)
+            if layout is None:
+                layout = next(extracted)
+                if page_cache is not None:
+                    page_cache.put(cache_keys[page_num], layout.to_dict())
+            stats["tables"] += len(layout.tables)
+            stats["table_seconds"] += layout.table_seconds
+            yield layout
+
+    def _iter_layout_windows(
+        self,
+        doc,
+        file_path: Path,
+        page_numbers: List[int],
+        stats: Dict[str, Any],
+        data: Optional[bytes] = None,
+    ) -> Iterator[PageLayout]:
+        """
+        _iter_layouts() in windows of ``low_memory_window_pages`` pages (bounded-memory mode).
+
+        At most one window of extracted layouts is in flight, and after each
+        window the fonts, images and parsed objects MuPDF keeps for its pages are
+        released. The resident set size is sampled at the end of every window
+        into ``stats["peak_rss_mb"]``.
+        """
+        window = self.low_memory_window_pages
+        for start in range(0, len(page_numbers), window):
+            yield from self._iter_layouts(doc, file_path, page_numbers[start:start + window], stats, data)
+            rss = current_rss_mb()
+            if rss is not None and stats.get("peak_rss_mb") is not None:
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss)
+            fitz.TOOLS.store_shrink(100)
+
+    def _get_page_cache(self) -> Optional[ResultCache]:
+        """Open the page cache on first use (None if disabled)."""
+        if self.page_cache_dir and self._page_cache is None:
+            self._page_cache = ResultCache(
+                cache_dir=self.page_cache_dir,
+                max_memory_bytes=0,
+                max_disk_bytes=self.page_cache_max_bytes,
+            )
+        return self._page_cache
+
+    def _iter_markdown_parts(
+        self,
+        layouts: Iterable[PageLayout],
+        start_pattern: Optional[Pattern] = None,
+        default_start: bool = True,
+        table_spill: Optional[TextIO] = None,
+    ) -> Iterator[str]:
+        """
+        Turn per-page layouts into raw markdown parts in one sequential pass.
+
+        Handles everything that depends on more than one page: where output
+        starts, and matching "### Bảng XX" headings to the closest table. A page
+        is emitted once the next page's layout is known, since a heading may
+        match a table on the following page. The raw parts, joined with newlines,
+        still need cleaning (see MarkdownCleaner).
+
+        Args:
+            layouts: Page layouts in page order (possibly a subset of the document)
+            start_pattern: Start output at the first text line matching this regex
+            default_start: Start at page 4 or the "II. ... CƯỚC" line (whole-document mode)
+            table_spill: Empty text file; when given, tables are not kept in memory
+                once emitted, and tables that can no longer be matched are parked
+                there until the end
+
+        Yields:
+            Raw markdown parts (headings, lines, tables, image notes, page markers)
+        """
+        # Flag to start processing from section II (pricing data section),
+        # or from the requested heading; a plain page selection starts right away
+        started_processing = not default_start and start_pattern is None
+
+        # Tables are matched to headings by proximity rather than just sequential order;
+        # the index drops each table once it has been matched
+        table_index = TableIndex()
+        extracted_tables = table_index.tables  # List of (markdown_string, page_num, y_position)
+
+        layouts = iter(layouts)
+        layout = next(layouts, None)
+        if layout is not None:
+            table_index.add_page(layout)
+
+        if start_pattern and layout is not None and not any(
+            element.kind == "text" and start_pattern.search(element.text) for element in layout.elements
+        ):
+            # Plain-text line and layout line differ (e.g. dropped watermark spans); start at that page
+            started_processing = True
+
+        while layout is not None:
+            # One page of lookahead for heading-to-table matching
+            next_layout = next(layouts, None)
+            if next_layout is not None:
+                table_index.add_page(next_layout)
+
+            page_num = layout.page_num
 
             # Start processing from page 4 onwards (Section II begins on page 4)
-            if page_num >= 4 and not started_processing:
+            if default_start and page_num >= 4 and not started_processing:
                 started_processing = True
                 logger.info(f"Started processing from page {page_num}")
 
-            # Extract table bounding boxes for this page only (for checking if text is in table)
-            table_bboxes = []
-            tables_on_page = page.find_tables()
-            if tables_on_page.tables:
-                for table in tables_on_page.tables:
-                    table_bboxes.append(table.bbox)
-
-            for block in blocks:
-                if block["type"] == 0:  # Text block
-                    for line in block["lines"]:
-                        # Check if this line is inside a table bounding box
-                        line_bbox = line.get("bbox", None)
-                        in_table_area = False
-                        if line_bbox:
-                            # Check if line overlaps with any table bbox
-                            for table_bbox in table_bboxes:
-                                # Check overlap: line is inside table if its position is within table bounds
-                                if (line_bbox[0] >= table_bbox[0] - 5 and
-                                    line_bbox[2] <= table_bbox[2] + 5 and
-                                    line_bbox[1] >= table_bbox[1] - 5 and
-                                    line_bbox[3] <= table_bbox[3] + 5):
-                                    in_table_area = True
-                                    break
-
-                        # Combine spans into line text
-                        line_text = ""
-                        font_sizes = []
-
-                        for span in line["spans"]:
-                            text = span["text"].strip()
-                            if text:
-                                # Skip watermark text
-                                if self._is_watermark(text, watermark_patterns):
-                                    continue
-
-                                font_sizes.append(span["size"])
-                                line_text += text + " "
-
-                        line_text = line_text.strip()
-
-                        if line_text:
-                            # Check if we've reached the pricing data section (section II)
-                            if not started_processing and "II." in line_text and "CƯỚC" in line_text:
-                                started_processing = True
-                                logger.info(f"Started processing from: {line_text}")
-
-                            # Skip processing until we reach the pricing section
-                            if not started_processing:
-                                continue
-
-                            # Skip heading conversion for text inside table bounding boxes
-                            # These are table cell contents, not actual headings
-                            if in_table_area:
-                                continue
-
-                            # Determine heading level based on font size
-                            avg_font_size = sum(font_sizes) / len(font_sizes) if font_sizes else 0
-
-                            if avg_font_size > 16:
-                                markdown_parts.append(f"\n# {line_text}\n")
-                            elif avg_font_size > 14:
-                                markdown_parts.append(f"\n## {line_text}\n")
-                            elif avg_font_size > 12:
-                                markdown_parts.append(f"\n### {line_text}\n")
-                                # After adding "### Bảng XX" heading, find and insert the closest matching table
-                                if "Bảng" in line_text:
-                                    # Get the y-position of this heading
-                                    line_y = line_bbox[1] if line_bbox else 0
-
-                                    # Find the closest unmatched table on this page or nearby pages
-                                    best_match_idx = None
-                                    best_distance = float('inf')
-
-                                    for idx, (table_md, table_page, table_y) in enumerate(extracted_tables):
-                                        if idx in matched_table_indices:
-                                            continue  # Skip already matched tables
-
-                                        # Prefer tables on the same page or next page
-                                        page_distance = abs(table_page - page_num)
-                                        if page_distance > 1:
-                                            continue  # Skip tables too far away
-
-                                        # Calculate total distance (page distance + y-distance)
-                                        y_distance = abs(table_y - line_y)
-                                        total_distance = page_distance * 10000 + y_distance
-
-                                        if total_distance < best_distance:
-                                            best_distance = total_distance
-                                            best_match_idx = idx
-
-                                    if best_match_idx is not None:
-                                        markdown_parts.append(extracted_tables[best_match_idx][0])
-                                        matched_table_indices.add(best_match_idx)
-                                        logger.debug(f"Matched '{line_text}' with table at page {extracted_tables[best_match_idx][1]}")
-                            else:
-                                markdown_parts.append(line_text)
-
-                elif block["type"] == 1:  # Image block
+            for element in layout.elements:
+                if element.kind == "image":
                     # Note image presence (only if we've started processing)
                     if started_processing:
-                        markdown_parts.append(f"\n[Image on page {page_num}]\n")
+                        yield f"\n[Image on page {page_num}]\n"
+                    continue
 
-            # Add page break marker
-            if started_processing:
-                markdown_parts.append(f"\n<!-- Page {page_num} -->\n")
+                line_text = element.text
 
-        # Add any remaining unmatched tables at the end
-        for idx, (table_md, page_num, y_pos) in enumerate(extracted_tables):
-            if idx not in matched_table_indices:
-                markdown_parts.append(table_md)
-                logger.warning(f"Unmatched table from page {page_num} added at end")
+                # Check if we've reached the pricing data section (section II)
+                if not started_processing and (
+                    start_pattern.search(line_text) if start_pattern
+                    else default_start and "II." in line_text and "CƯỚC" in line_text
+                ):
+                    started_processing = True
+                    logger.info(f"Started processing from: {line_text}")
 
-        doc.close()
+                # Skip processing until we reach the pricing section
+                if not started_processing:
+                    continue
 
-        markdown_content = "\n".join(markdown_parts)
+                # Skip heading conversion for text inside table bounding boxes
+                # These are table cell contents, not actual headings
+                if element.in_table:
+                    continue
 
-        # Clean up excessive newlines (formatting only, no content removal)
-        markdown_content = self._clean_markdown(markdown_content)
+                # Determine heading level based on font size
+                level = heading_level(element.font_size)
+
+                if level == 1:
+                    yield f"\n# {line_text}\n"
+                elif level == 2:
+                    yield f"\n## {line_text}\n"
+                elif level == 3:
+                    yield f"\n### {line_text}\n"
+                    # After adding "### Bảng XX" heading, find and insert the closest matching table
+                    if "Bảng" in line_text:
+                        # Get the y-position of this heading
+                        line_y = element.bbox[1] if element.bbox else 0
+
+                        # Find the closest unmatched table on this page or nearby pages
+                        best_match_idx = table_index.take_nearest(page_num, line_y)
+
+                        if best_match_idx is not None:
+                            yield extracted_tables[best_match_idx][0]
+                            logger.debug(f"Matched '{line_text}' with table at page {extracted_tables[best_match_idx][1]}")
+                            if table_spill is not None:
+                                table_index.release(best_match_idx)
+                else:
+                    yield line_text
 
-        # TEMP DEBUG: Save raw markdown before reordering
-        # with open("/tmp/raw_markdown.md", "w", encoding="utf-8") as f:
-        #     f.write(markdown_content)
+            # Add page break marker
+            if started_processing:
+                yield f"\n<!-- Page {page_num} -->\n"
+
+            if table_spill is not None:
+                # Later headings only match tables from this page on
+                for idx in table_index.pop_pages_before(page_num):
+                    table_spill.write(json.dumps(extracted_tables[idx][:2]) + "\n")
+                    table_index.release(idx)
+
+            layout = next_layout
+
+        # Add any remaining unmatched tables at the end (parked ones come first in the document)
+        if table_spill is not None:
+            table_spill.seek(0)
+            for line in table_spill:
+                table_md, page_num = json.loads(line)
+                yield table_md
+                logger.warning(f"Unmatched table from page {page_num} added at end")
+        for idx in table_index.unmatched():
+            table_md, page_num, y_pos = extracted_tables[idx]
+            yield table_md
+            logger.warning(f"Unmatched table from page {page_num} added at end")
 
-        # Clean and reorder: remove non-table content before section II, keep tables, reorder them
-        # DISABLED: Manual table insertion is being done in markdown.md file directly
-        # markdown_content = self._clean_and_reorder_content(markdown_content)
+    def analyze_layout(self, file_path: str) -> List[PageLayout]:
+        """
+        Detect tables on every page of a PDF without extracting any text.
 
-        # Note: Orphaned table content lines are now handled by skipping heading conversion
-        # for text inside table bounding boxes. No need to remove them separately.
+        Args:
+            file_path: Path to PDF file
 
-        # Note: Watermark, header, footer removal should be handled by /documents/cleanfile API
-        # This markdown converter is responsible ONLY for text extraction and formatting
+        Returns:
+            One PageLayout per page, in page order (elements left empty)
+        """
+        if not PYMUPDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF not installed. Install with: pip install pymupdf")
 
-        return {
-            "markdown": markdown_content,
-            "metadata": metadata,
-        }
+        with fitz.open(file_path) as doc:
+            return [
+                PageLayout.from_page(page, page_num, self._extract_table_from_pdf)
+                for page_num, page in enumerate(doc, start=1)
+            ]
 
     def _clean_and_reorder_content(self, content: str) -> str:
         """Reorder tables to appear after their headings.
@@ -339,14 +702,11 @@ class MarkdownConverter:
 
         return '\n'.join(new_lines)
 
-    def _is_watermark(self, text: str, patterns: list) -> bool:
+    def _is_watermark(self, text: str) -> bool:
         """Check if text is likely a watermark."""
-        import re
-
         # Check against watermark patterns
-        for pattern in patterns:
-            if re.search(pattern, text):
-                return True
+        if WATERMARK_PATTERN.search(text):
+            return True
 
         # Check if text is very small or very large (common watermark sizes)
         # This would need font size info from caller
@@ -381,10 +741,9 @@ class MarkdownConverter:
                         cell_text = cell_text.replace('\\n', '')
                         # Remove spaces between individual characters (common in corrupted PDF extraction)
                         # Pattern: letter space letter space letter -> merge them
-                        import re
                         # Fix spaced-out text like "T r ư ở 1 4 :2" -> "Trư ở 14:2" or similar
                         # First, try to identify and fix spaced-out words
-                        cell_text = re.sub(r'([^\s])\s+([^\s])', r'\1\2', cell_text)
+                        cell_text = INNER_WHITESPACE_PATTERN.sub(r'\1\2', cell_text)
                         # Clean up again after removing spaces
                         cell_text = ' '.join(cell_text.split())
                         cells.append(cell_text)
@@ -531,8 +890,6 @@ class MarkdownConverter:
         properly detected as table structures. They appear as separate text lines
         instead of being part of the markdown table.
         """
-        import re
-
         lines = markdown.split('\n')
         result = []
         i = 0
@@ -615,20 +972,8 @@ class MarkdownConverter:
         return '\n'.join(result)
 
     def _clean_markdown(self, markdown: str) -> str:
-        """Clean up markdown formatting."""
-        import re
-
-        # Remove excessive blank lines (more than 2 consecutive)
-        markdown = re.sub(r'\n{3,}', '\n\n', markdown)
-
-        # Remove trailing spaces
-        lines = [line.rstrip() for line in markdown.split('\n')]
-        markdown = '\n'.join(lines)
-
-        # Ensure proper spacing around headings
-        markdown = re.sub(r'(\n#{1,6}\s+[^\n]+)\n', r'\1\n\n', markdown)
-
-        return markdown.strip()
+        """Clean up markdown formatting (same rules as the incremental PDF path)."""
+        return MarkdownCleaner.clean(markdown)
 
     def extract_document_metadata(self, markdown: str, source_metadata: Dict) -> Dict[str, Any]:
         """
@@ -641,23 +986,135 @@ class MarkdownConverter:
         Returns:
             Enhanced metadata dictionary
         """
-        import re
-
         metadata = source_metadata.copy()
 
         # Extract title from first heading
-        title_match = re.search(r'^#\s+(.+)', markdown, re.MULTILINE)
+        title_match = TITLE_PATTERN.search(markdown)
         if title_match and not metadata.get("title"):
             metadata["title"] = title_match.group(1).strip()
 
         # Count different elements
-        metadata["heading_count"] = len(re.findall(r'^#{1,6}\s+', markdown, re.MULTILINE))
-        metadata["table_count"] = len(re.findall(r'^\|.+\|$', markdown, re.MULTILINE))
-        metadata["list_count"] = len(re.findall(r'^\s*[-*+]\s+', markdown, re.MULTILINE))
+        metadata["heading_count"] = len(HEADING_PATTERN.findall(markdown))
+        metadata["table_count"] = len(TABLE_ROW_PATTERN.findall(markdown))
+        metadata["list_count"] = len(LIST_ITEM_PATTERN.findall(markdown))
 
         # Estimate word count
-        text_only = re.sub(r'[#*`\[\]|]', '', markdown)
+        text_only = MARKUP_CHARS_PATTERN.sub('', markdown)
         words = text_only.split()
         metadata["word_count"] = len(words)
 
         return metadata
+
+
+PAGE_RANGE_PATTERN = re.compile(r"(\d+)(-(\d*))?")
+
+# Page-extraction pool shared by all converters in this process, created on first use
+_page_executor: Optional[ProcessPoolExecutor] = None
+_page_executor_workers = 0
+_page_executor_lock = threading.Lock()
+
+# Converter reused by page-extraction workers (one per process)
+_worker_converter: Optional[MarkdownConverter] = None
+
+
+def _get_page_executor(workers: int) -> ProcessPoolExecutor:
+    """Get the page-extraction process pool, (re)creating it for a different size."""
+    global _page_executor, _page_executor_workers
+    with _page_executor_lock:
+        if _page_executor is None or _page_executor_workers != workers:
+            if _page_executor is not None:
+                _page_executor.shutdown(wait=False)
+            # spawn avoids forking a process that already runs event loop threads
+            _page_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _page_executor_workers = workers
+            logger.info(f"Started page extraction pool (workers={workers})")
+        return _page_executor
+
+
+def shutdown_page_pool(wait: bool = True) -> None:
+    """Shut down the page-extraction process pool, if one was started."""
+    global _page_executor
+    with _page_executor_lock:
+        executor, _page_executor = _page_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+        logger.info("Stopped page extraction pool")
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (None where it cannot be measured)."""
+    # ru_maxrss would be the lifetime high-water mark, not the usage of one conversion
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def open_pdf(file_path: Path, data: Optional[bytes] = None):
+    """Open a PDF with PyMuPDF from memory when ``data`` is given, else from ``file_path``."""
+    if data is not None:
+        return fitz.open(stream=data, filetype="pdf")
+    return fitz.open(file_path)
+
+
+def _extract_pages(file_path: str, page_numbers: List[int], data: Optional[bytes] = None) -> List[PageLayout]:
+    """Extract the given 1-based pages of a PDF in a worker process."""
+    global _worker_converter
+    if _worker_converter is None:
+        _worker_converter = MarkdownConverter()
+
+    with open_pdf(file_path, data) as doc:
+        return [_worker_converter._extract_page(doc[page_num - 1], page_num) for page_num in page_numbers]
+
+
+def parse_page_ranges(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """
+    Parse a page selection such as "1-3,7,10-" into 1-based inclusive ranges.
+
+    Args:
+        spec: Comma-separated pages ("7"), ranges ("1-3") and open ranges ("10-")
+
+    Returns:
+        List of (first, last) tuples; last is None for open ranges
+
+    Raises:
+        ValueError: If the selection is malformed
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        match = PAGE_RANGE_PATTERN.fullmatch(part)
+        if not match:
+            raise ValueError(f"Invalid page range: {part!r}. Use e.g. \"5\", \"5-12\" or \"5-\"")
+
+        first = int(match.group(1))
+        if match.group(2) is None:
+            last = first
+        else:
+            last = int(match.group(3)) if match.group(3) else None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((first, last))
+    return ranges
+
+
+def resolve_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Turn a page selection into sorted, de-duplicated page numbers within the document.
+
+    Args:
+        spec: Page selection (see parse_page_ranges)
+        page_count: Number of pages in the document
+
+    Returns:
+        1-based page numbers; pages beyond the end of the document are ignored
+    """
+    selected = set()
+    for first, last in parse_page_ranges(spec):
+        selected.update(range(first, min(last or page_count, page_count) + 1))
+    return sorted(selected)
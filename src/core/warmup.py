@@ -0,0 +1,109 @@
+"""
+Warm up the conversion libraries with a tiny synthetic document.
+
+The first PDF a process handles pays for lazy initialization inside PyMuPDF
+(fonts, table finder), pikepdf/qpdf and the markdown extensions. Running one
+small document through the pipeline at startup moves that cost out of the
+first real request. When the app is preloaded in a gunicorn master, the
+warmed-up state is shared with all forked workers.
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+from loguru import logger
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    logger.warning("PyMuPDF not available")
+    PYMUPDF_AVAILABLE = False
+
+
+_warm = False
+
+
+def is_warm() -> bool:
+    """Whether warm_up() has completed in this process (or its preloaded parent)."""
+    return _warm
+
+
+def build_sample_pdf(path: Path) -> None:
+    """
+    Write a one-page PDF with a header, footer, heading, text and a small ruled table.
+
+    Args:
+        path: Output file path
+    """
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)  # A4
+
+    page.insert_text((50, 30), "Header line", fontsize=9)
+    page.insert_text((50, 90), "II. WARM-UP", fontsize=18)
+    page.insert_text((50, 120), "Table 1: Sample", fontsize=13)
+    page.insert_text((50, 140), "Body text for warm-up.", fontsize=11)
+
+    # 2x2 ruled table so the table finder runs its full path
+    x0, y0, cell_w, cell_h = 50, 160, 120, 20
+    for row in range(3):
+        page.draw_line((x0, y0 + row * cell_h), (x0 + 2 * cell_w, y0 + row * cell_h))
+    for col in range(3):
+        page.draw_line((x0 + col * cell_w, y0), (x0 + col * cell_w, y0 + 2 * cell_h))
+    for row, cells in enumerate((("Type", "Price"), ("20'", "100"))):
+        for col, text in enumerate(cells):
+            page.insert_text((x0 + col * cell_w + 5, y0 + row * cell_h + 14), text, fontsize=10)
+
+    page.insert_text((50, 820), "Page 1", fontsize=9)
+
+    doc.save(str(path))
+    doc.close()
+
+
+def warm_up(file_cleaner, markdown_converter, bullet_converter, html_converter) -> Dict[str, float]:
+    """
+    Run the clean -> markdown -> bullet/html pipeline once on a synthetic PDF.
+
+    Args:
+        file_cleaner: FileCleaner instance
+        markdown_converter: MarkdownConverter instance
+        bullet_converter: MarkdownToBulletConverter instance
+        html_converter: HtmlConverter instance
+
+    Returns:
+        Seconds spent per stage (empty if PyMuPDF is not installed)
+    """
+    global _warm
+
+    timings: Dict[str, float] = {}
+    if not PYMUPDF_AVAILABLE:
+        _warm = True
+        return timings
+
+    with tempfile.TemporaryDirectory(prefix="warmup-") as tmp_dir:
+        sample_path = Path(tmp_dir) / "warmup.pdf"
+        build_sample_pdf(sample_path)
+
+        started = time.perf_counter()
+        file_cleaner.clean_file(str(sample_path), tmp_dir, use_cache=False)
+        timings["clean"] = time.perf_counter() - started
+
+        # Convert the uncleaned sample: the cleaner drops its table rules, and
+        # the table finder is the most expensive part to initialize
+        started = time.perf_counter()
+        markdown_result = markdown_converter.convert(str(sample_path))
+        timings["markdown"] = time.perf_counter() - started
+
+        markdown_content = markdown_result["markdown"]
+
+        started = time.perf_counter()
+        bullet_converter.convert(markdown_content)
+        timings["bullet"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        html_converter.markdown_to_html(markdown_content, markdown_result.get("metadata", {}))
+        timings["html"] = time.perf_counter() - started
+
+    _warm = True
+    logger.info(f"Warm-up finished: { {stage: round(seconds, 3) for stage, seconds in timings.items()} }")
+    return timings
@@ -0,0 +1,259 @@
+"""
+Content-addressed cache of cleaned PDF/DOCX files.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from loguru import logger
+
+
+META_FILENAME = "meta.json"
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CleanedFileCache:
+    """Disk LRU cache of cleaned files, bounded by total size and entry age.
+
+    Each entry is a directory ``cache_dir/<key[:2]>/<key>/`` holding the cleaned
+    file as ``<key><ext>`` and a ``meta.json`` with the cleaner's result message.
+    Entries are shared by every upload of the same bytes, so they carry no upload
+    filename; callers copy them to their own output name, so nothing a caller does
+    with its file reaches the entry. Keys come from ``ResultCache.make_key()``
+    over the hash of the original bytes and the cleaner version. Several processes may
+    share one directory: lookups go to disk, so entries written by another
+    process are found as well.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "temp/cleaned/cache",
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: float = 24 * 3600,
+    ):
+        """
+        Initialize cleaned file cache.
+
+        Args:
+            cache_dir: Directory for cache entries
+            max_bytes: Size budget of all cached files (oldest used removed first)
+            ttl_seconds: Entries not used for this long are removed
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> bytes, least recently used first
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _entry_dir(self, key: str) -> Path:
+        """Get the directory of a cache entry."""
+        return self.cache_dir / key[:2] / key
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from existing entries (oldest first)."""
+        entries = []
+        for meta_path in self.cache_dir.glob(f"*/*/{META_FILENAME}"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                size = (meta_path.parent / meta["filename"]).stat().st_size
+                entries.append((meta_path.stat().st_mtime, meta_path.parent.name, size))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._bytes += size
+
+        if entries:
+            logger.info(f"Cleaned file cache: indexed {len(entries)} entries ({self._bytes} bytes)")
+        self.collect_garbage()
+
+    def get(self, key: str) -> Optional[Tuple[Path, str]]:
+        """
+        Look up a cleaned file.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (cleaned file path, cleaning result message), or None on a miss
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / META_FILENAME
+
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                cleaned_path = entry_dir / meta["filename"]
+                size = cleaned_path.stat().st_size
+                expired = time.time() - meta_path.stat().st_mtime > self.ttl_seconds
+            except (OSError, ValueError, KeyError):
+                if key in self._entries:
+                    # Entry removed behind our back - drop it from the index
+                    self._bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+
+            if expired:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # meta.json's mtime is the entry's last use
+            try:
+                os.utime(meta_path)
+            except OSError:
+                pass
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._entries[key] = size
+                self._bytes += size
+
+            self.hits += 1
+            return cleaned_path, meta["message"]
+
+    def put(self, key: str, cleaned_path: Path, message: str) -> Optional[Path]:
+        """
+        Store a copy of a cleaned file.
+
+        Args:
+            key: Cache key
+            cleaned_path: The cleaned file
+            message: Cleaning result message returned again on hits
+
+        Returns:
+            Path of the cached copy, or None if it could not be stored
+        """
+        cleaned_path = Path(cleaned_path)
+        return self._store(
+            key,
+            cleaned_path.stat().st_size,
+            cleaned_path.suffix,
+            lambda tmp_path: shutil.copyfile(cleaned_path, tmp_path),
+            message,
+        )
+
+    def put_bytes(self, key: str, data: bytes, suffix: str, message: str) -> Optional[Path]:
+        """
+        Store a cleaned file that only exists in memory.
+
+        Args:
+            key: Cache key
+            data: The cleaned file's bytes
+            suffix: File extension of the entry, e.g. ".pdf"
+            message: Cleaning result message returned again on hits
+
+        Returns:
+            Path of the cached file, or None if it could not be stored
+        """
+        return self._store(key, len(data), suffix, lambda tmp_path: tmp_path.write_bytes(data), message)
+
+    def _store(
+        self, key: str, size: int, suffix: str, write: Callable[[Path], Any], message: str
+    ) -> Optional[Path]:
+        """Write an entry of ``size`` bytes with ``write(tmp_path)`` and index it (see put())."""
+        if size > self.max_bytes:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        cached_path = entry_dir / f"{key}{suffix}"
+
+        with self._lock:
+            try:
+                entry_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = cached_path.with_name(f".{cached_path.name}.tmp")
+                write(tmp_path)
+                os.replace(tmp_path, cached_path)
+
+                # Written last: an entry without meta.json is never served
+                meta = {"filename": cached_path.name, "message": message, "created": time.time()}
+                tmp_meta = entry_dir / f".{META_FILENAME}.tmp"
+                tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_meta, entry_dir / META_FILENAME)
+            except OSError as e:
+                logger.warning(f"Cleaned file cache: could not write {entry_dir}: {e}")
+                return None
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._bytes += size
+            self._evict()
+
+        return cached_path if key in self._entries else None
+
+    def _remove(self, key: str) -> None:
+        """Delete an entry from disk and the index (lock held)."""
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+        self.evictions += 1
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until within budget (lock held)."""
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """
+        Remove entries unused for longer than the TTL, then enforce the size budget.
+
+        Returns:
+            Counts of removed entries and remaining bytes
+        """
+        now = time.time()
+        removed = 0
+
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    last_used = (self._entry_dir(key) / META_FILENAME).stat().st_mtime
+                except OSError:
+                    last_used = 0.0
+                if now - last_used > self.ttl_seconds:
+                    self._remove(key)
+                    removed += 1
+
+            evictions = self.evictions
+            self._evict()
+            removed += self.evictions - evictions
+
+        if removed:
+            logger.info(f"Cleaned file cache removed {removed} entries")
+        return {"removed_entries": removed, "cache_bytes": self._bytes}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,279 @@
+"""
+SQLite-backed store for background conversion jobs.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+
+def _new_owner_id() -> str:
+    """Identify this process incarnation; a restarted worker may reuse the old pid."""
+    return f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+OWNER_ID = _new_owner_id()
+
+
+def _reset_owner_id() -> None:
+    """Give a forked worker (e.g. from a preloaded gunicorn master) its own identity."""
+    global OWNER_ID
+    OWNER_ID = _new_owner_id()
+
+
+os.register_at_fork(after_in_child=_reset_owner_id)
+
+
+class JobStore:
+    """Persist job status, per-stage timings and results in a local SQLite database."""
+
+    def __init__(self, db_path: str = "temp/jobs/jobs.db"):
+        """
+        Initialize job store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection per operation (safe to share the store across threads)."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        """Create the jobs table if needed."""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    input_path TEXT,
+                    options TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    current_stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _row_to_job(self, row: sqlite3.Row, include_result: bool = True) -> Dict[str, Any]:
+        """Convert a database row to a job dictionary."""
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "options": json.loads(row["options"]),
+            "stages": json.loads(row["stages"]),
+            "current_stage": row["current_stage"],
+            "progress": row["progress"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    def create(
+        self,
+        filename: str,
+        input_path: str,
+        options: Dict[str, Any],
+        stages: List[str],
+        job_id: Optional[str] = None,
+    ) -> str:
+        """
+        Create a queued job.
+
+        Args:
+            filename: Original upload filename
+            input_path: Where the uploaded file is stored until the job finishes
+            options: Conversion options (output format, clean flag, ...)
+            stages: Ordered stage names the job will run through
+            job_id: Optional pre-generated job id
+
+        Returns:
+            Job id
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        stage_info = {name: {"status": "pending", "seconds": None} for name in stages}
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (id, status, filename, input_path, options, stages,
+                                  owner, created_at, updated_at)
+                VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, filename, input_path, json.dumps(options), json.dumps(stage_info),
+                 OWNER_ID, now, now),
+            )
+
+        logger.info(f"Created job {job_id} for {filename}")
+        return job_id
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a job by id, or None if it does not exist."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row, include_result) if row else None
+
+    def get_input_path(self, job_id: str) -> Optional[str]:
+        """Get the stored upload path of a job."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT input_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["input_path"] if row else None
+
+    def start_stage(self, job_id: str, stage: str) -> None:
+        """Mark a stage as running."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row["stages"])
+            stages.setdefault(stage, {"status": "pending", "seconds": None})["status"] = "running"
+            conn.execute(
+                "UPDATE jobs SET status = 'running', current_stage = ?, stages = ?, updated_at = ? WHERE id = ?",
+                (stage, json.dumps(stages), time.time(), job_id),
+            )
+
+    def finish_stage(self, job_id: str, stage: str, seconds: float, status: str = "done") -> None:
+        """
+        Record a finished stage and update overall progress.
+
+        Args:
+            job_id: Job id
+            stage: Stage name
+            seconds: Wall time spent in the stage
+            status: "done", "skipped" or "cached"
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row["stages"])
+            stages[stage] = {"status": status, "seconds": round(seconds, 3)}
+            finished = sum(1 for info in stages.values() if info["status"] not in ("pending", "running"))
+            conn.execute(
+                "UPDATE jobs SET stages = ?, progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(stages), round(finished / len(stages), 3), time.time(), job_id),
+            )
+
+    def set_status(self, job_id: str, status: str) -> None:
+        """Set job status without touching stages."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (status, time.time(), job_id),
+            )
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Store the job result and mark it completed."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'completed', current_stage = NULL, progress = 1,
+                                result = ?, updated_at = ? WHERE id = ?
+                """,
+                (json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id),
+            )
+        logger.info(f"Job {job_id} completed")
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                (error, time.time(), job_id),
+            )
+        logger.warning(f"Job {job_id} failed: {error}")
+
+    def claim_orphaned(self) -> List[str]:
+        """
+        Take over queued/running jobs whose owning worker process is gone.
+
+        Ownership is tracked per process incarnation, so jobs interrupted by a
+        restart are reclaimed even if the new worker got the same pid.
+
+        Returns:
+            Ids of jobs now owned by the current process and reset to queued
+        """
+        claimed = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+
+            for row in rows:
+                if not _owner_gone(row["owner"]):
+                    continue
+                # Conditional update so only one restarting worker claims each job
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs SET owner = ?, status = 'queued', current_stage = NULL, updated_at = ?
+                    WHERE id = ? AND owner IS ?
+                    """,
+                    (OWNER_ID, time.time(), row["id"], row["owner"]),
+                )
+                if cursor.rowcount:
+                    claimed.append(row["id"])
+
+        if claimed:
+            logger.info(f"Claimed {len(claimed)} interrupted jobs")
+        return claimed
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Delete completed/failed jobs last updated before the cutoff."""
+        cutoff = time.time() - older_than_seconds
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+
+def _owner_gone(owner: Optional[str]) -> bool:
+    """Check whether the worker process that owns a job no longer exists."""
+    if owner == OWNER_ID:
+        return False
+    try:
+        pid = int((owner or "").split(":")[0])
+    except ValueError:
+        return True
+    if pid == os.getpid():
+        # Same pid but different incarnation: the previous owner was restarted
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
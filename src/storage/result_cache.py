@@ -0,0 +1,239 @@
+"""
+Content-addressed cache for document conversion results.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+
+class ResultCache:
+    """Two-tier (memory + disk) LRU cache for conversion results.
+
+    Entries are JSON-serializable dictionaries keyed by a hash of the uploaded
+    bytes and every option that influences the output. Both tiers are bounded
+    by total size in bytes; the least recently used entries are evicted first.
+
+    The disk tier has no per-process index: several processes (e.g. gunicorn
+    workers) may share one directory. Lookups go to the entry's file, an entry's
+    mtime is its last use, and the size budget is measured from the directory,
+    so it holds for all processes together.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "temp/cache",
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        disk_scan_interval: float = 5.0,
+    ):
+        """
+        Initialize result cache.
+
+        Args:
+            cache_dir: Directory for on-disk entries
+            max_memory_bytes: Size budget of the in-memory tier (0 disables it)
+            max_disk_bytes: Size budget of the on-disk tier (0 disables it)
+            disk_scan_interval: Seconds between directory scans that enforce the
+                disk budget; a write that would exceed the budget as last measured
+                scans immediately
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_scan_interval = disk_scan_interval
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        # Directory size as of the last scan plus bytes this process wrote since
+        self._disk_entries = 0
+        self._disk_bytes = 0
+        self._last_disk_scan = 0.0
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.max_disk_bytes > 0:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._enforce_disk_budget(force=True)
+            if self._disk_entries:
+                logger.info(f"Result cache: {self._disk_entries} disk entries ({self._disk_bytes} bytes)")
+
+    @staticmethod
+    def make_key(content_hash: str, **options: Any) -> str:
+        """
+        Build a cache key from the content hash and conversion options.
+
+        Args:
+            content_hash: SHA-256 hex digest of the uploaded bytes
+            **options: Options that change the output (flags, converter versions, ...)
+
+        Returns:
+            Hex digest identifying the cached result
+        """
+        option_str = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{option_str}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get on-disk path for a cache key."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return json.loads(data)
+
+            if self.max_disk_bytes > 0:
+                # Entries written by other processes are found as well
+                entry_path = self._entry_path(key)
+                try:
+                    data = entry_path.read_bytes()
+                    os.utime(entry_path)
+                except OSError:
+                    pass
+                else:
+                    self._remember(key, data)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(data)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Cache key from make_key()
+            value: JSON-serializable result dictionary
+        """
+        data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+
+        with self._lock:
+            self._remember(key, data)
+
+            if self.max_disk_bytes > 0 and len(data) <= self.max_disk_bytes:
+                entry_path = self._entry_path(key)
+                try:
+                    entry_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Per-process temp name: workers may write the same key at once
+                    tmp_path = entry_path.with_name(f"{key}.{os.getpid()}.tmp")
+                    tmp_path.write_bytes(data)
+                    os.replace(tmp_path, entry_path)
+                except OSError as e:
+                    logger.warning(f"Result cache: could not write {entry_path}: {e}")
+                    return
+
+                self._disk_entries += 1
+                self._disk_bytes += len(data)
+                self._enforce_disk_budget()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Insert serialized data into the memory tier (lock held)."""
+        if self.max_memory_bytes <= 0 or len(data) > self.max_memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _scan_disk(self) -> List[Tuple[float, Path, int]]:
+        """List disk entries as (last use, path, size), least recently used first."""
+        entries = []
+        for entry_path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, entry_path, stat.st_size))
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def _enforce_disk_budget(self, force: bool = False) -> None:
+        """Measure the disk tier and remove least recently used entries over budget (lock held)."""
+        now = time.monotonic()
+        if (
+            not force
+            and self._disk_bytes <= self.max_disk_bytes
+            and now - self._last_disk_scan < self.disk_scan_interval
+        ):
+            return
+
+        entries = self._scan_disk()
+        total_bytes = sum(size for _, _, size in entries)
+        removed = 0
+        for _, entry_path, size in entries:
+            if total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass  # Already evicted by another process
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+
+        self.evictions += removed
+        self._disk_entries = len(entries) - removed
+        self._disk_bytes = total_bytes
+        self._last_disk_scan = now
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            for _, entry_path, _ in self._scan_disk():
+                try:
+                    entry_path.unlink()
+                except OSError:
+                    pass
+            self._disk_entries = 0
+            self._disk_bytes = 0
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": self._disk_entries,
+            "disk_bytes": self._disk_bytes,
+        }
@@ -0,0 +1,271 @@
+"""
+Minimal in-process metrics (counters, gauges, histograms) in Prometheus text format.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from cache hits (ms) to large PDFs (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value (backslash, double quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    """Render a {name="value",...} label set."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class: a named metric family with optional labels."""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Label values in declaration order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def export(self) -> Dict[Tuple[str, ...], Any]:
+        """Copy of the current values per label set."""
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def combine(left: Any, right: Any) -> Any:
+        """Merge values of the same label set from two processes."""
+        return left + right
+
+    def _samples(self, values: Dict[Tuple[str, ...], Any], labelnames: Tuple[str, ...]) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+    def render(
+        self,
+        values: Optional[Dict[Tuple[str, ...], Any]] = None,
+        labelnames: Optional[Tuple[str, ...]] = None,
+    ) -> str:
+        """Render HELP/TYPE lines and all samples (own values unless given)."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._samples(self.export() if values is None else values, labelnames or self.labelnames))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (set at scrape time for pool/cache state).
+
+    Gauges are not summed across processes; each worker's value is reported
+    with an extra ``worker`` label instead.
+    """
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Values per label set: [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set."""
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def export(self) -> Dict[Tuple[str, ...], Any]:
+        with self._lock:
+            return {key: [list(state[0]), state[1]] for key, state in self._values.items()}
+
+    @staticmethod
+    def combine(left: Any, right: Any) -> Any:
+        return [[a + b for a, b in zip(left[0], right[0])], left[1] + right[1]]
+
+    def _samples(self, values: Dict[Tuple[str, ...], Any], labelnames: Tuple[str, ...]) -> List[str]:
+        lines = []
+        for key, (bucket_counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+            labels = _format_labels(labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for a /metrics endpoint.
+
+    With ``multiprocess_dir`` set (several server worker processes), each
+    process writes a snapshot of its values to ``<dir>/<pid>.json`` and
+    :meth:`render` merges the snapshots of all live workers: counters and
+    histograms are summed, gauges get a ``worker`` label.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        """
+        Initialize registry.
+
+        Args:
+            multiprocess_dir: Shared directory for per-process snapshots (None for single process)
+        """
+        self._metrics: Dict[str, _Metric] = {}
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        if self.multiprocess_dir:
+            self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def write_snapshot(self) -> None:
+        """Write this process's values to the multiprocess directory."""
+        if not self.multiprocess_dir:
+            return
+        snapshot = {
+            name: [[list(key), value] for key, value in metric.export().items()]
+            for name, metric in self._metrics.items()
+        }
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, path)
+
+    def remove_snapshot(self, pid: int) -> None:
+        """Forget the snapshot of an exited worker process."""
+        if self.multiprocess_dir:
+            (self.multiprocess_dir / f"{pid}.json").unlink(missing_ok=True)
+
+    def _merged_values(self) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+        """Combine the snapshots of all worker processes."""
+        self.write_snapshot()
+        merged: Dict[str, Dict[Tuple[str, ...], Any]] = {name: {} for name in self._metrics}
+
+        for path in self.multiprocess_dir.glob("*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # Worker is replacing its file right now
+
+            for name, items in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for key, value in items:
+                    key = tuple(key) + ((path.stem,) if isinstance(metric, Gauge) else ())
+                    values[key] = metric.combine(values[key], value) if key in values else value
+
+        return merged
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        if not self.multiprocess_dir:
+            return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+        merged = self._merged_values()
+        parts = []
+        for name, metric in self._metrics.items():
+            labelnames = metric.labelnames + (("worker",) if isinstance(metric, Gauge) else ())
+            parts.append(metric.render(merged[name], labelnames))
+        return "\n".join(parts) + "\n"
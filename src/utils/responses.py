@@ -0,0 +1,178 @@
+"""
+Fast JSON responses with negotiated compression for large payloads.
+"""
+import asyncio
+import gzip
+import json
+from typing import Any, Dict, NamedTuple, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from loguru import logger
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.warning("orjson not available - using json for fast responses")
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    logger.warning("brotli not available - br response compression disabled")
+    BROTLI_AVAILABLE = False
+
+
+# Bodies below this size are sent uncompressed (compression would not pay off)
+MIN_COMPRESS_SIZE = 1024
+# FastJSONResponse.create() compresses bodies of at least this size in a worker thread
+THREAD_COMPRESS_SIZE = 64 * 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON (non-ASCII kept as-is, unknown types via str())."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best supported content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        "br", "gzip" or None
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    candidates = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content encoding ("br" or "gzip")."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class EncodedBody(NamedTuple):
+    """A serialized JSON body, compressed as negotiated (see encode_body())."""
+
+    body: bytes
+    compressible: bool
+    content_encoding: Optional[str]
+
+
+def encode_body(body: bytes, accept_encoding: str, min_compress_size: int = MIN_COMPRESS_SIZE) -> EncodedBody:
+    """
+    Compress a serialized body for a request's Accept-Encoding if it is large enough.
+
+    Args:
+        body: Serialized JSON
+        accept_encoding: Raw Accept-Encoding header value of the request
+        min_compress_size: Smallest body (bytes) that gets compressed
+
+    Returns:
+        EncodedBody with the bytes to send and their content encoding (None if sent as-is)
+    """
+    if len(body) < min_compress_size:
+        return EncodedBody(body, False, None)
+    encoding = choose_encoding(accept_encoding)
+    return EncodedBody(compress(body, encoding) if encoding else body, True, encoding)
+
+
+class FastJSONResponse(Response):
+    """JSON response that serializes with orjson and compresses large bodies.
+
+    Returning this from a handler bypasses FastAPI's jsonable_encoder pass,
+    so the content must already be plain dicts/lists/str/numbers.
+    Compression follows the request's Accept-Encoding (br preferred, then gzip).
+    The constructor compresses on the calling thread; async handlers use
+    create() so large bodies are compressed off the event loop.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        request: Optional[Request] = None,
+        min_compress_size: int = MIN_COMPRESS_SIZE,
+    ):
+        """
+        Initialize response.
+
+        Args:
+            content: JSON-serializable content, or an EncodedBody rendered by create()
+            status_code: HTTP status code
+            headers: Extra response headers
+            request: Incoming request, used for Accept-Encoding negotiation
+            min_compress_size: Smallest body (bytes) that gets compressed
+        """
+        self._accept_encoding = request.headers.get("accept-encoding", "") if request is not None else ""
+        self._min_compress_size = min_compress_size
+        self._compressible = False
+        self._content_encoding: Optional[str] = None
+        super().__init__(content=content, status_code=status_code, headers=headers)
+        if self._compressible:
+            # Large bodies differ by Accept-Encoding, even when sent uncompressed
+            self.headers["Vary"] = "Accept-Encoding"
+        if self._content_encoding:
+            self.headers["Content-Encoding"] = self._content_encoding
+
+    @classmethod
+    async def create(
+        cls,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        request: Optional[Request] = None,
+        min_compress_size: int = MIN_COMPRESS_SIZE,
+    ) -> "FastJSONResponse":
+        """
+        Build a response without compressing a large body on the event loop.
+
+        Serialization runs inline; bodies of THREAD_COMPRESS_SIZE bytes or more
+        are compressed in a worker thread. Arguments are those of the constructor.
+        """
+        body = dumps(content)
+        accept_encoding = request.headers.get("accept-encoding", "") if request is not None else ""
+        if len(body) >= max(min_compress_size, THREAD_COMPRESS_SIZE):
+            encoded = await asyncio.to_thread(encode_body, body, accept_encoding, min_compress_size)
+        else:
+            encoded = encode_body(body, accept_encoding, min_compress_size)
+        return cls(encoded, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, EncodedBody):
+            encoded = content
+        else:
+            encoded = encode_body(dumps(content), self._accept_encoding, self._min_compress_size)
+        self._compressible = encoded.compressible
+        self._content_encoding = encoded.content_encoding
+        return encoded.body
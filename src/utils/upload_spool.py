@@ -0,0 +1,180 @@
+"""
+Stream uploaded files to disk in fixed-size chunks, and cap request body sizes.
+"""
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+@dataclass
+class SpooledUpload:
+    """An upload written to disk, with its size and SHA-256 digest."""
+
+    path: Path
+    size: int
+    sha256: str
+
+
+async def spool_upload(
+    upload: UploadFile,
+    destination: Path,
+    max_size: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Copy an upload to disk chunk by chunk, hashing it on the fly.
+
+    Only one chunk is held in memory at a time, so peak memory does not grow
+    with the file size. The partial file is removed if the upload is too large.
+    Starlette has already received the whole request body by the time the
+    UploadFile exists; RequestBodyLimitMiddleware caps that earlier step.
+
+    Args:
+        upload: FastAPI upload
+        destination: File path to write
+        max_size: Maximum allowed size in bytes (None for unlimited)
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        SpooledUpload with path, size and hex digest
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_size
+    """
+    # Size of the parsed upload is known, no need to copy an oversized file
+    if max_size is not None and upload.size is not None and upload.size > max_size:
+        raise UploadTooLargeError(f"File too large: {upload.size} bytes (max {max_size} bytes)")
+
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(destination, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(f"File too large: more than {max_size} bytes")
+
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    return SpooledUpload(path=destination, size=size, sha256=digest.hexdigest())
+
+
+def spool_file(
+    source: BinaryIO,
+    destination: Path,
+    max_size: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Blocking variant of spool_upload() for file objects (e.g. zip archive members).
+
+    Args:
+        source: Readable binary file object
+        destination: File path to write
+        max_size: Maximum allowed size in bytes (None for unlimited)
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        SpooledUpload with path, size and hex digest
+
+    Raises:
+        UploadTooLargeError: If the content exceeds max_size
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(destination, "wb") as f:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(f"File too large: more than {max_size} bytes")
+
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    return SpooledUpload(path=destination, size=size, sha256=digest.hexdigest())
+
+
+class RequestBodyLimitMiddleware:
+    """ASGI middleware that rejects request bodies over a size limit with 413.
+
+    Starlette parses a multipart body completely, spooling files to its own
+    temporary files, before the endpoint runs, so a size check in the
+    endpoint comes after the whole body has been received. This middleware
+    answers before the body is read when Content-Length is over the limit,
+    and stops reading a body without (or with a wrong) Content-Length as soon
+    as it grows past the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            max_body_size: Maximum request body size in bytes
+            path_limits: Different limits for specific paths (e.g. batch uploads)
+        """
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self.path_limits.get(scope["path"], self.max_body_size)
+        detail = f"Request body too large (max {max_size} bytes)"
+
+        try:
+            declared = int(Headers(scope=scope).get("content-length", 0))
+        except ValueError:
+            declared = 0
+        if declared > max_size:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    # Raised inside request parsing; FastAPI turns it into the response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
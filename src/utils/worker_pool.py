@@ -0,0 +1,193 @@
+"""
+Bounded worker pool for running blocking pipeline calls off the event loop.
+"""
+import asyncio
+import functools
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from loguru import logger
+
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process can actually use.
+
+    Respects CPU affinity (taskset, cpusets) and a cgroup v2 CPU quota
+    (e.g. ``docker run --cpus``), which os.cpu_count() ignores.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open(CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+def server_worker_cpus() -> int:
+    """
+    Number of CPUs one server worker process should size its pools for.
+
+    Every gunicorn worker builds its own worker pools. gunicorn.conf.py sets
+    CPUS_PER_WORKER to available_cpus() // workers, so the pools of all
+    workers together match the CPUs instead of workers x CPUs. Without it
+    (a single uvicorn process) this is available_cpus().
+    """
+    try:
+        cpus = int(os.getenv("CPUS_PER_WORKER", "0"))
+    except ValueError:
+        cpus = 0
+    return max(1, cpus) if cpus else available_cpus()
+
+
+class WorkerPoolFullError(RuntimeError):
+    """Raised when the pool already holds as many calls as it is allowed to queue."""
+
+
+class WorkerPool:
+    """Run blocking callables in a thread or process pool with a bounded queue.
+
+    Calls beyond ``max_workers`` wait in the executor queue. Once
+    ``max_workers + max_queue`` calls are in flight, new submissions are
+    rejected with :class:`WorkerPoolFullError` instead of piling up.
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: int = 16,
+        name: str = "pipeline",
+    ):
+        """Initialize worker pool.
+
+        Args:
+            kind: "thread" or "process". Process pools require picklable callables.
+            max_workers: Number of workers (default: server_worker_cpus())
+            max_queue: Maximum number of calls waiting for a free worker
+            name: Pool name used in logs and thread names
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unsupported worker pool kind: {kind}. Use one of {self.KINDS}")
+
+        self.kind = kind
+        self.max_workers = max_workers or server_worker_cpus()
+        self.max_queue = max(0, max_queue)
+        self.name = name
+
+        # Executor is created lazily so the pool can be constructed before a fork
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of calls running or queued at once."""
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently running or queued."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        """Create the underlying executor on first use."""
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn avoids forking a process that already runs event loop threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                )
+            logger.info(
+                f"Started {self.kind} pool '{self.name}' "
+                f"(workers={self.max_workers}, max_queue={self.max_queue})"
+            )
+        return self._executor
+
+    def _release(self, _future) -> None:
+        """Release a slot once the call has actually finished in the worker."""
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool and await its result.
+
+        Args:
+            func: Callable to execute
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+
+        Raises:
+            WorkerPoolFullError: If the pool is at capacity
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise WorkerPoolFullError(
+                    f"Worker pool '{self.name}' is full "
+                    f"({self._in_flight} calls in flight, capacity {self.capacity})"
+                )
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        # The slot is freed when the worker finishes, even if the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            logger.info(f"Stopped worker pool '{self.name}'")
@@ -0,0 +1,217 @@
+"""
+Per-request temporary workspaces and garbage collection of downloadable outputs.
+"""
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from loguru import logger
+
+
+TMPFS_DIR = Path("/dev/shm")
+# Subdirectory of the output directory holding the cleaned file cache
+# (CleanedFileCache); it has its own TTL and size budget
+CACHE_DIR_NAME = "cache"
+
+
+@dataclass
+class Workspace:
+    """A unique scratch directory for one request."""
+
+    id: str
+    path: Path
+
+    def file(self, filename: str) -> Path:
+        """Get a path inside the workspace for an (untrusted) upload filename."""
+        return self.path / Path(filename).name
+
+
+class WorkspaceManager:
+    """Hand out isolated request directories and keep the output directory bounded.
+
+    Scratch files (uploads, intermediate cleaned files) live in a per-request
+    directory that is removed when the request finishes. Files meant for later
+    download live in ``output_dir/<workspace id>/`` and are reclaimed by
+    :meth:`collect_garbage` once they exceed the TTL or the total size budget.
+    Cached cleaned files live in ``output_dir/cache/<key[:2]>/<key>/``; they are
+    shared by all clients, so they are neither listed nor downloadable (hits are
+    copied into the requesting workspace) and are left to the cache's own
+    garbage collection.
+    """
+
+    def __init__(
+        self,
+        root: str = "temp/work",
+        output_dir: str = "temp/cleaned",
+        use_tmpfs: bool = False,
+        output_ttl_seconds: float = 24 * 3600,
+        output_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Initialize workspace manager.
+
+        Args:
+            root: Directory for per-request scratch workspaces
+            output_dir: Directory for downloadable outputs
+            use_tmpfs: Put scratch workspaces on /dev/shm when available
+            output_ttl_seconds: Remove outputs older than this
+            output_max_bytes: Total size budget for outputs (oldest removed first)
+        """
+        self.root = Path(root)
+        if use_tmpfs:
+            if TMPFS_DIR.is_dir():
+                self.root = TMPFS_DIR / "api4chatbot-work"
+            else:
+                logger.warning(f"tmpfs requested but {TMPFS_DIR} not available, using {self.root}")
+
+        self.output_dir = Path(output_dir)
+        self.output_ttl_seconds = output_ttl_seconds
+        self.output_max_bytes = output_max_bytes
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def create(self) -> Workspace:
+        """Create a unique scratch directory. Pair with release()."""
+        workspace_id = uuid.uuid4().hex
+        path = self.root / workspace_id
+        path.mkdir(parents=True)
+        return Workspace(id=workspace_id, path=path)
+
+    def release(self, workspace: Workspace) -> None:
+        """Remove a scratch directory and everything in it."""
+        shutil.rmtree(workspace.path, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self) -> Iterator[Workspace]:
+        """Create a unique scratch directory, removed when the block exits."""
+        workspace = self.create()
+        try:
+            yield workspace
+        finally:
+            self.release(workspace)
+
+    def output_dir_for(self, workspace: Workspace) -> Path:
+        """Get (and create) the download directory for a workspace."""
+        path = self.output_dir / workspace.id
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def relative_output_name(self, output_path: Path) -> str:
+        """Name of an output file relative to the output directory (used in download URLs)."""
+        return Path(output_path).resolve().relative_to(self.output_dir.resolve()).as_posix()
+
+    def resolve_output(self, name: str) -> Optional[Path]:
+        """
+        Resolve a download name to a file inside the output directory.
+
+        Args:
+            name: Relative output name (e.g. "<workspace id>/cleaned_x.pdf")
+
+        Returns:
+            Absolute path, or None if the name points outside the output directory
+        """
+        base_dir = self.output_dir.resolve()
+        file_path = (base_dir / name).resolve()
+        if file_path != base_dir and base_dir not in file_path.parents:
+            return None
+        if file_path.relative_to(base_dir).parts[:1] == (CACHE_DIR_NAME,):
+            return None
+        return file_path
+
+    @property
+    def cache_dir(self) -> Path:
+        """Directory of the cleaned file cache inside the output directory."""
+        return self.output_dir / CACHE_DIR_NAME
+
+    def list_outputs(self) -> List[Dict[str, Any]]:
+        """List downloadable output files, newest first."""
+        files = []
+        for file_path in self.output_dir.rglob("*"):
+            relative = file_path.relative_to(self.output_dir)
+            # Cache entries are shared between clients, not downloads
+            if relative.parts[0] == CACHE_DIR_NAME:
+                continue
+            try:
+                if not file_path.is_file():
+                    continue
+                stat = file_path.stat()
+            except OSError:
+                continue
+            files.append({
+                "filename": relative.as_posix(),
+                "size": stat.st_size,
+                "modified": stat.st_mtime,
+            })
+        return sorted(files, key=lambda f: f["modified"], reverse=True)
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """
+        Remove expired outputs, then the oldest outputs until within the size budget.
+
+        Also removes scratch workspaces left behind by crashed workers.
+
+        Returns:
+            Counts of removed entries and bytes
+        """
+        now = time.time()
+        removed_entries = 0
+        removed_bytes = 0
+
+        # Scratch directories normally disappear with their request
+        for path in self.root.iterdir():
+            try:
+                if now - path.stat().st_mtime <= self.output_ttl_seconds:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink()
+                removed_entries += 1
+            except OSError:
+                continue
+
+        # Outputs are grouped per workspace directory (legacy flat files are entries too)
+        entries = []
+        for path in self.output_dir.iterdir():
+            if path.name == CACHE_DIR_NAME:
+                continue
+            try:
+                if path.is_dir():
+                    files = [f for f in path.rglob("*") if f.is_file()]
+                    size = sum(f.stat().st_size for f in files)
+                    mtime = max((f.stat().st_mtime for f in files), default=path.stat().st_mtime)
+                else:
+                    size = path.stat().st_size
+                    mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((mtime, path, size))
+
+        entries.sort(key=lambda entry: entry[0])
+        total_bytes = sum(size for _, _, size in entries)
+
+        for mtime, path, size in entries:
+            expired = now - mtime > self.output_ttl_seconds
+            over_budget = total_bytes > self.output_max_bytes
+            if not expired and not over_budget:
+                continue
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove output {path}: {e}")
+                continue
+            total_bytes -= size
+            removed_entries += 1
+            removed_bytes += size
+
+        if removed_entries:
+            logger.info(f"Workspace GC removed {removed_entries} entries ({removed_bytes} bytes)")
+
+        return {"removed_entries": removed_entries, "removed_bytes": removed_bytes, "output_bytes": total_bytes}
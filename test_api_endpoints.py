@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test API handlers and their helpers with the heavy converters replaced by fakes.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import src.api as api
+from src.storage.job_store import JobStore
+from src.storage.result_cache import ResultCache
+from src.utils.worker_pool import WorkerPool
+
+# Without a "with" block the app's startup (warm-up, job recovery) does not run
+client = TestClient(api.app)
+
+
+class FakeMarkdownConverter:
+    """Stands in for MarkdownConverter; records the options of each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def convert(self, file_path, data=None, **options):
+        self.calls.append((file_path, options))
+        metadata = {
+            "source_file": file_path,
+            "page_count": 1,
+            # Per-run stats of a large PDF conversion
+            "low_memory": {"window_pages": 16, "peak_rss_delta_mb": 12.5},
+            "page_cache": {"hits": 0, "misses": 1},
+        }
+        return {"markdown": f"# {Path(file_path).name}", "metadata": metadata}
+
+    def convert_markdown(self, converter_options, file_path, **kwargs):
+        """Replacement for pipeline.convert_markdown(), which src.api dispatches through."""
+        return self.convert(file_path, **kwargs)
+
+
+class ThreadRecordingJobStore(JobStore):
+    """JobStore that records which thread each call runs on."""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.threads = []
+
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if name not in ("get", "get_input_path", "start_stage", "finish_stage", "set_status", "complete", "fail"):
+            return attr
+        threads = super().__getattribute__("threads")
+
+        def call(*args, **kwargs):
+            threads.append((name, threading.current_thread()))
+            return attr(*args, **kwargs)
+
+        return call
+
+
+@contextmanager
+def patched(**attrs):
+    """Temporarily replace module globals of src.api."""
+    originals = {name: getattr(api, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(api, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(api, name, value)
+
+
+def test_cached_result_source_file():
+    """Cached results do not leak the temp path or the per-run stats of the upload that produced them."""
+    print("=" * 70)
+    print("TEST 1: Result cache and metadata.source_file")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache = ResultCache(cache_dir=str(tmp_path / "cache"), max_memory_bytes=0)
+        converter = FakeMarkdownConverter()
+        first = tmp_path / "first" / "notes.txt"
+        second = tmp_path / "second" / "notes.txt"
+
+        with patched(result_cache=cache, markdown_converter=converter, convert_markdown=converter.convert_markdown):
+            fresh = asyncio.run(api.convert_document(first, "same-hash", clean_before_convert=False))
+            cached = asyncio.run(api.convert_document(second, "same-hash", clean_before_convert=False))
+
+        assert not fresh["cache_hit"] and cached["cache_hit"] and len(converter.calls) == 1
+        assert cached["metadata"]["source_file"] == str(second), cached["metadata"]
+        stored = cache.get(api.markdown_cache_key("same-hash", ".txt", False))
+        assert "source_file" not in stored["metadata"], stored["metadata"]
+        print(f"✓ Stored without source_file, hit reports {cached['metadata']['source_file']}")
+
+        assert "page_cache" not in stored["metadata"], stored["metadata"]
+        assert stored["metadata"]["low_memory"] == {"window_pages": 16}, stored["metadata"]
+        assert fresh["metadata"]["low_memory"]["peak_rss_delta_mb"] == 12.5, fresh["metadata"]
+        print("✓ Per-run memory and page cache stats not replayed on hits")
+
+
+def test_job_store_off_event_loop():
+    """A background job reads and writes its SQLite state from worker threads only."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Job store calls stay off the event loop")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        store = ThreadRecordingJobStore(str(tmp_path / "jobs.db"))
+        input_path = tmp_path / "job" / "notes.txt"
+        input_path.parent.mkdir()
+        input_path.write_text("notes", encoding="utf-8")
+        job_id = store.create(
+            "notes.txt",
+            str(input_path),
+            {"output_format": "markdown", "clean_before_convert": False, "content_hash": "job-hash"},
+            ["markdown"],
+        )
+        store.threads.clear()
+
+        cache = ResultCache(cache_dir=str(tmp_path / "cache"), max_memory_bytes=0)
+        converter = FakeMarkdownConverter()
+        with patched(
+            job_store=store,
+            result_cache=cache,
+            markdown_converter=converter,
+            convert_markdown=converter.convert_markdown,
+        ):
+            asyncio.run(api.run_job(job_id))
+
+        loop_calls = [name for name, thread in store.threads if thread is threading.main_thread()]
+        assert store.threads and not loop_calls, f"Called on the event loop: {loop_calls}"
+        assert not input_path.parent.exists(), "Job directory left behind"
+        job = store.get(job_id)
+        assert job["status"] == "completed", job
+        assert job["stages"]["markdown"]["status"] == "done", job["stages"]
+        print(f"✓ {len(store.threads) - 1} job store calls, none on the event loop")
+
+
+def test_batch_extraction_options():
+    """POST /documents/batch passes pages/start_heading to every file and validates them."""
+    print("\n" + "=" * 70)
+    print("TEST 3: /documents/batch with and without pages/start_heading")
+    print("=" * 70)
+
+    calls = []
+
+    def fake_process_document(file_path, output_format, clean_before_convert, work_dir,
+                              markdown_result=None, in_memory_max_bytes=0, extract_options=None):
+        calls.append(extract_options)
+        return {"markdown_result": {"markdown": "# done", "metadata": {}}, "timings": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResultCache(cache_dir=str(Path(tmp_dir) / "cache"), max_memory_bytes=0)
+        pool = WorkerPool(kind="thread", max_workers=2, name="batch")
+        files = [("files", ("a.txt", b"first", "text/plain")), ("files", ("b.txt", b"second", "text/plain"))]
+
+        try:
+            with patched(batch_pool=pool, process_document=fake_process_document, result_cache=cache):
+                response = client.post("/documents/batch", files=files)
+                assert response.status_code == 200, response.text
+                lines = [json.loads(line) for line in response.text.splitlines()]
+                assert [line["status"] for line in lines[:-1]] == ["success", "success"], lines
+                assert lines[-1]["succeeded"] == 2, lines[-1]
+                assert calls == [{}, {}], calls
+                print("✓ Without options: whole documents")
+
+                calls.clear()
+                params = {"pages": "2-3", "start_heading": "^Chương"}
+                response = client.post("/documents/batch", files=files, params=params)
+                assert response.status_code == 200, response.text
+                assert calls == [params, params], calls
+                print(f"✓ With options: {calls[0]} passed to every file")
+
+                calls.clear()
+                response = client.post("/documents/batch", files=files, params={"pages": "3-1"})
+                assert response.status_code == 400 and not calls, response.text
+                response = client.post("/documents/batch", files=files, params={"start_heading": "("})
+                assert response.status_code == 400 and not calls, response.text
+                print("✓ Invalid page range or regex rejected with 400")
+        finally:
+            pool.shutdown()
+
+
+def test_job_extraction_options():
+    """POST /jobs stores validated pages/start_heading in the job options."""
+    print("\n" + "=" * 70)
+    print("TEST 4: /jobs with and without pages/start_heading")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs_dir = Path(tmp_dir) / "jobs"
+        store = JobStore(db_path=str(Path(tmp_dir) / "jobs.db"))
+        scheduled = []
+        upload = {"file": ("tariff.pdf", b"%PDF-1.7 test", "application/pdf")}
+
+        with patched(job_store=store, JOBS_DIR=jobs_dir, schedule_job=scheduled.append):
+            response = client.post("/jobs", files=upload)
+            assert response.status_code == 202, response.text
+            job = store.get(response.json()["job_id"])
+            assert job["options"]["extract_options"] == {}, job["options"]
+            print("✓ Without options: job queued for the whole document")
+
+            params = {"pages": "5-12,20", "start_heading": "^Biểu giá"}
+            response = client.post("/jobs", files=upload, params=params)
+            assert response.status_code == 202, response.text
+            job = store.get(response.json()["job_id"])
+            assert job["options"]["extract_options"] == params, job["options"]
+            assert len(scheduled) == 2, scheduled
+            print(f"✓ With options: {job['options']['extract_options']}")
+
+            for bad in ({"pages": "0"}, {"start_heading": "[unclosed"}):
+                response = client.post("/jobs", files=upload, params=bad)
+                assert response.status_code == 400, response.text
+            assert len(list(jobs_dir.iterdir())) == 2, "Rejected jobs must not spool their upload"
+            print("✓ Invalid page range or regex rejected with 400 before spooling")
+
+
+def test_markdown_response():
+    """POST /documents/markdown returns the markdown without writing a review copy to disk."""
+    print("\n" + "=" * 70)
+    print("TEST 5: /documents/markdown response")
+    print("=" * 70)
+
+    review_copy = Path("sample") / "markdown_v1.md"
+    before = review_copy.stat().st_mtime_ns if review_copy.exists() else None
+
+    async def fake_convert_document(source_file, content_hash, clean_before_convert, **kwargs):
+        return {"markdown": "# Biểu giá\n", "metadata": {"source_file": str(source_file)}, "cache_hit": False}
+
+    with patched(convert_document=fake_convert_document):
+        response = client.post("/documents/markdown", files={"file": ("tariff.pdf", b"%PDF-1.7 test", "application/pdf")})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["markdown_content"] == "# Biểu giá\n" and "output_file" not in body, body
+    after = review_copy.stat().st_mtime_ns if review_copy.exists() else None
+    assert after == before, f"{review_copy} was written"
+    print(f"✓ {body['message']}, nothing written to {review_copy}")
+
+
+if __name__ == "__main__":
+    try:
+        test_cached_result_source_file()
+        test_job_store_off_event_loop()
+        test_batch_extraction_options()
+        test_job_extraction_options()
+        test_markdown_response()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
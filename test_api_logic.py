@@ -7,12 +7,21 @@ import sys
 import ast
 from pathlib import Path
 
+def function_source(source: str, tree: ast.AST, name: str) -> str:
+    """Source of a top-level (async) function in src/api.py, or "" if missing."""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == name:
+            return ast.get_source_segment(source, node)
+    return ""
+
+
 def analyze_api_function():
     """Analyze convert_to_markdown function for correctness."""
     api_file = Path("src/api.py")
 
     with open(api_file, "r") as f:
-        tree = ast.parse(f.read())
+        api_source = f.read()
+    tree = ast.parse(api_source)
 
     # Find convert_to_markdown function
     for node in ast.walk(tree):
@@ -32,27 +41,28 @@ def analyze_api_function():
                 "temp_file_save": False,
                 "file_cleaning": False,
                 "markdown_conversion": False,
-                "markdown_saving": False,
                 "response_generation": False,
                 "temp_cleanup": False,
             }
 
-            source = ast.get_source_segment(open(api_file).read(), node)
+            source = ast.get_source_segment(api_source, node)
+            # Cleaning and conversion run in the shared helpers (result cache, worker pool)
+            helpers = function_source(api_source, tree, "convert_document") + function_source(
+                api_source, tree, "clean_for_conversion"
+            )
 
             # Simple pattern matching
             if "allowed_extensions" in source:
                 operations["file_validation"] = True
-            if "temp_file" in source and "write" in source:
+            if "save_upload(file, temp_file)" in source:
                 operations["temp_file_save"] = True
-            if "file_cleaner" in source:
+            if "convert_document(" in source and "file_cleaner" in helpers:
                 operations["file_cleaning"] = True
-            if "markdown_converter.convert" in source:
+            if "convert_document(" in source and "convert_markdown" in helpers:
                 operations["markdown_conversion"] = True
-            if "markdown_output_path" in source and "write" in source:
-                operations["markdown_saving"] = True
-            if "return {" in source:
+            if "return await FastJSONResponse.create({" in source:
                 operations["response_generation"] = True
-            if "temp_file.unlink()" in source:
+            if "workspace_manager.release(workspace)" in source:
                 operations["temp_cleanup"] = True
 
             print("\nOperation Checklist:")
@@ -102,17 +112,17 @@ def check_no_hardcoded_paths():
     else:
         print("✓ No reference markdown input bypass")
 
-    # Verify proper use of temp directory
-    if "temp_dir = Path" in func_content and 'temp_file = temp_dir' in func_content:
+    # Verify proper use of temp directory (one isolated workspace per request)
+    if "workspace = workspace_manager.create()" in func_content and "temp_file = workspace.file(" in func_content:
         print("✓ Proper temp file handling")
     else:
         print("⚠ Temp file handling unclear")
 
-    # Verify sample directory is used for OUTPUT only
-    if "markdown_output_path = sample_dir" in func_content:
-        print("✓ Sample directory used correctly for output")
+    # The sample directory holds reference documents; requests never write there
+    if 'Path("sample")' in func_content:
+        issues.append("✗ Request writes to the sample directory")
     else:
-        print("⚠ Sample directory handling unclear")
+        print("✓ Sample directory not written")
 
     return len(issues) == 0
 
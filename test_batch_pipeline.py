@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the single-document pipeline used by /documents/batch workers.
+"""
+
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core import pipeline
+from src.core.pipeline import convert_markdown, process_document
+
+
+def test_pipeline_runs_requested_stages():
+    """Markdown and bullet stages run and are timed."""
+    print("=" * 70)
+    print("TEST 1: Pipeline stages")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "notes.txt"
+        source.write_text("First line\nSecond line", encoding="utf-8")
+
+        result = process_document(str(source), output_format="bullet")
+
+        assert "First line" in result["markdown_result"]["markdown"], result
+        assert "bullet_content" in result, result
+        assert set(result["timings"]) == {"markdown", "bullet"}, result["timings"]
+        assert not result["cleaned"], "TXT files are never cleaned"
+        print(f"✓ Stages: {sorted(result['timings'])}")
+
+        # Converters are created once per process and reused
+        converter = pipeline.get_markdown_converter()
+        process_document(str(source))
+        assert pipeline.get_markdown_converter() is converter, "Converter was re-created"
+        print("✓ Converter instance reused")
+
+
+def test_pipeline_reuses_markdown_result():
+    """A cached markdown result skips cleaning and extraction."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Cached markdown result")
+    print("=" * 70)
+
+    cached = {"markdown": "# Title\n\nBody", "metadata": {"title": "Title"}}
+    result = process_document("missing.pdf", output_format="html", markdown_result=cached)
+
+    assert result["markdown_result"] is cached, result
+    assert "<h1" in result["html_content"], result["html_content"][:200]
+    assert set(result["timings"]) == {"html"}, result["timings"]
+    print("✓ Only the html stage ran")
+
+
+def test_pipeline_is_picklable():
+    """process_document can be sent to a process pool."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Picklable entry point")
+    print("=" * 70)
+
+    assert pickle.loads(pickle.dumps(process_document)) is process_document
+    try:
+        process_document("x.txt", output_format="pdf")
+        raise AssertionError("Unsupported format should be rejected")
+    except ValueError as e:
+        print(f"✓ Picklable; rejects bad format: {e}")
+
+
+def test_convert_markdown_reuses_converter():
+    """convert_markdown() pickles without a converter and reuses one per set of options."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Per-process markdown converter")
+    print("=" * 70)
+
+    options = {"page_workers": 2, "page_cache_dir": None}
+    assert pickle.loads(pickle.dumps(convert_markdown)) is convert_markdown
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "notes.txt"
+        source.write_text("First line", encoding="utf-8")
+
+        converter = pipeline.get_markdown_converter(options)
+        result = convert_markdown(dict(options), str(source))
+        assert "First line" in result["markdown"], result
+        assert pipeline.get_markdown_converter(options) is converter, "Converter was re-created"
+        assert converter.page_workers == 2
+        assert pipeline.get_markdown_converter() is not converter, "Options were ignored"
+        print("✓ One converter per process and options")
+
+
+if __name__ == "__main__":
+    try:
+        test_pipeline_runs_requested_stages()
+        test_pipeline_reuses_markdown_result()
+        test_pipeline_is_picklable()
+        test_convert_markdown_reuses_converter()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test process-parallel content-stream filtering in FileCleaner.
+"""
+
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core.file_cleaner import FileCleaner, shutdown_clean_pool
+
+
+def build_pdf(path: Path, pages: int) -> None:
+    """Pages with a top page number, body text, a footer rule and a small watermark stream."""
+    import pikepdf
+
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(pikepdf.Dictionary(
+        Type=pikepdf.Name.Font, Subtype=pikepdf.Name.Type1, BaseFont=pikepdf.Name.Helvetica
+    ))
+    for page_num in range(1, pages + 1):
+        lines = [f"BT /F1 9 Tf 1 0 0 1 290 815 Tm ({page_num}) Tj ET"]
+        lines += [f"BT /F1 11 Tf 1 0 0 1 50 {760 - 16 * i} Tm (Body line {i} of page {page_num}.) Tj ET" for i in range(40)]
+        lines.append("BT /F1 9 Tf 1 0 0 1 50 30 Tm (_______________) Tj ET")
+        watermark = "\n".join(
+            f"BT /F1 40 Tf 0.7 0.7 -0.7 0.7 {150 + 60 * i} 300 Tm (DRAFT - DO NOT COPY) Tj ET" for i in range(3)
+        )
+
+        page = pdf.add_blank_page(page_size=(595, 842))
+        page.obj.Resources = pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font))
+        page.obj.Contents = pikepdf.Array([
+            pdf.make_stream("\n".join(lines).encode("latin-1")),
+            pdf.make_stream(watermark.encode("latin-1")),
+        ])
+    pdf.save(str(path))
+
+
+def content_stream_bytes(page) -> list:
+    """Decoded bytes of each content stream of a page (Contents may be a stream or an array)."""
+    import pikepdf
+
+    contents = page.obj.Contents
+    streams = list(contents) if isinstance(contents, pikepdf.Array) else [contents]
+    return [stream.read_bytes() for stream in streams]
+
+
+def test_parallel_matches_sequential():
+    """Parallel cleaning writes the same content streams and counts as sequential cleaning."""
+    print("=" * 70)
+    print("TEST 1: Sequential vs parallel content filtering")
+    print("=" * 70)
+
+    import pikepdf
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "annex.pdf"
+        build_pdf(source, pages=12)
+
+        sequential = FileCleaner(output_dir=str(Path(tmp_dir) / "sequential"))
+        parallel = FileCleaner(output_dir=str(Path(tmp_dir) / "parallel"), page_workers=2, parallel_min_pages=10)
+        try:
+            ok_seq, message_seq, path_seq = sequential.clean_file(str(source))
+            ok_par, message_par, path_par = parallel.clean_file(str(source))
+        finally:
+            shutdown_clean_pool()
+
+        assert ok_seq and ok_par, (message_seq, message_par)
+        assert message_par == message_seq, (message_par, message_seq)
+        removed = int(re.search(r"and (\d+) header/footer elements", message_seq).group(1))
+        assert removed > 0, message_seq
+        with pikepdf.open(path_seq) as pdf_seq, pikepdf.open(path_par) as pdf_par:
+            assert len(pdf_seq.pages) == len(pdf_par.pages) == 12
+            for page_seq, page_par in zip(pdf_seq.pages, pdf_par.pages):
+                assert content_stream_bytes(page_seq) == content_stream_bytes(page_par)
+    print(f"✓ {message_par}")
+
+
+if __name__ == "__main__":
+    try:
+        test_parallel_matches_sequential()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the per-document decoded content-stream cache in FileCleaner.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core.file_cleaner import ContentStreamCache, FileCleaner
+
+
+class CountingStream:
+    """Stands in for a pikepdf stream; counts decompressions."""
+
+    def __init__(self, objgen, data: bytes):
+        self.objgen = objgen
+        self.data = data
+        self.reads = 0
+
+    def read_bytes(self) -> bytes:
+        self.reads += 1
+        return self.data
+
+
+def test_shared_streams_decoded_once():
+    """Shared streams are decoded once and dropped after their last page."""
+    print("=" * 70)
+    print("TEST 1: Decode once, release after last use")
+    print("=" * 70)
+
+    header = CountingStream((5, 0), b"BT 1 0 0 1 300 820 Tm [(1)] TJ ET")
+    bodies = [CountingStream((10 + idx, 0), f"BT ({idx}) Tj ET".encode()) for idx in range(3)]
+    direct = CountingStream((0, 0), b"q Q")
+    pages = [[header, bodies[0]], [header, bodies[1], header], [bodies[2], direct]]
+
+    cache = ContentStreamCache(pages)
+    for content_streams in pages:
+        stream_data = cache.read(content_streams)
+        assert stream_data == [stream.data for stream in content_streams]
+        cache.release(content_streams)
+
+    assert header.reads == 1, header.reads
+    assert all(body.reads == 1 for body in bodies)
+    assert cache.stats["decoded"] == 5 and cache.stats["reused"] == 2, cache.stats
+    assert cache.stats["peak_cached_bytes"] == len(header.data), cache.stats
+    assert cache.cached_bytes == 0
+    print(f"✓ {cache.summary()}")
+
+
+def contents_of(page) -> list:
+    """A page's content streams, whether /Contents is one stream or an array."""
+    import pikepdf
+
+    contents = page.Contents
+    return list(contents) if isinstance(contents, pikepdf.Array) else [contents]
+
+
+def test_clean_with_shared_header():
+    """Cleaning a PDF whose pages share a header stream matches per-page decoding."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Shared header stream across pages")
+    print("=" * 70)
+
+    import pikepdf
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "shared.pdf"
+        with pikepdf.new() as pdf:
+            header = pdf.make_stream(b"BT /F1 9 Tf 1 0 0 1 290 830 Tm [(7)] TJ ET")
+            for page_num in range(1, 6):
+                pdf.add_blank_page(page_size=(595, 842))
+                body = pdf.make_stream(f"BT /F1 11 Tf 1 0 0 1 50 400 Tm [(Body {page_num})] TJ ET".encode())
+                pdf.pages[-1].Contents = pikepdf.Array([header, body])
+            pdf.save(source)
+
+        cleaner = FileCleaner(output_dir=tmp_dir)
+        with pikepdf.open(source) as cached, pikepdf.open(source) as uncached:
+            cleaner._clean_pdf_pages(cached)
+            for page in uncached.pages:
+                cleaner._remove_header_footer_from_content(page, uncached)
+            for page_cached, page_uncached in zip(cached.pages, uncached.pages):
+                streams_cached = [stream.read_bytes() for stream in contents_of(page_cached)]
+                streams_uncached = [stream.read_bytes() for stream in contents_of(page_uncached)]
+                assert streams_cached == streams_uncached, (streams_cached, streams_uncached)
+    print("✓ Same content streams with and without the document cache")
+
+
+if __name__ == "__main__":
+    try:
+        test_shared_streams_decoded_once()
+        test_clean_with_shared_header()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
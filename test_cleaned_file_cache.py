@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed cache of cleaned files.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.file_cleaner import FileCleaner
+from src.storage.cleaned_file_cache import CleanedFileCache
+from src.utils.workspace import WorkspaceManager
+
+
+def test_hits_skip_cleaning():
+    """The second clean of the same bytes reuses the cached file and message under its own name."""
+    print("=" * 70)
+    print("TEST 1: Cache hit skips cleaning")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache = CleanedFileCache(cache_dir=str(tmp_path / "cache"))
+        cleaner = FileCleaner(output_dir=str(tmp_path / "out"), output_cache=cache)
+
+        calls = []
+
+        def fake_clean_pdf(file_path, output_dir):
+            calls.append(file_path)
+            output_path = output_dir / f"cleaned_{file_path.stem}.pdf"
+            output_path.write_bytes(b"cleaned " + file_path.read_bytes())
+            return True, "PDF cleaned successfully. Removed 2 annotations and 5 header/footer elements.", str(output_path)
+
+        cleaner._clean_pdf = fake_clean_pdf
+
+        first_upload = tmp_path / "first" / "contract.pdf"
+        second_upload = tmp_path / "second" / "renamed.pdf"
+        for upload in (first_upload, second_upload):
+            upload.parent.mkdir()
+            upload.write_bytes(b"%PDF-1.7 same bytes")
+
+        ok, message, first_path = cleaner.clean_file(str(first_upload), str(first_upload.parent))
+        ok_again, message_again, cached_path = cleaner.clean_file(str(second_upload), str(second_upload.parent))
+
+        assert ok and ok_again and len(calls) == 1, calls
+        assert message_again == message, message_again
+        assert Path(cached_path) == second_upload.parent / "cleaned_renamed.pdf", cached_path
+        assert Path(cached_path).read_bytes() == Path(first_path).read_bytes()
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1, cache.stats()
+        print(f"✓ Cleaned once, served {cached_path} from cache")
+
+        entries = [path.name for path in cache.cache_dir.rglob("*.pdf")]
+        assert len(entries) == 1 and "contract" not in entries[0], entries
+        print(f"✓ Cache entry stored as {entries[0]}, without the first upload's name")
+
+        # Callers get their own copies; writing to them leaves the entry intact
+        entry_path = next(cache.cache_dir.rglob("*.pdf"))
+        for output_path in (Path(first_path), Path(cached_path)):
+            assert not output_path.samefile(entry_path), output_path
+            output_path.write_bytes(b"edited by caller")
+        assert entry_path.read_bytes() == b"cleaned %PDF-1.7 same bytes", entry_path.read_bytes()
+        print("✓ Outputs are copies, the cache entry is unchanged")
+
+        # Different bytes, or cache bypassed, clean again
+        second_upload.write_bytes(b"%PDF-1.7 other bytes")
+        cleaner.clean_file(str(second_upload), str(second_upload.parent))
+        cleaner.clean_file(str(first_upload), str(first_upload.parent), use_cache=False)
+        assert len(calls) == 3, calls
+        print("✓ Changed content and use_cache=False are cleaned")
+
+
+def test_ttl_and_size_budget():
+    """Unused entries expire and the least recently used go first over budget."""
+    print("\n" + "=" * 70)
+    print("TEST 2: TTL and size budget")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache = CleanedFileCache(cache_dir=str(tmp_path / "cache"), max_bytes=250, ttl_seconds=3600)
+        source = tmp_path / "cleaned_doc.pdf"
+        source.write_bytes(b"x" * 100)
+
+        for key in ("aa01", "bb02"):
+            cache.put(key, source, key)
+        cache.get("aa01")  # "bb02" is now least recently used
+        cache.put("cc03", source, "cc03")
+        assert cache.get("bb02") is None and cache.get("aa01") is not None
+        print(f"✓ LRU entry evicted: {cache.stats()}")
+
+        meta_path = cache.cache_dir / "cc" / "cc03" / "meta.json"
+        old = time.time() - 7200
+        os.utime(meta_path, (old, old))
+        assert cache.collect_garbage()["removed_entries"] == 1
+        assert cache.get("cc03") is None
+        print("✓ Expired entry removed")
+
+        reopened = CleanedFileCache(cache_dir=str(tmp_path / "cache"), max_bytes=250, ttl_seconds=3600)
+        assert reopened.get("aa01") == (cache.cache_dir / "aa" / "aa01" / "aa01.pdf", "aa01")
+        print("✓ Entries survive a restart")
+
+
+def test_workspace_layout():
+    """Cached files are neither listed nor downloadable; workspace GC leaves them to the cache."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Cache inside the output directory")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = WorkspaceManager(
+            root=str(Path(tmp_dir) / "work"), output_dir=str(Path(tmp_dir) / "cleaned"), output_max_bytes=0
+        )
+        cache = CleanedFileCache(cache_dir=str(manager.cache_dir))
+        source = Path(tmp_dir) / "cleaned_doc.pdf"
+        source.write_bytes(b"pdf")
+        cached_path = cache.put("ab12", source, "ok")
+
+        name = manager.relative_output_name(cached_path)
+        assert name == "cache/ab/ab12/ab12.pdf", name
+        assert manager.list_outputs() == [], manager.list_outputs()
+        assert manager.resolve_output(name) is None
+        print(f"✓ {name} not listed and not downloadable")
+
+        manager.collect_garbage()
+        assert cached_path.exists(), "Workspace GC must not remove cache entries"
+        print("✓ Kept by workspace GC")
+
+
+def test_in_memory_cleaning_uses_cache():
+    """clean_pdf_in_memory() and clean_file() share cache entries."""
+    print("\n" + "=" * 70)
+    print("TEST 4: In-memory cleaning and the cache")
+    print("=" * 70)
+
+    import pikepdf
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache = CleanedFileCache(cache_dir=str(tmp_path / "cache"))
+        cleaner = FileCleaner(output_dir=str(tmp_path / "out"), output_cache=cache)
+
+        calls = []
+        clean_pdf_pages = cleaner._clean_pdf_pages
+
+        def counting_clean_pdf_pages(pdf):
+            calls.append(pdf)
+            return clean_pdf_pages(pdf)
+
+        cleaner._clean_pdf_pages = counting_clean_pdf_pages
+
+        uploads = []
+        for pages in (1, 2):
+            upload = tmp_path / f"upload_{pages}.pdf"
+            pdf = pikepdf.new()
+            for _ in range(pages):
+                pdf.add_blank_page()
+            pdf.save(upload)
+            uploads.append(upload)
+
+        # Cleaned into a file first, then in memory: served from the cache
+        ok, _, output_path = cleaner.clean_file(str(uploads[0]), str(tmp_path / "out"))
+        ok_again, _, cleaned = cleaner.clean_pdf_in_memory(str(uploads[0]))
+        assert ok and ok_again and len(calls) == 1, calls
+        assert cleaned == Path(output_path).read_bytes()
+        print("✓ In-memory clean reuses a file clean")
+
+        # Cleaned in memory first, then into a file
+        ok, _, cleaned = cleaner.clean_pdf_in_memory(str(uploads[1]))
+        ok_again, _, output_path = cleaner.clean_file(str(uploads[1]), str(tmp_path / "out"))
+        assert ok and ok_again and len(calls) == 2, calls
+        assert Path(output_path).read_bytes() == cleaned
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2, cache.stats()
+        print("✓ File clean reuses an in-memory clean")
+
+        cleaner.clean_pdf_in_memory(str(uploads[1]), use_cache=False)
+        assert len(calls) == 3, calls
+        print("✓ use_cache=False cleans again")
+
+
+if __name__ == "__main__":
+    try:
+        test_hits_skip_cleaning()
+        test_ttl_and_size_budget()
+        test_workspace_layout()
+        test_in_memory_cleaning_uses_cache()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
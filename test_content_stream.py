@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the PDF content-stream tokenizer and header/footer filtering built on it.
+"""
+
+import random
+import sys
+
+from src.core.content_stream import ContentStreamError, array_elements, iter_operations
+from src.core.file_cleaner import FileCleaner
+
+
+def test_tokenizer():
+    """Operators are found regardless of line layout, strings and inline images."""
+    print("=" * 70)
+    print("TEST 1: Content-stream tokenizer")
+    print("=" * 70)
+
+    data = (
+        b"q 1 0 0 1 0 0 cm BT /F1 12 Tf 1 0 0 1 50 700 Tm (a Tm \\) b) Tj ET Q\n"
+        b"% comment Tj\n"
+        b"/Span <</MCID 0 /ActualText (x)>> BDC\n"
+        b"[(Gi) -20 (\\(\xe1\\))] TJ EMC\n"
+        b"BI /W 2 /H 1 /BPC 8 /CS /G ID \x00EI\xff EI Q"
+    )
+    operations = list(iter_operations(data))
+    operators = [op.operator for op in operations]
+    assert operators == [
+        b"q", b"cm", b"BT", b"Tf", b"Tm", b"Tj", b"ET", b"Q",
+        b"BDC", b"TJ", b"EMC", b"BI", b"ID", b"EI", b"Q",
+    ], operators
+
+    tm = operations[4]
+    assert tm.operands == [b"1", b"0", b"0", b"1", b"50", b"700"], tm.operands
+    assert data[tm.start:tm.end] == b"1 0 0 1 50 700 Tm"
+    assert operations[5].operands == [b"(a Tm \\) b)"], operations[5].operands
+    assert array_elements(operations[9].operands[0]) == [b"(Gi)", b"-20", b"(\\(\xe1\\))"]
+    print("✓ Operands, operators and byte spans recovered")
+
+    for bad in (b"1 0 0 1 50 700", b"(unterminated Tj", b"BI ID \x00\x01"):
+        try:
+            list(iter_operations(bad))
+        except ContentStreamError:
+            continue
+        raise AssertionError(f"Expected ContentStreamError for {bad!r}")
+    print("✓ Malformed streams raise ContentStreamError")
+
+
+def test_filter_content_stream():
+    """Only hex-encoded footers are cut out, where the former line filter found them."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Header/footer filtering")
+    print("=" * 70)
+
+    def run(content, page_height):
+        return FileCleaner._filter_content_stream(content, page_height * 0.90, page_height * 0.10, page_height)
+
+    # Page numbers and rules stay; no hex footer position lies outside the footer band of an A4 page
+    content = (
+        b"BT 1 0 0 1 300 30 Tm [(12)] TJ ET\n"
+        b"BT 1 0 0 1 50 60 Tm [(____)] TJ ET\n"
+        b"BT 1 0 0 1 13.07 400 Tm [<0015002D002B0034>] TJ ET"
+    )
+    assert run(content, 842.0) == (content, 0)
+    print("✓ A4 page left unchanged")
+
+    # Hex-encoded text at a footer-specific position of a short page, on shared lines
+    content = (
+        b"BT 1 0 0 1 28.3 150 Tm [<0015002D002B0034>] TJ (Row text) Tj ET\n"
+        b"BT 1 0 0 1 120 150 Tm [<0015002D002B0034>] TJ ET"
+    )
+    filtered, removed = run(content, 200.0)
+    assert removed == 1, (removed, filtered)
+    assert filtered == (
+        b"BT 1 0 0 1 28.3 150 Tm  (Row text) Tj ET\n"
+        b"BT 1 0 0 1 120 150 Tm [<0015002D002B0034>] TJ ET"
+    ), filtered
+    print("✓ Hex footer removed only at a footer position")
+
+    # Unparseable streams are returned untouched
+    content = b"BT 1 0 0 1 28.3 150 Tm [<0015002D>] TJ ET (broken"
+    assert run(content, 200.0) == (content, 0)
+    print("✓ Untokenizable stream left unchanged")
+
+
+def test_page_pre_check():
+    """Pages skipped by the pre-check are exactly pages the filter would not change."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Header/footer candidate pre-check")
+    print("=" * 70)
+
+    rng = random.Random(25)
+    skipped = 0
+    for _ in range(2000):
+        page_height = rng.choice([842.0, 595.0, 400.0, 200.0])
+        stream_data = []
+        for _ in range(rng.choice([1, 1, 2])):
+            objects = []
+            for _ in range(rng.randint(0, 20)):
+                position = rng.uniform(0, 750) if rng.random() < 0.8 else rng.choice([13.07, 28.3, 46.87, -5])
+                text = rng.choice(["[(12)]", "[(____)]", "[<0015002D>]", "(Body text)"])
+                objects.append(f"BT {rng.choice(['1', '-1'])} 0 0 1 {position:.2f} {rng.uniform(0, 800):.2f} Tm {text} TJ ET")
+            stream_data.append(rng.choice([" ", "\n"]).join(objects).encode())
+
+        if not FileCleaner._page_needs_filtering(stream_data, page_height):
+            skipped += 1
+            assert FileCleaner._filter_page_streams(stream_data, page_height) == (set(), {}, 0), stream_data
+    assert skipped > 500, skipped
+    print(f"✓ {skipped} of 2000 random pages skipped, none of them needed filtering")
+
+    body = b"BT 1 0 0 1 50 400 Tm [(12)] TJ ET"
+    assert not FileCleaner._page_needs_filtering([body + b" BT 1 0 0 1 300 30\nTm [(3)] TJ ET"], 842.0)
+    assert FileCleaner._page_needs_filtering([body], 400.0), "Short pages need the full check"
+    assert FileCleaner._page_needs_filtering([body * 10, b"BT ET"], 842.0), "Small extra streams need the full check"
+    print("✓ Short pages and small streams go through the full filter")
+
+
+if __name__ == "__main__":
+    try:
+        test_tokenizer()
+        test_filter_content_stream()
+        test_page_pre_check()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -40,7 +40,8 @@ def test_no_reference_markdown_bypass():
     good_patterns = [
         "# Convert to markdown from file",
         'logger.info("Converting file to markdown...")',
-        'markdown_result = markdown_converter.convert(str(file_to_convert))',
+        # Runs in the worker pool on the uploaded (or cleaned) file
+        'markdown_result = await run_in_pool(\n        convert_markdown,\n        MARKDOWN_CONVERTER_OPTIONS,\n        str(file_to_convert),',
         '"markdown_source": "extracted"'
     ]
 
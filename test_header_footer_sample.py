@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test that header/footer filtering keeps every text operator of the sample tariff PDF.
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+from src.core.content_stream import iter_operations
+from src.core.file_cleaner import TEXT_SHOW_OPERATORS, FileCleaner
+
+PROJECT_ROOT = Path(__file__).parent
+SAMPLE_PDF = PROJECT_ROOT / "sample" / "508_QĐ_TCg_Quyết_định_về_việc_ban_hành_Biểu_giá_dịch.pdf"
+
+
+def shown_text(data: bytes) -> Counter:
+    """Tj/TJ operations of a content stream, as raw bytes."""
+    return Counter(data[op.start:op.end] for op in iter_operations(data) if op.operator in TEXT_SHOW_OPERATORS)
+
+
+def test_sample_text_kept():
+    """Only whole watermark streams are removed; the line filter never cut text out of this document."""
+    print("=" * 70)
+    print("TEST 1: Text kept in the sample PDF")
+    print("=" * 70)
+
+    import pikepdf
+
+    cleaner = FileCleaner()
+    pages_with_removed_streams = 0
+    with pikepdf.open(SAMPLE_PDF) as pdf:
+        for page_num, page in enumerate(pdf.pages, start=1):
+            page_height, content_streams = cleaner._read_page_content(page)
+            stream_data = [stream.read_bytes() for stream in content_streams]
+            streams_to_remove, replacements, _ = FileCleaner._filter_page_streams(stream_data, page_height)
+            for stream_idx, filtered in replacements.items():
+                dropped = shown_text(stream_data[stream_idx]) - shown_text(filtered)
+                assert not dropped, f"page {page_num}: {sorted(dropped.elements())}"
+            pages_with_removed_streams += bool(streams_to_remove)
+
+    assert pages_with_removed_streams > 0, "No watermark stream removed"
+    print(f"✓ No text operator dropped; watermark streams removed on {pages_with_removed_streams} pages")
+
+
+if __name__ == "__main__":
+    try:
+        test_sample_text_kept()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test streamed HTML rendering (head, per-section body fragments, tail).
+"""
+
+import re
+import sys
+from pathlib import Path
+
+from src.core.html_converter import HtmlConverter
+
+
+def _strip_timestamp(html: str) -> str:
+    return re.sub(r"Generated on [\d\- :]+", "", html)
+
+
+def test_sections_split_at_page_markers():
+    """Sections start at page markers, never inside fenced code."""
+    print("=" * 70)
+    print("TEST 1: Section boundaries")
+    print("=" * 70)
+
+    converter = HtmlConverter()
+    markdown = (
+        "### Bảng 01\n\n| A | B |\n| --- | --- |\n| 1 | 2 |\n\n"
+        "<!-- Page 2 -->\n\n### Bảng 02\n\n```\n<!-- Page 3 -->\n```\n\n"
+        "<!-- Page 4 -->\n\ntext"
+    )
+    sections = converter.split_sections(markdown)
+    assert len(sections) == 3, sections
+    assert sections[1].startswith("<!-- Page 2 -->") and "<!-- Page 3 -->" in sections[1], sections
+    print(f"✓ {len(sections)} page sections")
+
+    # Without page markers, headings are the boundaries
+    assert len(converter.split_sections("# A\n\ntext\n\n## B\n\nmore")) == 2
+    # Footnotes need the whole document
+    assert len(converter.split_sections("# A\n\nx[^1]\n\n## B\n\n[^1]: note")) == 1
+    print("✓ Heading fallback and footnote documents handled")
+
+
+def test_stream_equals_full_document():
+    """Joined stream pieces equal markdown_to_html()."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Streamed document equals full document")
+    print("=" * 70)
+
+    converter = HtmlConverter()
+    markdown = Path("sample/markdown.md").read_text(encoding="utf-8")
+    metadata = {"title": "Biểu giá", "author": "Cảng"}
+
+    pieces = list(converter.iter_markdown_to_html(markdown, metadata))
+    full = converter.markdown_to_html(markdown, metadata)
+
+    assert pieces[0].rstrip().endswith("<main>"), pieces[0][-100:]
+    assert "<style>" in pieces[0] and "Biểu giá" in pieces[0]
+    assert pieces[-1].strip().endswith("</html>")
+    assert _strip_timestamp("".join(pieces)) == _strip_timestamp(full), "Streamed HTML differs"
+    print(f"✓ {len(pieces)} pieces, identical to full document ({len(full)} bytes)")
+
+
+def test_body_from_markdown_chunks():
+    """Rendering markdown that arrives in arbitrary pieces gives the same fragments."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Body rendered from markdown chunks")
+    print("=" * 70)
+
+    converter = HtmlConverter()
+    markdown = Path("sample/markdown.md").read_text(encoding="utf-8")
+    chunks = [markdown[start:start + 997] for start in range(0, len(markdown), 997)]
+
+    streamed = list(converter.iter_html_body_stream(iter(chunks)))
+    assert streamed == list(converter.iter_html_body(markdown)), "Fragments differ"
+    print(f"✓ {len(chunks)} chunks -> {len(streamed)} identical fragments")
+
+
+if __name__ == "__main__":
+    try:
+        test_sections_split_at_page_markers()
+        test_stream_equals_full_document()
+        test_body_from_markdown_chunks()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory clean -> convert path (no cleaned file on disk).
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core import warmup
+from src.core.file_cleaner import FileCleaner
+from src.core.stage1_markdown import MarkdownConverter, shutdown_page_pool
+
+
+def test_in_memory_matches_file_path():
+    """Converting cleaned bytes gives the same markdown as converting the cleaned file."""
+    print("=" * 70)
+    print("TEST 1: In-memory vs on-disk cleaned PDF")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "memory.pdf"
+        warmup.build_sample_pdf(sample_path)
+
+        cleaner = FileCleaner(output_dir=tmp_dir)
+        success, _, cleaned_path = cleaner.clean_file(str(sample_path))
+        assert success, cleaned_path
+        success, message, cleaned_data = cleaner.clean_pdf_in_memory(str(sample_path))
+        assert success and isinstance(cleaned_data, bytes), message
+        assert sorted(p.name for p in Path(tmp_dir).iterdir()) == ["cleaned_memory.pdf", "memory.pdf"]
+
+        converter = MarkdownConverter()
+        from_file = converter.convert(cleaned_path)
+        from_memory = converter.convert(str(sample_path), data=cleaned_data)
+
+    assert from_memory["markdown"] == from_file["markdown"], from_memory["markdown"]
+    assert from_memory["metadata"]["source_file"] == str(sample_path)
+    print(f"✓ Identical markdown ({len(from_memory['markdown'])} chars)")
+
+
+def test_in_memory_parallel_pages():
+    """Page-parallel extraction hands the bytes to the workers."""
+    print("\n" + "=" * 70)
+    print("TEST 2: In-memory PDF across page workers")
+    print("=" * 70)
+
+    import fitz
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "parallel.pdf"
+        doc = fitz.open()
+        for page_num in range(1, 5):
+            page = doc.new_page(width=595, height=842)
+            page.insert_text((50, 90), f"Chapter {page_num}", fontsize=15)
+            page.insert_text((50, 120), f"Body of page {page_num}.", fontsize=11)
+        doc.save(str(sample_path))
+        doc.close()
+        data = sample_path.read_bytes()
+        sequential = MarkdownConverter().convert(str(sample_path))
+        sample_path.unlink()
+
+        try:
+            parallel = MarkdownConverter(page_workers=2, parallel_min_pages=1).convert(str(sample_path), data=data)
+        finally:
+            shutdown_page_pool()
+
+    assert parallel["markdown"] == sequential["markdown"], parallel["markdown"]
+    print("✓ Workers extracted pages from memory; file was never on disk")
+
+    try:
+        MarkdownConverter().convert("notes.docx", data=b"PK")
+        raise AssertionError("Non-PDF bytes should be rejected")
+    except ValueError:
+        print("✓ Non-PDF in-memory input rejected")
+
+
+if __name__ == "__main__":
+    try:
+        test_in_memory_matches_file_path()
+        test_in_memory_parallel_pages()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
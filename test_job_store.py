@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite job store used by the background job API.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from src.storage import job_store
+from src.storage.job_store import JobStore
+
+
+def test_job_lifecycle():
+    """Stages, progress and results are persisted."""
+    print("=" * 70)
+    print("TEST 1: Job lifecycle")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = JobStore(db_path=str(Path(tmp_dir) / "jobs.db"))
+        job_id = store.create("a.pdf", "/tmp/a.pdf", {"output_format": "bullet"}, ["clean", "markdown", "bullet"])
+
+        job = store.get(job_id)
+        assert job["status"] == "queued" and job["progress"] == 0, job
+
+        store.start_stage(job_id, "clean")
+        store.finish_stage(job_id, "clean", 0.5)
+        store.start_stage(job_id, "markdown")
+        job = store.get(job_id)
+        assert job["status"] == "running" and job["current_stage"] == "markdown", job
+        assert job["stages"]["clean"] == {"status": "done", "seconds": 0.5}, job["stages"]
+        assert abs(job["progress"] - 0.333) < 0.01, job["progress"]
+        print(f"✓ Stage progress tracked: {job['stages']}")
+
+        store.complete(job_id, {"bullet_content": "• x"})
+        job = store.get(job_id)
+        assert job["status"] == "completed" and job["result"] == {"bullet_content": "• x"}, job
+        print("✓ Result stored on completion")
+
+        # State survives reopening the database
+        reopened = JobStore(db_path=str(Path(tmp_dir) / "jobs.db"))
+        assert reopened.get(job_id)["status"] == "completed"
+        print("✓ Job state persists across store instances")
+
+
+def test_claim_orphaned_jobs():
+    """Jobs owned by a dead worker are claimed exactly once."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Claim jobs interrupted by a restart")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "jobs.db"
+        store = JobStore(db_path=str(db_path))
+        orphan_id = store.create("a.pdf", "/tmp/a.pdf", {}, ["markdown"])
+        live_id = store.create("b.pdf", "/tmp/b.pdf", {}, ["markdown"])
+
+        # Simulate a job left running by a worker process that no longer exists
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("UPDATE jobs SET owner = '999999999:dead', status = 'running' WHERE id = ?", (orphan_id,))
+
+        claimed = store.claim_orphaned()
+        assert claimed == [orphan_id], claimed
+        assert store.get(orphan_id)["status"] == "queued"
+        assert store.claim_orphaned() == [], "Job must not be claimed twice"
+        assert store.get(live_id)["status"] == "queued"
+        print(f"✓ Claimed orphaned job {orphan_id[:8]}, left live job alone")
+
+
+def test_forked_worker_gets_own_owner_id():
+    """Workers forked from a preloaded master do not share the master's identity."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Owner id after fork")
+    print("=" * 70)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, job_store.OWNER_ID.encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    child_owner = os.read(read_fd, 100).decode()
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert child_owner != job_store.OWNER_ID, "Forked worker kept the parent's owner id"
+    assert child_owner.startswith(f"{pid}:"), child_owner
+    print(f"✓ Parent {job_store.OWNER_ID}, child {child_owner}")
+
+
+if __name__ == "__main__":
+    try:
+        test_job_lifecycle()
+        test_claim_orphaned_jobs()
+        test_forked_worker_gets_own_owner_id()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test incremental markdown cleaning and generator-based PDF conversion.
+"""
+
+import random
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core.markdown_cleaner import MarkdownCleaner
+
+
+def clean_whole(markdown: str) -> str:
+    """The original whole-string cleanup the incremental cleaner replaces."""
+    markdown = re.sub(r"\n{3,}", "\n\n", markdown)
+    markdown = "\n".join(line.rstrip() for line in markdown.split("\n"))
+    markdown = re.sub(r"(\n#{1,6}\s+[^\n]+)\n", r"\1\n\n", markdown)
+    return markdown.strip()
+
+
+def random_parts(rng):
+    """Raw parts shaped like MarkdownConverter output."""
+    parts = []
+    for _ in range(rng.randint(0, 20)):
+        text = rng.choice(["II. CƯỚC XẾP DỠ", "Bảng 01", "Container khô 20'", "text  "])
+        parts.append(rng.choice([
+            f"\n# {text}\n", f"\n## {text}\n", f"\n### {text}\n", text,
+            "\n| A | B |\n| --- | --- |\n| 1 | 2 |\n",
+            f"\n<!-- Page {rng.randint(1, 60)} -->\n", "\n[Image on page 4]\n",
+        ]))
+    return parts
+
+
+def test_cleaner_matches_whole_document_cleanup():
+    """Feeding parts in any chunking gives the whole-document result."""
+    print("=" * 70)
+    print("TEST 1: Incremental cleaning")
+    print("=" * 70)
+
+    rng = random.Random(5)
+    for _ in range(1000):
+        text = "\n".join(random_parts(rng))
+        cut = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, 4)))
+        chunks = [text[start:stop] for start, stop in zip([0] + cut, cut + [len(text)])]
+
+        cleaner = MarkdownCleaner()
+        streamed = "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.close()
+        assert streamed == clean_whole(text), repr(text)
+        assert MarkdownCleaner.clean(text) == streamed
+    print("✓ 1000 random documents cleaned identically")
+
+
+def test_iter_markdown_matches_convert():
+    """Joined iter_markdown() fragments equal convert() and report the same metadata."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Generator-based PDF conversion")
+    print("=" * 70)
+
+    from src.core import warmup
+    from src.core.stage1_markdown import MarkdownConverter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "stream.pdf"
+        warmup.build_sample_pdf(sample_path)
+
+        converter = MarkdownConverter()
+        result = {}
+        fragments = list(converter.iter_markdown(str(sample_path), result=result))
+        chunks = []
+        converted = converter.convert(str(sample_path), on_chunk=chunks.append)
+
+    assert "".join(fragments) == converted["markdown"], fragments
+    assert chunks == fragments, chunks
+    assert result["metadata"] == converted["metadata"], result
+    assert set(result["timings"]) == {"table_detection", "text_extraction"}, result
+    print(f"✓ {len(fragments)} fragments join to convert() output")
+
+
+if __name__ == "__main__":
+    try:
+        test_cleaner_matches_whole_document_cleanup()
+        test_iter_markdown_matches_convert()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the in-process metrics registry and its Prometheus text output.
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from src.utils.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge():
+    """Counters accumulate per label set; gauges keep the last value."""
+    print("=" * 70)
+    print("TEST 1: Counter and gauge")
+    print("=" * 70)
+
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route", "status"))
+    depth = registry.gauge("queue_depth", "Queue depth", ("pool",))
+
+    requests.inc(route="/documents/markdown", status="200")
+    requests.inc(route="/documents/markdown", status="200")
+    requests.inc(route="/documents/split", status="500")
+    depth.set(3, pool="pipeline")
+    depth.set(1, pool="pipeline")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text, text
+    assert 'requests_total{route="/documents/markdown",status="200"} 2' in text, text
+    assert 'requests_total{route="/documents/split",status="500"} 1' in text, text
+    assert 'queue_depth{pool="pipeline"} 1' in text, text
+    print("✓ Rendered counter and gauge samples")
+
+    try:
+        requests.inc(route="/documents/markdown")
+        raise AssertionError("Missing label should be rejected")
+    except ValueError as e:
+        print(f"✓ Rejected incomplete labels: {e}")
+
+
+def test_histogram_buckets():
+    """Histogram buckets are cumulative with inclusive upper bounds."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Histogram buckets")
+    print("=" * 70)
+
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0, 10.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0, 42.0):
+        latency.observe(value, stage="markdown")
+
+    text = registry.render()
+    expected = [
+        'stage_seconds_bucket{stage="markdown",le="0.1"} 2',
+        'stage_seconds_bucket{stage="markdown",le="1"} 3',
+        'stage_seconds_bucket{stage="markdown",le="10"} 4',
+        'stage_seconds_bucket{stage="markdown",le="+Inf"} 5',
+        'stage_seconds_count{stage="markdown"} 5',
+        'stage_seconds_sum{stage="markdown"} 45.65',
+    ]
+    for line in expected:
+        assert line in text, f"Missing {line!r} in:\n{text}"
+    print(f"✓ {len(expected)} bucket/sum/count lines correct")
+
+
+def test_thread_safety():
+    """Concurrent increments are not lost."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Concurrent updates")
+    print("=" * 70)
+
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("sizes", "Sizes")
+
+    def work():
+        for _ in range(5000):
+            counter.inc()
+            histogram.observe(0.2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 20000, counter.value()
+    assert histogram.count() == 20000, histogram.count()
+    print("✓ 20000 increments and observations recorded")
+
+
+def test_multiprocess_merge():
+    """Snapshots of several workers are merged: counters summed, gauges per worker."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Multi-worker snapshots")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        registry = MetricsRegistry(multiprocess_dir=tmp_dir)
+        requests = registry.counter("requests_total", "Requests", ("route",))
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+        depth = registry.gauge("queue_depth", "Queue depth")
+
+        requests.inc(route="/health")
+        latency.observe(0.5)
+        depth.set(2)
+
+        # Another worker's snapshot, as written by its write_snapshot()
+        other = {
+            "requests_total": [[["/health"], 3]],
+            "latency_seconds": [[[], [[0, 1], 4.0]]],
+            "queue_depth": [[[], 5]],
+        }
+        Path(tmp_dir, "99999.json").write_text(json.dumps(other))
+
+        text = registry.render()
+        assert 'requests_total{route="/health"} 4' in text, text
+        assert 'latency_seconds_bucket{le="1"} 1' in text, text
+        assert 'latency_seconds_count 2' in text, text
+        assert 'queue_depth{worker="99999"} 5' in text, text
+        assert 'queue_depth{worker="' in text.replace('worker="99999"', ""), text
+        print("✓ Counters and histograms summed, gauges labelled per worker")
+
+        registry.remove_snapshot(99999)
+        assert 'requests_total{route="/health"} 1' in registry.render()
+        print("✓ Exited worker removed")
+
+
+if __name__ == "__main__":
+    try:
+        test_counter_and_gauge()
+        test_histogram_buckets()
+        test_thread_safety()
+        test_multiprocess_merge()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
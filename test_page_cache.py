@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test the persistent per-page extraction cache.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core.page_layout import PageElement, PageLayout, TableRegion
+
+
+def build_pdf(path: Path, changed_page: int = 0) -> None:
+    """Five pages of text; ``changed_page`` gets different body text."""
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(1, 6):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((50, 90), f"Chapter {page_num}", fontsize=15)
+        body = "Revised body." if page_num == changed_page else f"Body of page {page_num}."
+        page.insert_text((50, 120), body, fontsize=11)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_layout_round_trip():
+    """Layouts survive serialization, and can be re-numbered."""
+    print("=" * 70)
+    print("TEST 1: PageLayout serialization")
+    print("=" * 70)
+
+    layout = PageLayout(
+        page_num=3,
+        tables=[TableRegion(bbox=(50, 160, 290, 200), markdown="| a | b |")],
+        elements=[
+            PageElement(kind="text", text="Bảng 01", font_size=13.0, bbox=(50, 120, 200, 133)),
+            PageElement(kind="text", text="20'", font_size=10.0, bbox=(55, 165, 80, 175), in_table=True),
+            PageElement(kind="image"),
+        ],
+    )
+    restored = PageLayout.from_dict(layout.to_dict())
+    assert restored == layout, restored
+    assert PageLayout.from_dict(layout.to_dict(), page_num=7).page_num == 7
+    assert restored.table_containing((55, 165, 80, 175)) is restored.tables[0]
+    print("✓ Round trip preserves tables and elements")
+
+
+def test_revised_document_reuses_pages():
+    """Only changed pages are extracted again; output matches an uncached run."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Page cache across revisions")
+    print("=" * 70)
+
+    import fitz
+    from src.core.stage1_markdown import MarkdownConverter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        original = Path(tmp_dir) / "v1.pdf"
+        revised = Path(tmp_dir) / "v2.pdf"
+        renumbered = Path(tmp_dir) / "v1-renumbered.pdf"
+        build_pdf(original)
+        build_pdf(revised, changed_page=4)
+        with fitz.open(original) as doc:
+            doc.save(str(renumbered), garbage=4, deflate=True)
+
+        converter = MarkdownConverter(page_cache_dir=str(Path(tmp_dir) / "pages"))
+        first = converter.convert(str(original))
+        second = converter.convert(str(revised))
+        third = converter.convert(str(renumbered))
+        uncached = MarkdownConverter().convert(str(revised))
+
+    assert first["metadata"]["page_cache"] == {"hits": 0, "misses": 5}, first["metadata"]
+    assert second["metadata"]["page_cache"] == {"hits": 4, "misses": 1}, second["metadata"]
+    assert third["metadata"]["page_cache"] == {"hits": 5, "misses": 0}, third["metadata"]
+    assert second["markdown"] == uncached["markdown"], second["markdown"]
+    assert "Revised body." in second["markdown"]
+    assert "page_cache" not in uncached["metadata"]
+    print("✓ Revision re-parsed 1 of 5 pages; renumbered copy fully cached")
+
+
+if __name__ == "__main__":
+    try:
+        test_layout_round_trip()
+        test_revised_document_reuses_pages()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
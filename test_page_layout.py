@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test per-page table layouts used by the PDF converter.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core import warmup
+from src.core.page_layout import PageLayout, TableRegion
+from src.core.stage1_markdown import MarkdownConverter
+
+PROJECT_ROOT = Path(__file__).parent
+SAMPLE_PDF = PROJECT_ROOT / "sample" / "508_QĐ_TCg_Quyết_định_về_việc_ban_hành_Biểu_giá_dịch.pdf"
+
+
+def test_table_containing():
+    """Lines inside a table bbox (with 5pt slack) are attributed to that table."""
+    print("=" * 70)
+    print("TEST 1: Line-in-table lookup")
+    print("=" * 70)
+
+    table = TableRegion(bbox=(50, 160, 290, 200), markdown="| a | b |")
+    layout = PageLayout(page_num=1, tables=[table])
+
+    assert layout.table_containing((55, 165, 100, 175)) is table
+    assert layout.table_containing((47, 157, 293, 203)) is table, "Tolerance not applied"
+    assert layout.table_containing((50, 90, 200, 110)) is None, "Heading above table matched"
+    assert layout.table_containing(None) is None
+    print("✓ Table lookup respects bounds and tolerance")
+
+
+def test_tables_detected_once():
+    """convert() runs find_tables() exactly once per page."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Single table-detection pass")
+    print("=" * 70)
+
+    import fitz
+
+    calls = []
+    original = fitz.Page.find_tables
+
+    def counting_find_tables(page, *args, **kwargs):
+        calls.append(page.number)
+        return original(page, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "layout.pdf"
+        warmup.build_sample_pdf(sample_path)
+
+        fitz.Page.find_tables = counting_find_tables
+        try:
+            result = MarkdownConverter().convert(str(sample_path))
+        finally:
+            fitz.Page.find_tables = original
+
+        layouts = MarkdownConverter().analyze_layout(str(sample_path))
+
+    assert calls == [0], f"find_tables() called for pages {calls}"
+    assert "| Type | Price |" in result["markdown"], result["markdown"]
+    assert len(layouts) == 1 and len(layouts[0].tables) == 1, layouts
+    assert "| Type | Price |" in layouts[0].tables[0].markdown, layouts[0].tables[0]
+    print(f"✓ find_tables() called {len(calls)} time(s) for 1 page")
+
+
+def test_parallel_matches_sequential():
+    """Sharding pages across processes yields the same markdown as a sequential run."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Page-parallel extraction")
+    print("=" * 70)
+
+    import fitz
+    from src.core.stage1_markdown import shutdown_page_pool
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "pages.pdf"
+        doc = fitz.open()
+        for page_num in range(1, 8):
+            page = doc.new_page(width=595, height=842)
+            page.insert_text((50, 90), f"Section {page_num}", fontsize=15)
+            page.insert_text((50, 120), f"Body text on page {page_num}.", fontsize=11)
+        doc.save(str(sample_path))
+        doc.close()
+
+        sequential = MarkdownConverter().convert(str(sample_path))
+        try:
+            parallel = MarkdownConverter(page_workers=3, parallel_min_pages=2).convert(str(sample_path))
+        finally:
+            shutdown_page_pool()
+
+    assert parallel["markdown"] == sequential["markdown"], parallel["markdown"]
+    assert "<!-- Page 7 -->" in parallel["markdown"], parallel["markdown"]
+    print("✓ Parallel output identical across 7 pages / 3 shards")
+
+
+def test_sample_table_content():
+    """Tables of the sample tariff PDF are read while their page is still loaded."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Table content of the sample PDF")
+    print("=" * 70)
+
+    # Before PageLayout, table.extract() ran after the page was released and every
+    # table came back as watermark fragments in otherwise empty cells
+    layouts = MarkdownConverter().analyze_layout(str(SAMPLE_PDF))
+    tables = {layout.page_num: [table.markdown for table in layout.tables] for layout in layouts if layout.tables}
+
+    assert sum(len(page_tables) for page_tables in tables.values()) == 42, tables
+    assert "| 461.160 | 677.160 | 1.015.200 | 664.200 | 972.000 |" in tables[4][0], tables[4][0]
+    assert "| 955.800 | 1.441.800 | 1.749.600 | 1.242.000 | 1.868.400 |" in tables[4][2], tables[4][2]
+    assert "| 20’DC | 40’DC | 45’DC |" in tables[10][0], tables[10][0]
+    assert "| Phươngtiệnvậnchuyểncontainer | 82.000 |" in tables[24][0], tables[24][0]
+
+    markdown = MarkdownConverter().convert(str(SAMPLE_PDF))["markdown"]
+    table_01 = markdown[markdown.index("Bảng 01"):markdown.index("Bảng 02")]
+    assert "| 461.160 | 677.160 | 1.015.200 | 664.200 | 972.000 |" in table_01, table_01
+    print(f"✓ {sum(map(len, tables.values()))} tables on {len(tables)} pages, prices in place")
+
+
+if __name__ == "__main__":
+    try:
+        test_table_containing()
+        test_tables_detected_once()
+        test_parallel_matches_sequential()
+        test_sample_table_content()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test page-range and heading-targeted PDF extraction.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.core.stage1_markdown import MarkdownConverter, parse_page_ranges, resolve_page_ranges
+
+
+def build_pdf(path: Path, pages: int = 10) -> None:
+    """One heading and one body line per page."""
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(1, pages + 1):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((50, 90), f"Chapter {page_num}", fontsize=15)
+        page.insert_text((50, 120), f"Body of page {page_num}.", fontsize=11)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_parse_page_ranges():
+    """Page selections are parsed, clipped to the document and validated."""
+    print("=" * 70)
+    print("TEST 1: Page range parsing")
+    print("=" * 70)
+
+    assert parse_page_ranges("1-3, 7,10-") == [(1, 3), (7, 7), (10, None)]
+    assert resolve_page_ranges("9-,2,1-2", 12) == [1, 2, 9, 10, 11, 12]
+    assert resolve_page_ranges("20-30", 12) == []
+    for bad in ("", "a", "0", "5-2", "1-2-3"):
+        try:
+            parse_page_ranges(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+    print("✓ Ranges parsed and invalid selections rejected")
+
+
+def test_only_selected_pages_parsed():
+    """Pages outside the selection never reach table detection."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Page range extraction")
+    print("=" * 70)
+
+    import fitz
+
+    calls = []
+    original = fitz.Page.find_tables
+
+    def counting_find_tables(page, *args, **kwargs):
+        calls.append(page.number + 1)
+        return original(page, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "chapters.pdf"
+        build_pdf(sample_path)
+
+        fitz.Page.find_tables = counting_find_tables
+        try:
+            result = MarkdownConverter().convert(str(sample_path), pages="2-3,8")
+        finally:
+            fitz.Page.find_tables = original
+
+    markdown = result["markdown"]
+    assert calls == [2, 3, 8], f"find_tables() ran on pages {calls}"
+    assert "## Chapter 2" in markdown and "## Chapter 8" in markdown, markdown
+    assert "Chapter 1" not in markdown and "Chapter 4" not in markdown, markdown
+    assert result["metadata"]["extracted_pages"] == 3, result["metadata"]
+    print(f"✓ Parsed pages {calls} only")
+
+
+def test_start_heading():
+    """Output starts at the first line matching the heading regex."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Start at heading")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sample_path = Path(tmp_dir) / "chapters.pdf"
+        build_pdf(sample_path)
+
+        converter = MarkdownConverter()
+        result = converter.convert(str(sample_path), start_heading=r"^Chapter 6$")
+        missing = converter.convert(str(sample_path), start_heading=r"Appendix")
+
+    markdown = result["markdown"]
+    assert markdown.startswith("## Chapter 6"), markdown
+    assert "Chapter 10" in markdown and "Chapter 5" not in markdown, markdown
+    assert result["metadata"]["extracted_pages"] == 5, result["metadata"]
+    assert missing["markdown"] == "" and missing["metadata"]["extracted_pages"] == 0, missing
+    print("✓ Extraction starts at the matching heading")
+
+
+if __name__ == "__main__":
+    try:
+        test_parse_page_ranges()
+        test_only_selected_pages_parsed()
+        test_start_heading()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
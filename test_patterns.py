@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the shared precompiled pattern registry against the inline checks it replaced.
+"""
+
+import random
+import re
+import sys
+
+from src.core.patterns import (
+    HEX_TEXT_ARRAY_PATTERN,
+    WATERMARK_PATTERN,
+    WATERMARK_PATTERNS,
+    combine_patterns,
+)
+
+
+def test_combined_watermark_pattern():
+    """One alternation matches exactly where any single pattern matches."""
+    print("=" * 70)
+    print("TEST 1: Combined watermark alternation")
+    print("=" * 70)
+
+    rng = random.Random(18)
+    pieces = ["Draft", "DRAFT", "_Approved", "_APPROVED", "approved", "Do Not Copy", "do not  copy",
+              "internal use only", "WaterMark", "Bảng 01", "CƯỚC", "x", " "]
+    for _ in range(5000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+        expected = any(re.search(pattern, text) for pattern in WATERMARK_PATTERNS)
+        assert (WATERMARK_PATTERN.search(text) is not None) == expected, text
+    print("✓ 5000 random spans classified identically")
+
+    # Inline flags stay scoped to their own alternative
+    pattern = combine_patterns([r"(?i)abc", r"XYZ"])
+    assert pattern.search("ABC") and pattern.search("XYZ") and not pattern.search("xyz")
+    print("✓ (?i) applies only to its own pattern")
+
+
+def test_hex_text_array_pattern():
+    """The hex footer pattern equals the former prefix/suffix/charset checks."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Hex-encoded text arrays")
+    print("=" * 70)
+
+    def inline(text):
+        return (
+            text.startswith(b'[<') and text.endswith(b'>]') and
+            all(c in b'[]<>0123456789ABCDEFabcdef \t-' for c in text)
+        )
+
+    rng = random.Random(2)
+    alphabet = b"[]<>0aF9 -\t(g)"
+    for _ in range(20000):
+        text = bytes(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+        if rng.random() < 0.5:
+            text = b"[<" + text + b">]"
+        assert (HEX_TEXT_ARRAY_PATTERN.fullmatch(text) is not None) == inline(text), repr(text)
+    print("✓ 20000 random operands classified identically")
+
+
+if __name__ == "__main__":
+    try:
+        test_combined_watermark_pattern()
+        test_hex_text_array_pattern()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -75,7 +75,7 @@ def test_pipeline():
     with open(temp_markdown, "w", encoding="utf-8") as f:
         f.write(markdown_content)
 
-    # Also save to sample/markdown_v1.md (as the API does)
+    # Also save to sample/markdown_v1.md for review
     markdown_v1_path = PROJECT_ROOT / "sample" / "markdown_v1.md"
     with open(markdown_v1_path, "w", encoding="utf-8") as f:
         f.write(markdown_content)
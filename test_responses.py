@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test FastJSONResponse serialization and compression negotiation.
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import threading
+
+from starlette.requests import Request
+
+from src.utils import responses
+from src.utils.responses import THREAD_COMPRESS_SIZE, FastJSONResponse, choose_encoding, dumps
+
+
+def _request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+def test_dumps_matches_json():
+    """Output is compact UTF-8 JSON equal to the standard library's."""
+    print("=" * 70)
+    print("TEST 1: Serialization")
+    print("=" * 70)
+
+    content = {"ten_bang": "Bảng 01", "chunks": [{"noi_dung_bang": "| A | B |"}], "total": 1, "ok": True}
+    body = dumps(content)
+
+    assert json.loads(body) == content, body
+    assert "Bảng".encode("utf-8") in body, "Non-ASCII text should not be escaped"
+    print(f"✓ {len(body)} bytes, round-trips through json")
+
+
+def test_encoding_negotiation():
+    """br is preferred when available, q-values and wildcards are honoured."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Accept-Encoding negotiation")
+    print("=" * 70)
+
+    assert choose_encoding("") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("gzip;q=0.5, br") in ("br", "gzip")
+    print("✓ Encodings chosen correctly")
+
+
+def test_large_bodies_are_compressed():
+    """Large bodies are compressed per request; small ones are left alone."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Response compression")
+    print("=" * 70)
+
+    content = {"markdown_content": "| Loại | Giá |\n" * 500}
+
+    response = FastJSONResponse(content, request=_request("gzip"))
+    assert response.headers["content-encoding"] == "gzip", response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(response.body)
+    assert json.loads(gzip.decompress(response.body)) == content
+    print(f"✓ gzip: {len(dumps(content))} -> {len(response.body)} bytes")
+
+    response = FastJSONResponse(content, request=_request("identity"))
+    assert "content-encoding" not in response.headers, response.headers
+    assert json.loads(response.body) == content
+    print("✓ Uncompressed when the client does not accept gzip/br")
+
+    response = FastJSONResponse({"status": "ok"}, request=_request("gzip"))
+    assert "content-encoding" not in response.headers, response.headers
+    print("✓ Small body sent as-is")
+
+
+def test_create_compresses_off_event_loop():
+    """create() compresses large bodies in a worker thread and matches the constructor."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Compression off the event loop")
+    print("=" * 70)
+
+    threads = []
+    original = responses.compress
+
+    def recording_compress(body, encoding):
+        threads.append(threading.current_thread())
+        return original(body, encoding)
+
+    large = {"markdown_content": "| Loại | Giá |\n" * (THREAD_COMPRESS_SIZE // 10)}
+    medium = {"markdown_content": "| Loại | Giá |\n" * 500}
+    responses.compress = recording_compress
+    try:
+        created = asyncio.run(FastJSONResponse.create(large, request=_request("gzip")))
+        assert threads and threads[-1] is not threading.main_thread(), threads
+        print(f"✓ {len(dumps(large))} byte body compressed in {threads[-1].name}")
+
+        asyncio.run(FastJSONResponse.create(medium, request=_request("gzip")))
+        assert threads[-1] is threading.main_thread(), threads
+        print("✓ Smaller body compressed inline")
+    finally:
+        responses.compress = original
+
+    expected = FastJSONResponse(large, request=_request("gzip"))
+    assert created.body == expected.body, "create() and the constructor differ"
+    assert created.headers["content-encoding"] == "gzip" and created.headers["vary"] == "Accept-Encoding"
+    assert int(created.headers["content-length"]) == len(created.body)
+    small = asyncio.run(FastJSONResponse.create({"status": "ok"}, request=_request("gzip")))
+    assert "content-encoding" not in small.headers and json.loads(small.body) == {"status": "ok"}
+    print("✓ Same body and headers as the constructor")
+
+
+if __name__ == "__main__":
+    try:
+        test_dumps_matches_json()
+        test_encoding_negotiation()
+        test_large_bodies_are_compressed()
+        test_create_compresses_off_event_loop()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed conversion result cache.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from src.storage.result_cache import ResultCache
+
+
+def test_key_depends_on_options():
+    """Keys differ when any conversion option differs."""
+    print("=" * 70)
+    print("TEST 1: Cache key covers content hash and options")
+    print("=" * 70)
+
+    base = ResultCache.make_key("abc", clean=True, converter_version="1")
+    assert base == ResultCache.make_key("abc", converter_version="1", clean=True), "Key must not depend on option order"
+    assert base != ResultCache.make_key("abc", clean=False, converter_version="1"), "Clean flag must change key"
+    assert base != ResultCache.make_key("abc", clean=True, converter_version="2"), "Version must change key"
+    assert base != ResultCache.make_key("abd", clean=True, converter_version="1"), "Content hash must change key"
+    print("✓ Keys are stable and option-sensitive")
+
+
+def test_memory_and_disk_tiers():
+    """Results survive memory eviction via the disk tier and a restart."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Memory and disk tiers")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(cache_dir=cache_dir, max_memory_bytes=200, max_disk_bytes=10_000)
+        assert cache.get("missing") is None
+
+        cache.put("a", {"markdown": "x" * 100})
+        cache.put("b", {"markdown": "y" * 100})  # pushes "a" out of the memory tier
+
+        assert cache.get("b") == {"markdown": "y" * 100}
+        assert cache.get("a") == {"markdown": "x" * 100}
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1 and stats["disk_hits"] == 1, stats
+        assert stats["misses"] == 1, stats
+        print(f"✓ Memory hit, disk hit and miss counted: {stats}")
+
+        reopened = ResultCache(cache_dir=cache_dir, max_memory_bytes=200, max_disk_bytes=10_000)
+        assert reopened.get("a") == {"markdown": "x" * 100}, "Disk entries must survive restart"
+        print("✓ Disk entries survive a restart")
+
+
+def test_disk_lru_eviction():
+    """Least recently used entries are evicted when the disk budget is exceeded."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Disk LRU eviction")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(cache_dir=cache_dir, max_memory_bytes=0, max_disk_bytes=300)
+        cache.put("a", {"markdown": "a" * 100})
+        cache.put("b", {"markdown": "b" * 100})
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", {"markdown": "c" * 100})
+
+        assert cache.get("b") is None, "LRU entry should have been evicted"
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["disk_bytes"] <= 300
+        print(f"✓ LRU entry evicted: {cache.stats()}")
+
+
+def test_shared_disk_tier():
+    """Caches on one directory (e.g. gunicorn workers) see each other's entries and share one budget."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Disk tier shared between processes")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        worker_a = ResultCache(cache_dir=cache_dir, max_memory_bytes=0, max_disk_bytes=300, disk_scan_interval=0)
+        worker_b = ResultCache(cache_dir=cache_dir, max_memory_bytes=0, max_disk_bytes=300, disk_scan_interval=0)
+
+        worker_a.put("a", {"markdown": "a" * 100})
+        assert worker_b.get("a") == {"markdown": "a" * 100}, "Entry written by another worker must be found"
+        print("✓ Entry written by worker A is a hit in worker B")
+
+        for key in ("b", "c", "d"):
+            (worker_a if key == "c" else worker_b).put(key, {"markdown": key * 100})
+        on_disk = sum(path.stat().st_size for path in Path(cache_dir).glob("*/*.json"))
+        assert on_disk <= 300, on_disk
+        assert worker_a.get("d") is not None and worker_b.get("a") is None
+        print(f"✓ {on_disk} bytes on disk for both workers, least recently used evicted")
+
+
+if __name__ == "__main__":
+    try:
+        test_key_depends_on_options()
+        test_memory_and_disk_tiers()
+        test_disk_lru_eviction()
+        test_shared_disk_tier()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test batched span aggregation against the per-span loop it replaces.
+"""
+
+import random
+import re
+import sys
+
+from src.core.page_layout import extract_elements, heading_level
+from src.core.patterns import WATERMARK_PATTERN, WATERMARK_PATTERNS
+
+
+def reference_elements(blocks):
+    """The original per-line loop: (kind, text, average size, bbox) per element."""
+    elements = []
+    for block in blocks:
+        if block["type"] == 0:
+            for line in block["lines"]:
+                line_text = ""
+                font_sizes = []
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if text:
+                        if any(re.search(p, text) for p in WATERMARK_PATTERNS):
+                            continue
+                        font_sizes.append(span["size"])
+                        line_text += text + " "
+                line_text = line_text.strip()
+                if line_text:
+                    elements.append(("text", line_text, sum(font_sizes) / len(font_sizes), tuple(line["bbox"])))
+        elif block["type"] == 1:
+            elements.append(("image", "", 0.0, None))
+    return elements
+
+
+def random_blocks(rng):
+    """Blocks shaped like page.get_text("dict") output, with watermark and blank spans."""
+    words = ["Bảng 01", "CƯỚC", "  ", "", "DRAFT", "Draft copy", "x_Approved", "approved",
+             "Container khô 20'", "1.250.000", " tàu/sà lan ", "Confidential", "WaterMark"]
+    blocks = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.1:
+            blocks.append({"type": 1})
+            continue
+        lines = []
+        for _ in range(rng.randint(0, 5)):
+            y = rng.uniform(0, 800)
+            spans = [
+                {"text": rng.choice(words), "size": rng.choice([9.5, 11.0, 12.0, 13.02, 14.0, 15.5, 18.0])}
+                for _ in range(rng.randint(0, 4))
+            ]
+            lines.append({"bbox": (50.0, y, 300.0, y + 12), "spans": spans})
+        blocks.append({"type": 0, "lines": lines})
+    return blocks
+
+
+def test_elements_match_per_span_loop():
+    """Texts, average sizes, bboxes and image positions are identical."""
+    print("=" * 70)
+    print("TEST 1: Batched vs per-span aggregation")
+    print("=" * 70)
+
+    rng = random.Random(17)
+    for _ in range(2000):
+        blocks = random_blocks(rng)
+        batched = [
+            (element.kind, element.text, element.font_size, element.bbox)
+            for element in extract_elements(blocks, WATERMARK_PATTERN)
+        ]
+        assert batched == reference_elements(blocks), blocks
+    print("✓ 2000 random pages aggregated identically")
+
+
+def test_heading_levels():
+    """Heading levels follow the >16 / >14 / >12 thresholds."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Heading classification")
+    print("=" * 70)
+
+    for size in (0, 11.9, 12, 12.01, 13, 14, 14.5, 16, 16.1, 30):
+        expected = 1 if size > 16 else 2 if size > 14 else 3 if size > 12 else 0
+        assert heading_level(size) == expected, (size, heading_level(size))
+    print("✓ Thresholds match")
+
+
+if __name__ == "__main__":
+    try:
+        test_elements_match_per_span_loop()
+        test_heading_levels()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the sorted table indexes against the linear scans they replace.
+"""
+
+import random
+import sys
+
+from src.core.page_layout import PageLayout, TableIndex, TableRegion
+
+
+def linear_containing(layout, bbox):
+    """The original per-line scan over every table bbox."""
+    return any(region.contains(bbox) for region in layout.tables)
+
+
+def linear_match(extracted_tables, matched, page_num, line_y):
+    """The original nearest-unmatched-table scan."""
+    best_match_idx = None
+    best_distance = float("inf")
+    for idx, (_, table_page, table_y) in enumerate(extracted_tables):
+        if idx in matched:
+            continue
+        page_distance = abs(table_page - page_num)
+        if page_distance > 1:
+            continue
+        total_distance = page_distance * 10000 + abs(table_y - line_y)
+        if total_distance < best_distance:
+            best_distance = total_distance
+            best_match_idx = idx
+    return best_match_idx
+
+
+def random_layouts(rng, pages, tables_per_page):
+    """Pages of stacked tables with coarse (often repeated) y-positions."""
+    layouts = []
+    for page_num in range(1, pages + 1):
+        tables = []
+        for _ in range(rng.randint(0, tables_per_page)):
+            top = rng.randrange(0, 800, 20)
+            bottom = top + rng.randrange(10, 200, 10)
+            markdown = "" if rng.random() < 0.1 else f"| t{page_num}-{top} |"
+            tables.append(TableRegion(bbox=(50, top, 500, bottom), markdown=markdown))
+        layouts.append(PageLayout(page_num=page_num, tables=tables))
+    return layouts
+
+
+def test_table_containing_matches_linear_scan():
+    """Binary-searched point-in-table test agrees with the full scan."""
+    print("=" * 70)
+    print("TEST 1: table_containing vs linear scan")
+    print("=" * 70)
+
+    rng = random.Random(7)
+    checked = 0
+    for layout in random_layouts(rng, pages=20, tables_per_page=8):
+        for _ in range(200):
+            x0, y0 = rng.randrange(40, 500, 5), rng.randrange(-10, 850, 5)
+            bbox = (x0, y0, x0 + rng.randrange(5, 100, 5), y0 + rng.randrange(5, 30, 5))
+            found = layout.table_containing(bbox)
+            assert (found is not None) == linear_containing(layout, bbox), (layout.page_num, bbox)
+            assert found is None or found.contains(bbox)
+            checked += 1
+    print(f"✓ {checked} lookups agree")
+
+
+def test_take_nearest_matches_linear_scan():
+    """Heading-to-table matching picks exactly the tables the linear scan picked."""
+    print("\n" + "=" * 70)
+    print("TEST 2: TableIndex vs linear scan")
+    print("=" * 70)
+
+    rng = random.Random(11)
+    for _ in range(50):
+        layouts = random_layouts(rng, pages=12, tables_per_page=6)
+        index = TableIndex(layouts)
+        matched = set()
+        for _ in range(60):
+            page_num = rng.randint(0, 13)
+            line_y = rng.randrange(0, 800, 20)
+            expected = linear_match(index.tables, matched, page_num, line_y)
+            assert index.take_nearest(page_num, line_y) == expected, (page_num, line_y)
+            if expected is not None:
+                matched.add(expected)
+        assert index.unmatched() == [i for i in range(len(index.tables)) if i not in matched]
+        assert len(index) == len(index.tables) - len(matched)
+    print("✓ Same matches and leftovers on 50 random documents")
+
+
+if __name__ == "__main__":
+    try:
+        test_table_containing_matches_linear_scan()
+        test_take_nearest_matches_linear_scan()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test chunked upload spooling.
+"""
+
+import asyncio
+import hashlib
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+
+from src.utils.upload_spool import RequestBodyLimitMiddleware, UploadTooLargeError, spool_file, spool_upload
+
+
+class CountingStream(BytesIO):
+    """BytesIO that records the largest read request."""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        self.largest_read = max(self.largest_read, size)
+        return super().read(size)
+
+
+def test_spool_hashes_in_chunks():
+    """Upload is written to disk in bounded chunks with a correct digest."""
+    print("=" * 70)
+    print("TEST 1: Spool upload in chunks")
+    print("=" * 70)
+
+    payload = bytes(range(256)) * 4096  # 1 MB
+    stream = CountingStream(payload)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        destination = Path(tmp_dir) / "upload.pdf"
+        upload = UploadFile(file=stream, filename="upload.pdf")
+        spooled = asyncio.run(spool_upload(upload, destination, chunk_size=64 * 1024))
+
+        assert spooled.size == len(payload), spooled
+        assert spooled.sha256 == hashlib.sha256(payload).hexdigest(), "Digest mismatch"
+        assert destination.read_bytes() == payload, "File content mismatch"
+        assert 0 < stream.largest_read <= 64 * 1024, f"Read {stream.largest_read} bytes at once"
+        print(f"✓ {spooled.size} bytes spooled, largest read {stream.largest_read} bytes")
+
+
+def test_spool_enforces_max_size():
+    """Oversized uploads are rejected while streaming and leave no partial file."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Max upload size")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        destination = Path(tmp_dir) / "big.pdf"
+        upload = UploadFile(file=BytesIO(b"x" * 10_000), filename="big.pdf")
+
+        try:
+            asyncio.run(spool_upload(upload, destination, max_size=4096, chunk_size=1024))
+            raise AssertionError("Upload should have been rejected")
+        except UploadTooLargeError as e:
+            print(f"✓ Rejected: {e}")
+
+        assert not destination.exists(), "Partial file must be removed"
+        print("✓ Partial file removed")
+
+
+def test_spool_file_object():
+    """Blocking spool_file() copies a plain file object with the same limits."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Spool file object")
+    print("=" * 70)
+
+    payload = b"archive member " * 1000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        destination = Path(tmp_dir) / "member.txt"
+        spooled = spool_file(BytesIO(payload), destination, max_size=len(payload), chunk_size=1024)
+        assert spooled.size == len(payload), spooled
+        assert spooled.sha256 == hashlib.sha256(payload).hexdigest(), "Digest mismatch"
+        print(f"✓ {spooled.size} bytes spooled")
+
+        try:
+            spool_file(BytesIO(payload), destination, max_size=len(payload) - 1, chunk_size=1024)
+            raise AssertionError("File should have been rejected")
+        except UploadTooLargeError:
+            pass
+        assert not destination.exists(), "Partial file must be removed"
+        print("✓ Oversized file rejected and removed")
+
+
+def run_middleware(body_chunks, headers, path="/documents/markdown"):
+    """Send a request through RequestBodyLimitMiddleware (limit 1000 bytes, 5000 for /batch)."""
+    state = {"received": 0, "app_called": False, "messages": []}
+
+    async def app(scope, receive, send):
+        state["app_called"] = True
+        while True:
+            message = await receive()
+            state["received"] += len(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+    async def receive():
+        body = body_chunks.pop(0) if body_chunks else b""
+        return {"type": "http.request", "body": body, "more_body": bool(body_chunks)}
+
+    async def send(message):
+        state["messages"].append(message)
+
+    middleware = RequestBodyLimitMiddleware(app, max_body_size=1000, path_limits={"/batch": 5000})
+    scope = {"type": "http", "method": "POST", "path": path, "headers": headers}
+    try:
+        asyncio.run(middleware(scope, receive, send))
+    except HTTPException as e:
+        state["error"] = e.status_code
+    return state
+
+
+def test_request_body_limit():
+    """Oversized bodies are refused before parsing, or as soon as they pass the limit."""
+    print("\n" + "=" * 70)
+    print("TEST 4: Request body limit")
+    print("=" * 70)
+
+    state = run_middleware([b"x" * 600] * 4, [(b"content-length", b"2400")])
+    assert not state["app_called"], "Declared oversized body must not reach the app"
+    assert state["messages"][0]["status"] == 413, state["messages"]
+    print("✓ Declared oversized body refused with 413 before any read")
+
+    state = run_middleware([b"x" * 600] * 4, [])
+    assert state.get("error") == 413 and state["received"] == 600, state
+    print(f"✓ Undeclared body stopped after {state['received']} of 2400 bytes")
+
+    state = run_middleware([b"x" * 600] * 4, [(b"content-length", b"2400")], path="/batch")
+    assert state["app_called"] and state["received"] == 2400 and "error" not in state, state
+    state = run_middleware([b"x" * 600], [(b"content-length", b"600")])
+    assert state["received"] == 600 and "error" not in state, state
+    print("✓ Bodies within the (per-path) limit pass through")
+
+
+if __name__ == "__main__":
+    try:
+        test_spool_hashes_in_chunks()
+        test_spool_enforces_max_size()
+        test_spool_file_object()
+        test_request_body_limit()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the bounded worker pool used by the API handlers.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from src.utils import worker_pool
+from src.utils.worker_pool import WorkerPool, WorkerPoolFullError, available_cpus, server_worker_cpus
+
+
+def _blocking_sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_runs_off_event_loop():
+    """Blocking calls must not stall other coroutines."""
+    print("=" * 70)
+    print("TEST 1: Blocking call runs off the event loop")
+    print("=" * 70)
+
+    pool = WorkerPool(kind="thread", max_workers=2, max_queue=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        result, _ = await asyncio.gather(pool.run(_blocking_sleep, 0.2), ticker())
+        return result, ticks
+
+    try:
+        result, ticks = asyncio.run(scenario())
+        assert result == 0.2, f"Unexpected result: {result}"
+        assert ticks == 5, f"Event loop was blocked (ticks={ticks})"
+        print(f"✓ Result returned ({result}) while event loop kept ticking ({ticks} ticks)")
+    finally:
+        pool.shutdown()
+
+
+def test_rejects_when_full():
+    """Calls beyond workers + queue depth are rejected."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Pool rejects calls when queue is full")
+    print("=" * 70)
+
+    pool = WorkerPool(kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        second = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        assert pool.in_flight == 2, f"Expected 2 calls in flight, got {pool.in_flight}"
+        assert pool.queue_depth == 1, f"Expected queue depth 1, got {pool.queue_depth}"
+
+        try:
+            await pool.run(_blocking_sleep, 0)
+            raise AssertionError("Third call should have been rejected")
+        except WorkerPoolFullError:
+            print("✓ Third call rejected with WorkerPoolFullError")
+
+        release.set()
+        await asyncio.gather(first, second)
+
+        # Slots are released once workers finish
+        await pool.run(_blocking_sleep, 0)
+        print("✓ Pool accepts calls again after workers finish")
+
+    try:
+        asyncio.run(scenario())
+        stats = pool.stats()
+        assert stats["rejected"] == 1, stats
+        assert stats["in_flight"] == 0, stats
+        print(f"✓ Stats: {stats}")
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_available_cpus_respects_quota():
+    """A cgroup CPU quota caps the default worker count."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Available CPUs")
+    print("=" * 70)
+
+    affinity = len(os.sched_getaffinity(0))
+    original = worker_pool.CGROUP_CPU_MAX
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cpu_max = os.path.join(tmp_dir, "cpu.max")
+        try:
+            worker_pool.CGROUP_CPU_MAX = cpu_max
+
+            with open(cpu_max, "w") as f:
+                f.write("max 100000\n")
+            assert available_cpus() == affinity, available_cpus()
+
+            with open(cpu_max, "w") as f:
+                f.write("50000 100000\n")  # half a CPU still gets one worker
+            assert available_cpus() == 1, available_cpus()
+            assert WorkerPool().max_workers == 1
+        finally:
+            worker_pool.CGROUP_CPU_MAX = original
+
+    print(f"✓ Affinity {affinity} CPUs, quota 0.5 CPU -> 1 worker")
+
+
+def test_pools_share_cpus_between_server_workers():
+    """Under gunicorn, default pool sizes are the worker's share of the CPUs."""
+    print("\n" + "=" * 70)
+    print("TEST 4: CPUs per server worker")
+    print("=" * 70)
+
+    original = os.environ.pop("CPUS_PER_WORKER", None)
+    try:
+        assert server_worker_cpus() == available_cpus()
+        os.environ["CPUS_PER_WORKER"] = "2"
+        assert server_worker_cpus() == 2 and WorkerPool().max_workers == 2
+        assert WorkerPool(max_workers=5).max_workers == 5, "Explicit sizes are kept"
+    finally:
+        os.environ.pop("CPUS_PER_WORKER", None)
+        if original is not None:
+            os.environ["CPUS_PER_WORKER"] = original
+
+    print("✓ CPUS_PER_WORKER sizes default pools, explicit sizes win")
+
+
+if __name__ == "__main__":
+    try:
+        test_runs_off_event_loop()
+        test_rejects_when_full()
+        test_available_cpus_respects_quota()
+        test_pools_share_cpus_between_server_workers()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
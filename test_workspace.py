@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test per-request workspaces and output garbage collection.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.utils.workspace import WorkspaceManager
+
+
+def _manager(tmp_dir: str, **kwargs) -> WorkspaceManager:
+    return WorkspaceManager(
+        root=str(Path(tmp_dir) / "work"),
+        output_dir=str(Path(tmp_dir) / "cleaned"),
+        **kwargs,
+    )
+
+
+def test_isolated_workspaces():
+    """Same upload name in two workspaces does not collide; release removes files."""
+    print("=" * 70)
+    print("TEST 1: Isolated workspaces")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _manager(tmp_dir)
+        first, second = manager.create(), manager.create()
+
+        first.file("doc.pdf").write_bytes(b"first")
+        second.file("doc.pdf").write_bytes(b"second")
+        assert first.file("doc.pdf") != second.file("doc.pdf")
+        assert first.file("doc.pdf").read_bytes() == b"first"
+        assert first.file("../../escape.pdf").parent == first.path, "Upload names must stay inside the workspace"
+        print("✓ Same filename kept separate per workspace")
+
+        manager.release(first)
+        manager.release(second)
+        assert not first.path.exists() and not second.path.exists()
+        print("✓ Workspaces removed on release")
+
+
+def test_output_names_and_traversal():
+    """Outputs are listed by relative name and downloads cannot escape the output dir."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Output listing and path traversal")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _manager(tmp_dir)
+        with manager.workspace() as workspace:
+            output = manager.output_dir_for(workspace) / "cleaned_doc.pdf"
+            output.write_bytes(b"pdf")
+
+        name = manager.relative_output_name(output)
+        assert name == f"{workspace.id}/cleaned_doc.pdf", name
+        assert [f["filename"] for f in manager.list_outputs()] == [name]
+        assert manager.resolve_output(name) == output.resolve()
+        assert manager.resolve_output("../work/x") is None
+        assert manager.resolve_output("../../etc/passwd") is None
+        print(f"✓ Output listed as {name}, traversal rejected")
+
+
+def test_garbage_collection():
+    """Expired outputs are removed, then the oldest until within budget."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Garbage collection by TTL and size budget")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _manager(tmp_dir, output_ttl_seconds=3600, output_max_bytes=250)
+        now = time.time()
+
+        paths = []
+        for age_hours, name in [(2, "expired"), (0.5, "old"), (0.1, "new")]:
+            directory = manager.output_dir / name
+            directory.mkdir()
+            path = directory / "cleaned.pdf"
+            path.write_bytes(b"x" * 150)
+            mtime = now - age_hours * 3600
+            os.utime(path, (mtime, mtime))
+            paths.append(path)
+
+        stats = manager.collect_garbage()
+        assert not paths[0].exists(), "Expired output should be removed"
+        assert not paths[1].exists(), "Oldest output should be removed to meet the budget"
+        assert paths[2].exists(), "Newest output should be kept"
+        assert stats["output_bytes"] <= 250, stats
+        print(f"✓ GC stats: {stats}")
+
+
+if __name__ == "__main__":
+    try:
+        test_isolated_workspaces()
+        test_output_names_and_traversal()
+        test_garbage_collection()
+        print("\n✅ ALL TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)